@@ -0,0 +1,56 @@
+"""
+Compare the WSGI (sync DRF) and ASGI (core/async_views.py) read endpoints
+under the same load (standard library only).
+
+Serve the project both ways, e.g. with the same number of workers:
+
+    uvicorn talentflow.wsgi:application --interface wsgi --workers 4 --port 8000
+    uvicorn talentflow.asgi:application --workers 4 --port 8001
+
+then:
+
+    python benchmarks/async_vs_sync.py --token <api token> --concurrency 500 \
+        --sync-url http://localhost:8000/api/applications/ \
+        --async-url http://localhost:8001/api/async/applications/
+
+Each of the `--concurrency` clients keeps one keep-alive connection open
+and sends GETs back to back for `--duration` seconds. Prints requests/s,
+latency percentiles and the status codes seen for each URL.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from http_load import build_request, client, format_stats, latency_stats, until
+
+
+async def run(label, url, options):
+    latencies, statuses = [], Counter()
+    started = time.perf_counter()
+    request = build_request('GET', url, {'Authorization': f'Token {options.token}', 'Accept': 'application/json'})
+    requests = until(started + options.duration, request)
+    await asyncio.gather(*(client(url, requests, latencies, statuses) for _ in range(options.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    print(f'{label}: {url}')
+    for line in format_stats(latency_stats(latencies, elapsed), elapsed).splitlines():
+        print(f'  {line}')
+    print(f'  status codes: {dict(statuses)}')
+
+
+async def main(options):
+    if options.sync_url:
+        await run('WSGI', options.sync_url, options)
+    if options.async_url:
+        await run('ASGI', options.async_url, options)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sync-url', default='http://localhost:8000/api/applications/')
+    parser.add_argument('--async-url', default='http://localhost:8001/api/async/applications/')
+    parser.add_argument('--token', required=True, help='API token of an HR user')
+    parser.add_argument('--concurrency', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=30, help='Seconds per URL')
+    asyncio.run(main(parser.parse_args()))
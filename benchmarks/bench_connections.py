@@ -0,0 +1,41 @@
+"""
+What a request spends on its database connection with the plain
+PostgreSQL backend (connect, set up the session, close) and with the
+pooled one (core/pool.py, DB_POOL): each round opens the connection, runs
+the user lookup of /api/auth/me/ and closes it, as Django does around a
+request with CONN_MAX_AGE=0. Against a remote database the gap grows with
+the round trip time; compare the end to end effect with load_test.py's
+`me` endpoint, serving once without and once with DB_POOL=true.
+"""
+import pytest
+from django.db import connection
+from django.db.utils import load_backend
+
+from core import pool
+
+pytestmark = pytest.mark.django_db
+
+USER_SQL = 'SELECT id, username, email, is_active FROM auth_user WHERE id = %s'
+
+
+@pytest.fixture
+def close_pools():
+    yield
+    pool.close_all()
+
+
+@pytest.mark.parametrize('engine', ['django.db.backends.postgresql', 'core.postgresql_pool'])
+def test_connect_query_close(benchmark, hr_user, close_pools, engine):
+    options = {'pool': {'min_size': 1, 'max_size': 2}} if engine == 'core.postgresql_pool' else {}
+    settings_dict = {**connection.settings_dict, 'ENGINE': engine, 'OPTIONS': options}
+    wrapper = load_backend(engine).DatabaseWrapper(settings_dict)
+
+    def request():
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute(USER_SQL, [hr_user.pk])
+                return cursor.fetchone()
+        finally:
+            wrapper.close()
+
+    assert benchmark(request)[0] == hr_user.pk
@@ -0,0 +1,69 @@
+"""
+Serialization of a page of instances by every read serializer, without
+the database: the instances are loaded (with the joins the serializer
+needs, see core/eager_loading.py) before the timed part.
+"""
+import pytest
+from django.contrib.auth.models import User
+
+from core import serializers
+from core.eager_loading import eager_load
+from core.models import Company, UserProfile, JobPosting, ResumeData, JobApplication, Interview
+from core.search import search
+
+pytestmark = pytest.mark.django_db
+
+PAGE = 100
+EXPAND = {
+    'JobPostingListSerializer': ['company', 'created_by'],
+    'JobApplicationListSerializer': ['job_posting', 'candidate', 'resume_data'],
+    'InterviewListSerializer': ['application', 'interviewer'],
+}
+
+
+def _case(serializer_class, model, search_field=None, select_related=()):
+    return pytest.param(serializer_class, model, search_field, select_related, id=serializer_class.__name__)
+
+
+CASES = [
+    _case(serializers.CompanySerializer, Company),
+    _case(serializers.CompanyListSerializer, Company),
+    _case(serializers.UserSerializer, User),
+    _case(serializers.CurrentUserSerializer, User, select_related=['userprofile__company']),
+    _case(serializers.UserProfileSerializer, UserProfile, select_related=['user', 'company']),
+    _case(serializers.JobPostingSerializer, JobPosting),
+    _case(serializers.JobPostingListSerializer, JobPosting),
+    _case(serializers.JobPostingSearchSerializer, JobPosting, 'description'),
+    _case(serializers.ResumeDataSerializer, ResumeData),
+    _case(serializers.ResumeDataListSerializer, ResumeData),
+    _case(serializers.ResumeDataSearchSerializer, ResumeData, 'summary'),
+    _case(serializers.JobApplicationSerializer, JobApplication),
+    _case(serializers.JobApplicationListSerializer, JobApplication),
+    _case(serializers.InterviewSerializer, Interview),
+    _case(serializers.InterviewListSerializer, Interview),
+]
+
+
+def _kwargs(serializer_class):
+    if not issubclass(serializer_class, serializers.DynamicFieldsMixin):
+        return {}
+    return {'expand': EXPAND.get(serializer_class.__name__, [])}
+
+
+@pytest.mark.parametrize('serializer_class, model, search_field, select_related', CASES)
+def test_serialize(benchmark, dataset, serializer_class, model, search_field, select_related):
+    kwargs = _kwargs(serializer_class)
+    queryset = model.objects.select_related(*select_related).order_by('pk')
+    if search_field:
+        queryset = search(queryset, 'python engineer', search_field)
+    if issubclass(serializer_class, serializers.DynamicFieldsMixin):
+        queryset = eager_load(queryset, serializer_class(**kwargs))
+    instances = list(queryset[:PAGE])
+    assert instances
+
+    # Anything the serializer still loads lazily would be timed too
+
+    def serialize():
+        return serializer_class(instances, many=True, **kwargs).data
+
+    assert len(benchmark(serialize)) == len(instances)
@@ -0,0 +1,59 @@
+"""
+Full request cycle of the viewsets' read endpoints as an HR user of the
+seeded data set (as a candidate for the candidate-only resume endpoints):
+routing, authentication, queries, serialization and rendering. The cache is cleared before each benchmark, not between its
+rounds, so cached endpoints (job list, company stats) are timed warm.
+"""
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from core.models import UserProfile, JobPosting, ResumeData, JobApplication, Interview
+
+pytestmark = pytest.mark.django_db
+
+CANDIDATE_ENDPOINTS = {'resume-list', 'resume-detail'}
+
+
+@pytest.fixture
+def urls(company, candidate):
+    job = JobPosting.objects.filter(company=company).order_by('pk').first()
+    application = JobApplication.objects.filter(job_posting__company=company).order_by('pk').first()
+    interview = Interview.objects.filter(application__job_posting__company=company).order_by('pk').first()
+    start = timezone.now().replace(minute=0, second=0, microsecond=0)
+    window = f'start={start.isoformat()}&end={(start + timedelta(days=7)).isoformat()}'.replace('+', '%2B')
+    interviewers = UserProfile.objects.filter(company=company, user_type='HR').values_list('user_id', flat=True)
+    interviewers = ','.join(str(pk) for pk in interviewers[:3])
+    return {
+        'me': '/api/auth/me/',
+        'company-detail': f'/api/companies/{company.pk}/',
+        'company-stats': f'/api/companies/{company.pk}/stats/',
+        'job-list': '/api/jobs/',
+        'job-list-expanded': '/api/jobs/?expand=company,created_by',
+        'job-detail': f'/api/jobs/{job.pk}/',
+        'job-search': '/api/jobs/search/?q=python',
+        'job-applications': f'/api/jobs/{job.pk}/applications/',
+        'resume-list': '/api/resume-data/',
+        'resume-detail': f'/api/resume-data/{ResumeData.objects.filter(candidate=candidate).first().pk}/',
+        'resume-search': '/api/resume-data/search/?q=python',
+        'application-list': '/api/applications/',
+        'application-list-expanded': '/api/applications/?expand=job_posting,candidate,resume_data',
+        'application-detail': f'/api/applications/{application.pk}/',
+        'interview-list': '/api/interviews/',
+        'interview-detail': f'/api/interviews/{interview.pk}/',
+        'interview-availability': f'/api/interviews/availability/?interviewers={interviewers}&{window}',
+    }
+
+
+@pytest.mark.parametrize('name', [
+    'me', 'company-detail', 'company-stats',
+    'job-list', 'job-list-expanded', 'job-detail', 'job-search', 'job-applications',
+    'resume-list', 'resume-detail', 'resume-search',
+    'application-list', 'application-list-expanded', 'application-detail',
+    'interview-list', 'interview-detail', 'interview-availability',
+])
+def test_get(benchmark, api_client, candidate_client, urls, name):
+    client = candidate_client if name in CANDIDATE_ENDPOINTS else api_client
+    response = benchmark(client.get, urls[name])
+    assert response.status_code == 200, response.content[:500]
@@ -0,0 +1,57 @@
+"""
+Shared fixtures: one seeded data set (core/seeding.py) for the whole
+session, BENCH_APPLICATIONS applications (default 2000) in the test
+database, plus API clients logged in as one of its HR users and as one
+of its candidates.
+"""
+import os
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from core.seeding import Scale, Seeder
+
+BENCH_APPLICATIONS = int(os.environ.get('BENCH_APPLICATIONS', 2000))
+
+
+@pytest.fixture(scope='session')
+def dataset(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        return Seeder(Scale.for_applications(BENCH_APPLICATIONS), seed=1).run()
+
+
+@pytest.fixture
+def hr_user(dataset, db):
+    user_id = next(iter(dataset['hr_users'].values()))[0]
+    return User.objects.select_related('userprofile__company').get(pk=user_id)
+
+
+@pytest.fixture
+def company(hr_user):
+    return hr_user.userprofile.company
+
+
+@pytest.fixture
+def api_client(hr_user):
+    client = APIClient()
+    client.force_authenticate(user=hr_user)
+    return client
+
+
+@pytest.fixture
+def candidate(dataset, db):
+    return User.objects.get(pk=dataset['candidates'][0])
+
+
+@pytest.fixture
+def candidate_client(candidate):
+    client = APIClient()
+    client.force_authenticate(user=candidate)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
@@ -0,0 +1,103 @@
+"""
+HTTP load generation shared by the load scripts (standard library only):
+keep-alive clients on raw asyncio streams, and latency figures.
+
+Clients take the requests to send from one shared iterator, so a run
+ends when it is exhausted: `until()` repeats a request up to a deadline.
+"""
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+def build_request(method, url, headers=None, body=None):
+    """The bytes of an HTTP/1.1 request, `body` already encoded"""
+    url = urlsplit(url)
+    path = (url.path or '/') + (f'?{url.query}' if url.query else '')
+    lines = [f'{method} {path} HTTP/1.1', f'Host: {url.hostname}:{url.port or 80}']
+    lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+    if body is not None:
+        lines.append(f'Content-Length: {len(body)}')
+    return '\r\n'.join(lines).encode() + b'\r\n\r\n' + (body or b'')
+
+
+def until(deadline, request):
+    """`request` over and over until time.perf_counter() reaches `deadline`"""
+    while time.perf_counter() < deadline:
+        yield request
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError('connection closed')
+    length = None
+    keep_alive = True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'connection' and value.strip().lower() == 'close':
+            keep_alive = False
+    if length is None:
+        await reader.read()
+        keep_alive = False
+    else:
+        await reader.readexactly(length)
+    return int(status_line.split()[1]), keep_alive
+
+
+async def client(url, requests, latencies, statuses):
+    """
+    Send `requests` (bytes) back to back over one keep-alive connection to
+    the host of `url`, reconnecting when the server closes it. Appends each
+    latency and counts each status code, or error name.
+    """
+    url = urlsplit(url)
+    writer = None
+    for request in requests:
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await read_response(reader)
+        except (OSError, asyncio.IncompleteReadError) as exc:
+            status, keep_alive = type(exc).__name__, False
+        latencies.append(time.perf_counter() - started)
+        statuses[status] += 1
+        if not keep_alive and writer is not None:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+def percentile(values, pct):
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def latency_stats(latencies, elapsed):
+    """Requests, requests/s, and the mean and percentile latencies in ms"""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'mean': statistics.mean(latencies) * 1000,
+        'p50': percentile(latencies, 50) * 1000,
+        'p95': percentile(latencies, 95) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+    }
+
+
+def format_stats(stats, elapsed):
+    return (
+        f"{stats['requests']} requests in {elapsed:.1f}s, {stats['rps']:.1f} req/s\n"
+        f"latency ms: mean {stats['mean']:.1f} p50 {stats['p50']:.1f} p95 {stats['p95']:.1f} p99 {stats['p99']:.1f}"
+    )
@@ -0,0 +1,182 @@
+"""
+Load test of the main read endpoints as an HR user (standard library only).
+
+Seed a data set and serve the project, e.g.:
+
+    python manage.py seed_data --scale 100k
+    uvicorn talentflow.wsgi:application --interface wsgi --workers 4 --port 8000
+
+then, with the token `seed_data` printed:
+
+    python benchmarks/load_test.py --token <api token> --save before
+    # ...change something, restart the server...
+    python benchmarks/load_test.py --token <api token> --compare before
+
+Each endpoint gets `--concurrency` keep-alive clients sending GETs back to
+back for `--duration` seconds, one endpoint after the other. Prints
+requests/s, latency percentiles and non-2xx responses per endpoint.
+`--save NAME` stores the figures in benchmarks/baselines/NAME.json;
+`--compare NAME` prints the change against that baseline and exits with
+status 1 if an endpoint lost more than `--tolerance` of its throughput or
+its p95 latency grew by more than that. Baselines only compare on the same
+machine, data set and server setup. `me` costs little beyond authentication
+and the connection: save a baseline without DB_POOL and compare the same
+server with DB_POOL=true to see what the connection pool saves.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import urllib.request
+from collections import Counter
+
+from http_load import build_request, client, latency_stats, until
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+
+def get_json(base_url, path, token):
+    request = urllib.request.Request(
+        base_url + path, headers={'Authorization': f'Token {token}', 'Accept': 'application/json'},
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def first_id(base_url, path, token):
+    results = get_json(base_url, f'{path}?page_size=1&fields=id', token)['results']
+    if not results:
+        sys.exit(f'{path} is empty, seed some data first (manage.py seed_data)')
+    return results[0]['id']
+
+
+def endpoints(base_url, token):
+    """Paths to load, with ids of the token's company"""
+    company = get_json(base_url, '/api/auth/me/', token)['profile']['company']['id']
+    job = first_id(base_url, '/api/jobs/', token)
+    application = first_id(base_url, '/api/applications/', token)
+    interview = first_id(base_url, '/api/interviews/', token)
+    return {
+        'me': '/api/auth/me/',
+        'company-stats': f'/api/companies/{company}/stats/',
+        'job-list': '/api/jobs/',
+        'job-detail': f'/api/jobs/{job}/',
+        'job-search': '/api/jobs/search/?q=python',
+        'job-applications': f'/api/jobs/{job}/applications/',
+        'resume-search': '/api/resume-data/search/?q=python',
+        'application-list': '/api/applications/',
+        'application-list-expanded': '/api/applications/?expand=job_posting,candidate,resume_data',
+        'application-detail': f'/api/applications/{application}/',
+        'interview-list': '/api/interviews/',
+        'interview-detail': f'/api/interviews/{interview}/',
+    }
+
+
+async def load(url, options):
+    latencies, statuses = [], Counter()
+    started = time.perf_counter()
+    request = build_request('GET', url, {'Authorization': f'Token {options.token}', 'Accept': 'application/json'})
+    requests = until(started + options.duration, request)
+    await asyncio.gather(*(client(url, requests, latencies, statuses) for _ in range(options.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        **latency_stats(latencies, elapsed),
+        'errors': sum(
+            count for status, count in statuses.items() if not isinstance(status, int) or status >= 300
+        ),
+    }
+
+
+def print_results(results, baseline=None):
+    print(f"{'endpoint':<28}{'requests':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, result in results.items():
+        print(
+            f"{name:<28}{result['requests']:>10}{result['rps']:>10.1f}{result['p50']:>10.1f}"
+            f"{result['p95']:>10.1f}{result['p99']:>10.1f}{result['errors']:>8}"
+        )
+        if baseline and name in baseline:
+            before = baseline[name]
+            print(
+                f"{'  vs baseline':<38}{change(before['rps'], result['rps']):>10}"
+                f"{change(before['p50'], result['p50']):>10}{change(before['p95'], result['p95']):>10}"
+                f"{change(before['p99'], result['p99']):>10}"
+            )
+
+
+def change(before, after):
+    return f'{(after - before) / before:+.0%}' if before else 'n/a'
+
+
+def regressions(results, baseline, tolerance):
+    found = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result['rps'] < before['rps'] * (1 - tolerance):
+            found.append(f"{name}: {result['rps']:.1f} req/s, was {before['rps']:.1f}")
+        if result['p95'] > before['p95'] * (1 + tolerance):
+            found.append(f"{name}: p95 {result['p95']:.1f} ms, was {before['p95']:.1f}")
+        if result['errors'] and not before['errors']:
+            found.append(f"{name}: {result['errors']} errors, had none")
+    return found
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+async def main(options):
+    base_url = options.base_url.rstrip('/')
+    paths = endpoints(base_url, options.token)
+    if options.endpoint:
+        unknown = set(options.endpoint) - set(paths)
+        if unknown:
+            sys.exit(f"Unknown endpoints: {', '.join(sorted(unknown))} (choose from {', '.join(paths)})")
+        paths = {name: path for name, path in paths.items() if name in options.endpoint}
+
+    baseline = None
+    if options.compare:
+        with open(baseline_path(options.compare)) as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    for name, path in paths.items():
+        print(f'{name}: {path}', file=sys.stderr)
+        results[name] = await load(base_url + path, options)
+    print_results(results, baseline)
+
+    if options.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(options.save), 'w') as f:
+            json.dump({
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'base_url': base_url,
+                'concurrency': options.concurrency,
+                'duration': options.duration,
+                'results': results,
+            }, f, indent=2)
+        print(f'Saved the baseline {baseline_path(options.save)}')
+
+    if baseline is not None:
+        found = regressions(results, baseline, options.tolerance)
+        for line in found:
+            print(f'Regression: {line}')
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--token', required=True, help='API token of an HR user')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=15, help='Seconds per endpoint')
+    parser.add_argument('--endpoint', action='append', help='Only load this endpoint (repeatable)')
+    parser.add_argument('--save', metavar='NAME', help='Save the results as a baseline')
+    parser.add_argument('--compare', metavar='NAME', help='Compare with a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='Allowed regression, 0.1 = 10%%')
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,45 @@
+"""
+Load generator for POST /api/auth/login/ (standard library only).
+
+    python benchmarks/login_load.py --url http://localhost:8000/api/auth/login/ \
+        --email hr@example.com --password secret --concurrency 50 --requests 2000
+
+Prints throughput, latency percentiles and the status codes seen. Expect
+429s once the login throttles kick in: raise LOGIN_RATE / LOGIN_EMAIL_RATE
+on the server to measure raw hashing throughput, or pass several --email
+values to spread the load over accounts.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+from http_load import build_request, client, format_stats, latency_stats
+
+
+def login_requests(url, emails, password, count):
+    for i in range(count):
+        body = json.dumps({'email': emails[i % len(emails)], 'password': password}).encode()
+        yield build_request('POST', url, {'Content-Type': 'application/json'}, body)
+
+
+async def main(options):
+    latencies, statuses = [], Counter()
+    requests = login_requests(options.url, options.email, options.password, options.requests)
+    started = time.perf_counter()
+    await asyncio.gather(*(client(options.url, requests, latencies, statuses) for _ in range(options.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    print(format_stats(latency_stats(latencies, elapsed), elapsed))
+    print('status codes:', dict(statuses))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:8000/api/auth/login/')
+    parser.add_argument('--email', action='append', required=True, help='Repeat to rotate over several accounts')
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
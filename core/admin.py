@@ -1,6 +1,21 @@
 # ==== core/admin.py ====
 from django.contrib import admin
-from .models import Company, UserProfile, JobPosting, ResumeData, JobApplication, Interview
+from .models import Company, UserProfile, JobPosting, ResumeData, JobApplication, Interview, Task, Skill, SkillAlias
+from .search import parse_query
+
+
+class FullTextSearchMixin:
+    """
+    Admin search through the indexed `search_vector`, or the `search_fields`
+    lookups for what the document doesn't hold (company names, emails,
+    usernames) and partial words
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        matches, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        return queryset.filter(search_vector=parse_query(search_term)) | matches, may_have_duplicates
 
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
@@ -16,14 +31,14 @@ class UserProfileAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'user__email']
 
 @admin.register(JobPosting)
-class JobPostingAdmin(admin.ModelAdmin):
+class JobPostingAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'company', 'department', 'status', 'created_at']
     list_filter = ['status', 'company', 'department', 'job_type', 'created_at']
     search_fields = ['title', 'description', 'company__name']
     readonly_fields = ['public_id', 'created_at', 'updated_at']
 
 @admin.register(ResumeData)
-class ResumeDataAdmin(admin.ModelAdmin):
+class ResumeDataAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['full_name', 'candidate', 'email', 'original_file_name', 'created_at']
     list_filter = ['created_at']
     search_fields = ['full_name', 'email', 'candidate__username']
@@ -41,4 +56,21 @@ class InterviewAdmin(admin.ModelAdmin):
     list_display = ['application', 'interviewer', 'interview_type', 'scheduled_time', 'status']
     list_filter = ['status', 'interview_type', 'scheduled_time']
     search_fields = ['application__candidate__username', 'interviewer__username']
-    readonly_fields = ['created_at', 'updated_at']
\ No newline at end of file
+    readonly_fields = ['created_at', 'updated_at']
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'run_at', 'locked_until', 'created_at']
+    list_filter = ['status', 'name']
+    readonly_fields = ['created_at', 'updated_at']
+
+class SkillAliasInline(admin.TabularInline):
+    model = SkillAlias
+    extra = 1
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ['name', 'created_at']
+    search_fields = ['name', 'aliases__alias']
+    readonly_fields = ['created_at']
+    inlines = [SkillAliasInline]
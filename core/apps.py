@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # Register the background tasks with the queue, the cache invalidation
+        # receivers and the query instrumentation of new connections
+        from . import metrics, signals, tasks  # noqa: F401
@@ -0,0 +1,165 @@
+# ==== core/async_views.py ====
+"""
+Async, read-only list/retrieve endpoints for jobs, applications and
+interviews, served under /api/async/ when running on ASGI
+(`uvicorn talentflow.asgi:application`).
+
+They reuse the DRF viewsets for everything that doesn't touch the
+database (scoping, sparse fieldsets, eager loading, keyset pagination,
+serializers) and run the queries with the async ORM, so a worker keeps
+serving other requests while PostgreSQL answers. Authentication is token
+only, through CachedTokenAuthentication.
+
+`change_events` streams the change feed (core/events.py) as server-sent
+events. Under WSGI it would tie up a worker per client.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.request import Request
+
+from .authentication import CachedTokenAuthentication
+from . import events
+from .views import JobPostingViewSet, JobApplicationViewSet, InterviewViewSet
+
+ITERATOR_CHUNK_SIZE = 100
+
+
+def _error(detail, status):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+async def _authenticate(request):
+    auth = get_authorization_header(request).split()
+    if len(auth) != 2 or auth[0].lower() != b'token':
+        raise exceptions.NotAuthenticated()
+    try:
+        key = auth[1].decode()
+    except UnicodeError:
+        raise exceptions.AuthenticationFailed('Invalid token header.')
+    user, _token = await CachedTokenAuthentication().aauthenticate_credentials(key)
+    return user
+
+
+def _viewset(viewset_class, request, user, action, **kwargs):
+    # The viewset only builds querysets and serializers here, the queries run
+    # with the async ORM (but for _queryset's)
+    drf_request = Request(request)
+    drf_request.user = user
+    return viewset_class(request=drf_request, action=action, format_kwarg=None, args=(), kwargs=kwargs)
+
+
+async def _fetch(queryset):
+    if queryset._prefetch_related_lookups:
+        # aiterator() doesn't support prefetching before Django 5.0
+        return [obj async for obj in queryset]
+    return [obj async for obj in queryset.aiterator(chunk_size=ITERATOR_CHUNK_SIZE)]
+
+
+async def _queryset(viewset):
+    # filter_queryset() looks up the aliases of ?skills_all= / ?skills_any=
+    # (core/skills.py), a synchronous query
+    return await sync_to_async(viewset.filter_queryset)(viewset.get_queryset())
+
+
+async def _list(request, viewset_class):
+    user = await _authenticate(request)
+    viewset = _viewset(viewset_class, request, user, 'list')
+    queryset = await _queryset(viewset)
+
+    paginator = viewset.paginator
+    page_queryset = paginator.get_page_queryset(queryset, viewset.request, view=viewset)
+    rows = paginator.build_page(await _fetch(page_queryset))
+    data = viewset.get_serializer(rows, many=True).data
+    return JsonResponse({
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link(),
+        'results': data,
+    }, encoder=DjangoJSONEncoder)
+
+
+async def _retrieve(request, viewset_class, pk):
+    user = await _authenticate(request)
+    viewset = _viewset(viewset_class, request, user, 'retrieve', pk=pk)
+    queryset = await _queryset(viewset)
+    try:
+        obj = await queryset.aget(pk=pk)
+    except queryset.model.DoesNotExist:
+        raise Http404
+    return JsonResponse(viewset.get_serializer(obj).data, encoder=DjangoJSONEncoder)
+
+
+def _handle_api_errors(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _error('Method not allowed.', 405)
+        try:
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return _error(exc.detail, exc.status_code)
+        except Http404:
+            return _error('Not found.', 404)
+    return wrapper
+
+
+@_handle_api_errors
+async def job_list(request):
+    return await _list(request, JobPostingViewSet)
+
+
+@_handle_api_errors
+async def job_detail(request, pk):
+    return await _retrieve(request, JobPostingViewSet, pk)
+
+
+@_handle_api_errors
+async def application_list(request):
+    return await _list(request, JobApplicationViewSet)
+
+
+@_handle_api_errors
+async def application_detail(request, pk):
+    return await _retrieve(request, JobApplicationViewSet, pk)
+
+
+@_handle_api_errors
+async def interview_list(request):
+    return await _list(request, InterviewViewSet)
+
+
+@_handle_api_errors
+async def interview_detail(request, pk):
+    return await _retrieve(request, InterviewViewSet, pk)
+
+
+@_handle_api_errors
+async def change_events(request):
+    """
+    Server-sent events for the HR user's company, resumed after the
+    `Last-Event-ID` header (or `?last_event_id=`) when given. The token goes
+    in the Authorization header, so browsers need a fetch-based
+    EventSource.
+    """
+    user = await _authenticate(request)
+    profile = getattr(user, 'userprofile', None)
+    if profile is None or profile.user_type != 'HR':
+        raise exceptions.PermissionDenied()
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise exceptions.ValidationError({'last_event_id': 'Expected an event id'})
+
+    response = StreamingHttpResponse(
+        events.stream(profile.company_id, last_event_id), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Or nginx holds the events back in its buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
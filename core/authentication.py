@@ -0,0 +1,121 @@
+# ==== core/authentication.py ====
+"""
+Token authentication that resolves token, user, profile and company in one
+query and then keeps them in process memory for AUTH_CACHE_TTL seconds.
+
+Logging out (deleting the token) and saving the user or their profile
+write a revocation timestamp to the shared cache (CACHES['shared'], the
+database by default); cached entries older than it are dropped by every
+process on their next request. A cache hit reads the two markers, by key.
+"""
+import copy
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from .cache import shared_cache
+
+
+def _token_marker(key):
+    return f'auth:token:{key}:revoked'
+
+
+def _user_marker(user_id):
+    return f'auth:user:{user_id}:revoked'
+
+
+def revoke_token(key):
+    # Kept as long as a process could still hold an entry for the token
+    shared_cache.set(_token_marker(key), time.time(), settings.AUTH_CACHE_TTL * 2)
+
+
+def revoke_user(user_id):
+    shared_cache.set(_user_marker(user_id), time.time(), settings.AUTH_CACHE_TTL * 2)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for TokenAuthentication. `request.user` comes with
+    `userprofile` and `userprofile.company` already loaded.
+    """
+    _entries = {}
+    _lock = threading.Lock()
+
+    def authenticate_credentials(self, key):
+        entry = self._get_entry(key)
+        if entry is None:
+            # Taken before the read, so a revocation during it counts
+            cached_at = time.time()
+            entry = (self._load(key), cached_at)
+            self._set_entry(key, entry)
+
+        token, _cached_at = entry
+        # Each request gets its own copy, views may set attributes on the user
+        token = copy.deepcopy(token)
+        return (token.user, token)
+
+    async def aauthenticate_credentials(self, key):
+        """
+        For async views: cache hits don't leave the event loop (besides the
+        cache backend's own), only a miss runs the query in a thread.
+        """
+        entry = self._fresh_entry(key)
+        if entry is not None and self._revoked(entry, await shared_cache.aget_many(self._marker_keys(entry))):
+            self._entries.pop(key, None)
+            entry = None
+        if entry is None:
+            cached_at = time.time()
+            entry = (await sync_to_async(self._load)(key), cached_at)
+            self._set_entry(key, entry)
+
+        token = copy.deepcopy(entry[0])
+        return (token.user, token)
+
+    def _load(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user__userprofile__company').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return token
+
+    def _get_entry(self, key):
+        entry = self._fresh_entry(key)
+        if entry is not None and self._revoked(entry, shared_cache.get_many(self._marker_keys(entry))):
+            self._entries.pop(key, None)
+            return None
+        return entry
+
+    def _fresh_entry(self, key):
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[1] > settings.AUTH_CACHE_TTL:
+            return None
+        return entry
+
+    def _marker_keys(self, entry):
+        token, _cached_at = entry
+        return [_token_marker(token.key), _user_marker(token.user_id)]
+
+    def _revoked(self, entry, markers):
+        _token, cached_at = entry
+        return any(revoked_at >= cached_at for revoked_at in markers.values())
+
+    def _set_entry(self, key, entry):
+        with self._lock:
+            if len(self._entries) >= settings.AUTH_CACHE_MAX_ENTRIES:
+                # Oldest first, dicts keep insertion order
+                self._entries.pop(next(iter(self._entries)), None)
+            self._entries[key] = entry
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
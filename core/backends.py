@@ -0,0 +1,65 @@
+# ==== core/backends.py ====
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Password upgrades run off the request thread. They stay in process memory:
+# the task queue would have to store the plain password in the database.
+_rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='password-rehash')
+
+
+def _needs_rehash(encoded):
+    hasher = identify_hasher(encoded)
+    return hasher.algorithm != get_hasher().algorithm or hasher.must_update(encoded)
+
+
+def rehash_password(user_id, password, encoded):
+    """Store `password` with the current hasher, unless it changed meanwhile"""
+    return User.objects.filter(pk=user_id, password=encoded).update(password=make_password(password))
+
+
+def _rehash_in_background(user_id, password, encoded):
+    try:
+        rehash_password(user_id, password, encoded)
+    except Exception:
+        logger.exception('Could not upgrade the password hash of user %s', user_id)
+    finally:
+        # The executor's thread has its own connection
+        connection.close()
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticates `email` + `password` with a single indexed,
+    case-insensitive lookup (profile and company joined in for the login
+    response), and upgrades outdated password hashes in the background
+    instead of during the request.
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+
+        user = (
+            User.objects.select_related('userprofile__company')
+            .filter(email__iexact=email)
+            .order_by('pk')
+            .first()
+        )
+        if user is None:
+            # Same cost as a wrong password, so emails can't be probed by timing
+            make_password(password)
+            return None
+
+        encoded = user.password
+        if not check_password(password, encoded) or not self.user_can_authenticate(user):
+            return None
+        if _needs_rehash(encoded):
+            _rehash_executor.submit(_rehash_in_background, user.pk, password, encoded)
+        return user
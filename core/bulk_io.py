@@ -0,0 +1,376 @@
+# ==== core/bulk_io.py ====
+"""
+Bulk import and export of job postings, resumes and applications as CSV or
+NDJSON.
+
+Imports read the input record by record and write it with `bulk_create` in
+batches of `batch_size`, so memory holds one batch whatever the file size.
+Invalid rows are skipped and reported; each batch commits on its own.
+Resume and application rows name their candidate by email: unknown emails
+get a candidate account, known ones must be the company's candidates (see
+`get_or_create_candidates`). Imported resumes are linked to the company.
+
+Exports are generators over `.values().iterator(chunk_size=...)` (a
+server-side cursor on PostgreSQL), meant for a StreamingHttpResponse or a
+file; the columns match what the importers read.
+"""
+import csv
+import io
+import json
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Upper
+
+from .models import UserProfile, JobPosting, ResumeData, JobApplication
+from . import events, signals, stats, tasks
+
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 100
+
+JOB_FIELDS = ['title', 'description', 'requirements', 'location', 'job_type', 'department', 'status']
+RESUME_FIELDS = ['full_name', 'email', 'phone', 'location', 'summary', 'skills', 'experience', 'education']
+APPLICATION_FIELDS = ['status', 'cover_letter', 'notes']
+# JSON columns; in CSV a JSON array, or `;`-separated for skills
+LIST_FIELDS = {'skills', 'experience', 'education'}
+
+
+class BulkImportError(Exception):
+    """The input as a whole can't be read (unknown format, missing columns)"""
+
+
+def format_from_name(name, default='csv'):
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    return {'csv': 'csv', 'ndjson': 'ndjson', 'jsonl': 'ndjson'}.get(extension, default)
+
+
+def iter_records(stream, fmt):
+    """Yield (row number, record dict, error) from a binary stream"""
+    if fmt not in FORMATS:
+        raise BulkImportError(f'Unsupported format {fmt!r}, use one of {", ".join(FORMATS)}')
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        for number, row in enumerate(csv.DictReader(text), 1):
+            yield number, row, None
+        return
+
+    for number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield number, None, ['Invalid JSON']
+            continue
+        if isinstance(record, dict):
+            yield number, record, None
+        else:
+            yield number, None, ['Expected a JSON object']
+
+
+def _list_value(name, value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, list):
+        return value
+    value = str(value).strip()
+    if value.startswith('['):
+        try:
+            return json.loads(value)
+        except ValueError:
+            raise ValidationError({name: ['Invalid JSON array']})
+    if name == 'skills':
+        return [skill.strip() for skill in value.split(';') if skill.strip()]
+    raise ValidationError({name: ['Expected a JSON array']})
+
+
+def _values(record, fields):
+    # Empty columns are left out, so the model defaults apply
+    values = {}
+    for name in fields:
+        value = record.get(name)
+        if value in (None, ''):
+            continue
+        values[name] = _list_value(name, value) if name in LIST_FIELDS else value
+    return values
+
+
+def _validate(instance, exclude):
+    instance.full_clean(exclude=exclude, validate_unique=False)
+    return instance
+
+
+class Importer:
+    """Base importer: `build()` turns a record into an unsaved instance, `save()` writes a batch"""
+
+    def __init__(self, company, user=None, batch_size=BATCH_SIZE):
+        self.company = company
+        self.user = user
+        self.batch_size = batch_size
+        self.created = 0
+        self.errors = []
+        self.error_count = 0
+
+    def run(self, records):
+        batch = []
+        for number, record, error in records:
+            if error is None:
+                try:
+                    batch.append((number, self.build(record)))
+                except ValidationError as exc:
+                    error = exc.message_dict if hasattr(exc, 'error_dict') else exc.messages
+            if error is not None:
+                self.add_error(number, error)
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        if self.created:
+            self.finish()
+        return self.report()
+
+    def flush(self, batch):
+        with transaction.atomic():
+            self.created += self.save(batch)
+
+    def add_error(self, number, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': number, 'errors': error})
+
+    def report(self):
+        return {'created': self.created, 'error_count': self.error_count, 'errors': self.errors}
+
+    def build(self, record):
+        raise NotImplementedError
+
+    def save(self, batch):
+        raise NotImplementedError
+
+    def finish(self):
+        """Invalidate what the bulk writes bypassed (no signals are sent)"""
+        stats.invalidate(self.company.pk)
+
+
+class JobPostingImporter(Importer):
+
+    def build(self, record):
+        job = JobPosting(company=self.company, created_by=self.user, **_values(record, JOB_FIELDS))
+        return _validate(job, exclude=['company', 'created_by'])
+
+    def save(self, batch):
+        jobs = JobPosting.objects.bulk_create([job for _, job in batch])
+        # bulk_create sends no signals
+        tasks.update_job_index.delay(job_ids=[job.pk for job in jobs])
+        return len(jobs)
+
+    def finish(self):
+        super().finish()
+        signals.invalidate_job_lists(self.company.pk)
+
+
+def _candidate_email(record):
+    email = (record.get('candidate_email') or record.get('email') or '').strip()
+    if not email:
+        raise ValidationError({'candidate_email': ['This field is required.']})
+    return email
+
+
+def get_or_create_candidates(emails, company):
+    """
+    {upper-cased email: User} for the emails the company may import for,
+    creating candidate accounts for the unknown ones. An existing account
+    is only used if it is a candidate's who applied to the company's jobs or
+    whose resume it imported before; emails of other accounts (HR users,
+    staff, candidates of other companies) are left out.
+    """
+    wanted = {email.upper(): email for email in emails}
+    existing = list(
+        User.objects.annotate(email_upper=Upper('email'))
+        .filter(email_upper__in=list(wanted))
+        .select_related('userprofile')
+        .order_by('pk')
+    )
+    ids = [user.pk for user in existing]
+    related = set(
+        JobApplication.objects.filter(job_posting__company=company, candidate__in=ids)
+        .values_list('candidate_id', flat=True)
+    )
+    related.update(
+        ResumeData.objects.filter(imported_by=company, candidate__in=ids).values_list('candidate_id', flat=True)
+    )
+    users = {}
+    for user in existing:
+        profile = getattr(user, 'userprofile', None)
+        if (
+            user.pk in related and not user.is_staff and not user.is_superuser
+            and profile is not None and profile.user_type == 'CANDIDATE'
+        ):
+            users.setdefault(user.email_upper, user)
+
+    taken = {user.email_upper for user in existing}
+    missing = [email for key, email in wanted.items() if key not in taken]
+    if missing:
+        new_users = []
+        for email in missing:
+            user = User(username=f"{email.split('@')[0][:100]}-{uuid.uuid4().hex[:8]}", email=email)
+            # They sign up for a password with a reset, no hashing cost here
+            user.set_unusable_password()
+            new_users.append(user)
+        User.objects.bulk_create(new_users)
+        UserProfile.objects.bulk_create([UserProfile(user=user, user_type='CANDIDATE') for user in new_users])
+        users.update((user.email.upper(), user) for user in new_users)
+    return users
+
+
+def _build_resume(record):
+    email = _candidate_email(record)
+    resume = ResumeData(
+        original_file_name=record.get('original_file_name') or 'import',
+        **_values(record, RESUME_FIELDS),
+    )
+    if not resume.email:
+        resume.email = email
+    # Resolved to a user per batch, see get_or_create_candidates()
+    resume.candidate_email = email
+    # Empty lists are valid here, _list_value() already checked the JSON columns
+    return _validate(resume, exclude=['candidate', 'raw_extracted_data', *LIST_FIELDS])
+
+
+def _add_account_error(importer, number):
+    importer.add_error(number, {'candidate_email': ['Belongs to an account that is not a candidate of the company.']})
+
+
+class ResumeDataImporter(Importer):
+    """Resumes of the company's candidates, linked to the company (`imported_by`) to be found again"""
+
+    def build(self, record):
+        return _build_resume(record)
+
+    def save(self, batch):
+        candidates = get_or_create_candidates((resume.candidate_email for _, resume in batch), self.company)
+        resumes = []
+        for number, resume in batch:
+            candidate = candidates.get(resume.candidate_email.upper())
+            if candidate is None:
+                _add_account_error(self, number)
+                continue
+            resume.candidate = candidate
+            resume.imported_by = self.company
+            resumes.append(resume)
+        return len(ResumeData.objects.bulk_create(resumes)) if resumes else 0
+
+
+class JobApplicationImporter(Importer):
+    """Rows are an application plus the applicant's resume; unknown candidates get an account"""
+
+    def build(self, record):
+        resume = _build_resume(record)
+        try:
+            job_id = int(record.get('job_posting'))
+        except (TypeError, ValueError):
+            raise ValidationError({'job_posting': ['A valid job id is required.']})
+        application = JobApplication(job_posting_id=job_id, **_values(record, APPLICATION_FIELDS))
+        _validate(application, exclude=['job_posting', 'candidate', 'resume_data', 'ai_match_details'])
+        return resume, application
+
+    def save(self, batch):
+        job_ids = set(
+            JobPosting.objects.filter(company=self.company, id__in={app.job_posting_id for _, (_, app) in batch})
+            .values_list('id', flat=True)
+        )
+        candidates = get_or_create_candidates((resume.candidate_email for _, (resume, _) in batch), self.company)
+        applied = set(
+            JobApplication.objects.filter(
+                job_posting_id__in=job_ids, candidate__in=list(candidates.values())
+            ).values_list('job_posting_id', 'candidate_id')
+        )
+
+        rows = []
+        for number, (resume, application) in batch:
+            candidate = candidates.get(resume.candidate_email.upper())
+            if application.job_posting_id not in job_ids:
+                self.add_error(number, {'job_posting': ['Unknown job']})
+            elif candidate is None:
+                _add_account_error(self, number)
+            elif (application.job_posting_id, candidate.pk) in applied:
+                self.add_error(number, ['This candidate already applied to this job'])
+            else:
+                applied.add((application.job_posting_id, candidate.pk))
+                resume.candidate = application.candidate = candidate
+                rows.append((resume, application))
+        if not rows:
+            return 0
+
+        resumes = ResumeData.objects.bulk_create([resume for resume, _ in rows])
+        for resume, (_, application) in zip(resumes, rows):
+            application.resume_data = resume
+        applications = JobApplication.objects.bulk_create([application for _, application in rows])
+        tasks.score_application.delay_many([{'application_id': app.pk} for app in applications])
+        events.record([events.application_event(self.company.pk, app, created=True) for app in applications])
+        return len(applications)
+
+    def finish(self):
+        super().finish()
+        signals.invalidate_job_counters(self.company.pk)
+
+
+IMPORTERS = {
+    'jobs': JobPostingImporter,
+    'resumes': ResumeDataImporter,
+    'applications': JobApplicationImporter,
+}
+
+
+def export_queryset(kind, company):
+    """`.values()` rows of the company's data, with the columns the importers read"""
+    if kind == 'jobs':
+        return JobPosting.objects.filter(company=company).order_by('id').values(
+            'id', 'public_id', *JOB_FIELDS, 'created_at', 'updated_at'
+        )
+    resume_columns = {name: F(f'resume_data__{name}') for name in RESUME_FIELDS}
+    if kind == 'resumes':
+        return ResumeData.objects.filter(
+            Q(id__in=JobApplication.objects.filter(job_posting__company=company).values('resume_data_id'))
+            | Q(imported_by=company)
+        ).order_by('id').values('id', *RESUME_FIELDS, 'created_at', candidate_email=F('candidate__email'))
+    if kind == 'applications':
+        return JobApplication.objects.filter(job_posting__company=company).order_by('id').values(
+            'id', 'job_posting', *APPLICATION_FIELDS, 'ai_match_score', 'applied_at', 'updated_at',
+            candidate_email=F('candidate__email'), **resume_columns,
+        )
+    raise BulkImportError(f'Unknown kind {kind!r}')
+
+
+class _Echo:
+    # csv.writer target that hands each line back instead of buffering it
+    def write(self, value):
+        return value
+
+
+def iter_export(queryset, fmt, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the rows of a `.values()` queryset as CSV or NDJSON lines"""
+    rows = queryset.iterator(chunk_size=chunk_size)
+    if fmt == 'ndjson':
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+        return
+
+    writer = csv.writer(_Echo())
+    # Same order as the keys of the rows, written even when there are none
+    query = queryset.query
+    yield writer.writerow([*query.extra_select, *query.values_select, *query.annotation_select])
+    for row in rows:
+        yield writer.writerow([
+            json.dumps(value, cls=DjangoJSONEncoder) if isinstance(value, (list, dict)) else value
+            for value in row.values()
+        ])
@@ -0,0 +1,81 @@
+# ==== core/cache.py ====
+"""
+Versioned cache entries.
+
+Every cached value is stored under a key that includes the current version
+of its namespace and scope (a company id, or a shared scope such as the
+public job feed). Invalidating is a single increment of the version; the
+old entries are never read again and simply expire. Writers don't need to
+know which keys exist.
+"""
+import time
+
+from django.core.cache import cache, caches
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.connection import ConnectionProxy
+
+VERSION_TIMEOUT = None
+
+# Seen by every process, for what they can't miss (see CACHES['shared'])
+shared_cache = ConnectionProxy(caches, 'shared')
+
+
+def _initial_version():
+    # Not 1: if the backend evicts a version key, starting over from 1 would
+    # bring back entries cached under the old versions
+    return int(time.time() * 1000)
+
+
+def _version_key(namespace, scope):
+    return f'{namespace}:{scope}:version'
+
+
+def _changed_key(namespace, scope):
+    return f'{namespace}:{scope}:changed'
+
+
+def get_version(namespace, scope):
+    key = _version_key(namespace, scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), VERSION_TIMEOUT)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace, scope, changed_at=None):
+    """Invalidate every entry of the scope, `changed_at` is when its data last changed"""
+    _bump(namespace, scope, changed_at)
+    if connection.in_atomic_block:
+        # A request between the bump and the commit would cache the old
+        # data under the new version, so bump again once it's visible
+        transaction.on_commit(lambda: _bump(namespace, scope, changed_at))
+
+
+def _bump(namespace, scope, changed_at):
+    cache.set(_changed_key(namespace, scope), changed_at or timezone.now(), VERSION_TIMEOUT)
+    key = _version_key(namespace, scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # No version yet (or evicted), any new one invalidates
+        cache.add(key, _initial_version(), VERSION_TIMEOUT)
+
+
+def last_changed(namespace, scope):
+    """When the scope's data last changed, None if no change was seen yet"""
+    return cache.get(_changed_key(namespace, scope))
+
+
+def versioned_key(namespace, scope, *parts):
+    version = get_version(namespace, scope)
+    return ':'.join([namespace, str(scope), f'v{version}', *map(str, parts)])
+
+
+def get_or_compute(key, compute, timeout):
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
@@ -0,0 +1,129 @@
+# ==== core/counters.py ====
+"""
+Repair of the counter columns of jobs and companies.
+
+The counters are kept by database triggers (migration 0011) on every write
+to applications, interviews and jobs; they only drift through writes that
+bypass them (triggers disabled for a restore, `session_replication_role`,
+manual fixes). `reconcile()` recounts them in batches, each under a row
+lock of its jobs or companies: concurrent writes wait for the batch instead
+of being counted twice or lost.
+"""
+from django.db import connection, transaction
+
+BATCH_SIZE = 1000
+
+JOB_COUNTERS_SQL = """
+WITH actual AS (
+    SELECT j.id,
+           coalesce(a.total, 0) AS applications_count,
+           coalesce(a.applied, 0) AS applied_count,
+           coalesce(a.under_review, 0) AS under_review_count,
+           coalesce(a.interview_scheduled, 0) AS interview_scheduled_count,
+           coalesce(a.interviewed, 0) AS interviewed_count,
+           coalesce(a.rejected, 0) AS rejected_count,
+           coalesce(a.accepted, 0) AS accepted_count,
+           coalesce(i.total, 0) AS interviews_count,
+           a.last_applied_at
+    FROM core_jobposting j
+    LEFT JOIN (
+        SELECT job_posting_id,
+               count(*) AS total,
+               count(*) FILTER (WHERE status = 'APPLIED') AS applied,
+               count(*) FILTER (WHERE status = 'UNDER_REVIEW') AS under_review,
+               count(*) FILTER (WHERE status = 'INTERVIEW_SCHEDULED') AS interview_scheduled,
+               count(*) FILTER (WHERE status = 'INTERVIEWED') AS interviewed,
+               count(*) FILTER (WHERE status = 'REJECTED') AS rejected,
+               count(*) FILTER (WHERE status = 'ACCEPTED') AS accepted,
+               max(applied_at) AS last_applied_at
+        FROM core_jobapplication WHERE job_posting_id = ANY(%(ids)s) GROUP BY job_posting_id
+    ) a ON a.job_posting_id = j.id
+    LEFT JOIN (
+        SELECT ja.job_posting_id, count(*) AS total
+        FROM core_interview iv JOIN core_jobapplication ja ON ja.id = iv.application_id
+        WHERE ja.job_posting_id = ANY(%(ids)s)
+        GROUP BY ja.job_posting_id
+    ) i ON i.job_posting_id = j.id
+    WHERE j.id = ANY(%(ids)s)
+)
+UPDATE core_jobposting j SET
+    applications_count = actual.applications_count,
+    applied_count = actual.applied_count,
+    under_review_count = actual.under_review_count,
+    interview_scheduled_count = actual.interview_scheduled_count,
+    interviewed_count = actual.interviewed_count,
+    rejected_count = actual.rejected_count,
+    accepted_count = actual.accepted_count,
+    interviews_count = actual.interviews_count,
+    last_applied_at = actual.last_applied_at
+FROM actual
+WHERE j.id = actual.id
+  AND (j.applications_count, j.applied_count, j.under_review_count, j.interview_scheduled_count,
+       j.interviewed_count, j.rejected_count, j.accepted_count, j.interviews_count, j.last_applied_at)
+      IS DISTINCT FROM
+      (actual.applications_count, actual.applied_count, actual.under_review_count,
+       actual.interview_scheduled_count, actual.interviewed_count, actual.rejected_count,
+       actual.accepted_count, actual.interviews_count, actual.last_applied_at)
+RETURNING j.id
+"""
+
+COMPANY_COUNTERS_SQL = """
+WITH actual AS (
+    SELECT c.id,
+           (SELECT count(*) FROM core_jobposting j WHERE j.company_id = c.id AND j.status = 'ACTIVE')
+               AS open_jobs_count,
+           (SELECT count(*) FROM core_jobapplication a JOIN core_jobposting j ON j.id = a.job_posting_id
+            WHERE j.company_id = c.id) AS applications_count
+    FROM core_company c
+    WHERE c.id = ANY(%(ids)s)
+)
+UPDATE core_company c SET
+    open_jobs_count = actual.open_jobs_count,
+    applications_count = actual.applications_count
+FROM actual
+WHERE c.id = actual.id
+  AND (c.open_jobs_count, c.applications_count) IS DISTINCT FROM (actual.open_jobs_count, actual.applications_count)
+RETURNING c.id
+"""
+
+
+def _batches(table, batch_size):
+    """Ids of `table` in ascending batches"""
+    last_id = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT id FROM {table} WHERE id > %s ORDER BY id LIMIT %s', [last_id, batch_size]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def _repair(table, sql, ids, dry_run):
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Locked before counting: the count's snapshot then includes the
+            # writes that held the rows, later ones wait for the commit
+            cursor.execute(f'SELECT id FROM {table} WHERE id = ANY(%s) ORDER BY id FOR UPDATE', [ids])
+            cursor.execute(sql, {'ids': ids})
+            repaired = [row[0] for row in cursor.fetchall()]
+        if dry_run:
+            transaction.set_rollback(True)
+    return repaired
+
+
+def reconcile(dry_run=False, batch_size=BATCH_SIZE):
+    """
+    Recount the counters of every job and company, returns the ids of
+    those that had drifted as {'jobs': [...], 'companies': [...]}.
+    With `dry_run` nothing is written.
+    """
+    jobs, companies = [], []
+    for ids in _batches('core_jobposting', batch_size):
+        jobs.extend(_repair('core_jobposting', JOB_COUNTERS_SQL, ids, dry_run))
+    for ids in _batches('core_company', batch_size):
+        companies.extend(_repair('core_company', COMPANY_COUNTERS_SQL, ids, dry_run))
+    return {'jobs': jobs, 'companies': companies}
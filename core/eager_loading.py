@@ -0,0 +1,125 @@
+# ==== core/eager_loading.py ====
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class EagerLoadingPlan:
+    """select_related / prefetch_related / only() arguments for one serializer tree"""
+
+    def __init__(self):
+        self.select_related = []
+        self.prefetch_related = []
+        self.only = []
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def _unwrap(field):
+    # many=True nested serializers are wrapped in a ListSerializer
+    if isinstance(field, serializers.ListSerializer):
+        return field.child, True
+    if isinstance(field, serializers.ManyRelatedField):
+        return field.child_relation, True
+    return field, False
+
+
+def _concrete_field_names(model):
+    return [f.name for f in model._meta.concrete_fields]
+
+
+def build_plan(model, serializer, plan=None, prefix='', extra_fields=(), annotations=()):
+    """
+    Walk the fields of `serializer` (an instance, so sparse fieldsets are
+    respected) and collect the joins and columns needed to render it for
+    `model` without any further queries. Fields reading one of the
+    queryset's `annotations` need no column.
+    """
+    if plan is None:
+        plan = EagerLoadingPlan()
+
+    columns = set(extra_fields)
+    complete = True
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        source = field.source
+        if source in annotations:
+            continue
+        if source == '*' or '.' in source:
+            # Method fields and dotted sources may touch anything on the object
+            complete = False
+            continue
+
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            # Properties / annotations, we can't tell which columns they read
+            complete = False
+            continue
+
+        nested, many = _unwrap(field)
+        path = prefix + source
+
+        if not model_field.is_relation:
+            columns.add(source)
+            continue
+
+        related_model = model_field.related_model
+        if many or model_field.many_to_many or model_field.one_to_many:
+            if isinstance(nested, serializers.BaseSerializer):
+                related_qs = related_model._default_manager.all()
+                back_field = []
+                if model_field.one_to_many:
+                    # Reverse FK: the child rows need their FK to be matched up
+                    back_field = [model_field.field.name]
+                related_qs = eager_load(related_qs, nested, extra_fields=back_field)
+                plan.prefetch_related.append(Prefetch(path, queryset=related_qs))
+            else:
+                plan.prefetch_related.append(path)
+            continue
+
+        if model_field.concrete:
+            columns.add(source)
+
+        if isinstance(nested, serializers.BaseSerializer):
+            plan.select_related.append(path)
+            build_plan(related_model, nested, plan, prefix=path + '__')
+
+    if not complete:
+        columns.update(_concrete_field_names(model))
+
+    plan.only.extend(prefix + name for name in sorted(columns))
+    return plan
+
+
+def eager_load(queryset, serializer, extra_fields=()):
+    """Return `queryset` with the joins and columns `serializer` will read"""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    plan = build_plan(
+        queryset.model, serializer, extra_fields=extra_fields, annotations=queryset.query.annotations
+    )
+    return plan.apply(queryset)
+
+
+class EagerLoadingMixin:
+    """
+    ViewSet mixin that eager-loads every queryset the view evaluates
+    (list, retrieve, update, destroy) based on the view's serializer.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Keyset pagination reads the ordering columns of the page's rows
+        ordering = [name.lstrip('-') for name in getattr(self, 'keyset_ordering', ())]
+        return eager_load(queryset, self.get_serializer(), extra_fields=ordering)
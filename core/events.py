@@ -0,0 +1,273 @@
+# ==== core/events.py ====
+"""
+Change feed of a company's applications and interviews, streamed to HR
+clients as server-sent events (core.async_views.change_events, ASGI only).
+
+Each change is a `core_changeevent` row written in the same transaction as
+the change itself (core/signals.py, and explicitly by the bulk writes),
+plus a `pg_notify()` that PostgreSQL delivers on commit only. Each process
+holds one LISTEN connection (`listener`), which wakes the company's open
+streams. A stream then reads the new rows in the order of their writing
+transactions, up to the oldest one still running: ids are taken before
+commit, a row with a lower id can still commit after a stream read a higher
+one. So a client reconnecting with Last-Event-ID gets what it missed, and
+a lost notification, or a long transaction holding events back, only
+delays them until the next heartbeat. Between reads a stream holds no
+database connection.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+import psycopg2
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'core_changes'
+BATCH_SIZE = 100
+# How long an EventSource waits before reconnecting, in ms
+RETRY_MS = 3000
+# Between attempts to (re)open the LISTEN connection, in seconds
+RECONNECT_DELAY = 5
+
+
+def _action(created, deleted):
+    return 'deleted' if deleted else 'created' if created else 'updated'
+
+
+def application_event(company_id, application, created=False, deleted=False):
+    data = {} if deleted else {
+        'status': application.status,
+        'job_posting': application.job_posting_id,
+        'candidate': application.candidate_id,
+        'ai_match_score': application.ai_match_score,
+    }
+    return ChangeEvent(
+        company_id=company_id, kind='application', action=_action(created, deleted),
+        object_id=application.pk, data=data,
+    )
+
+
+def interview_event(company_id, interview, created=False, deleted=False):
+    data = {} if deleted else {
+        'status': interview.status,
+        'application': interview.application_id,
+        'interviewer': interview.interviewer_id,
+        'scheduled_time': interview.scheduled_time,
+        'duration_minutes': interview.duration_minutes,
+    }
+    return ChangeEvent(
+        company_id=company_id, kind='interview', action=_action(created, deleted),
+        object_id=interview.pk, data=data,
+    )
+
+
+def record(events):
+    """Save the events and notify their companies' streams once committed"""
+    if not events:
+        return []
+    events = ChangeEvent.objects.bulk_create(events)
+    with connection.cursor() as cursor:
+        # Repeated notifications within a transaction are delivered once
+        cursor.execute(
+            'SELECT pg_notify(%s, company_id::text) FROM unnest(%s::bigint[]) AS company_id',
+            [CHANNEL, sorted({event.company_id for event in events})],
+        )
+    return events
+
+
+def prune(days=None):
+    """Delete events older than `days` (EVENTS_RETENTION_DAYS), returns the count"""
+    cutoff = timezone.now() - timedelta(days=settings.EVENTS_RETENTION_DAYS if days is None else days)
+    deleted, _ = ChangeEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+class Listener:
+    """
+    The process' LISTEN connection. Streams subscribe to a company and get
+    an asyncio.Event that is set when the company has new events.
+    """
+
+    def __init__(self, channel=CHANNEL):
+        self.channel = channel
+        self._subscribers = defaultdict(set)
+        self._connection = None
+        self._loop = None
+        self._retry_at = 0
+
+    async def subscribe(self, company_id):
+        wakeup = asyncio.Event()
+        self._subscribers[company_id].add(wakeup)
+        await self.ensure_connected()
+        return wakeup
+
+    def unsubscribe(self, company_id, wakeup):
+        subscribers = self._subscribers.get(company_id)
+        if subscribers is not None:
+            subscribers.discard(wakeup)
+            if not subscribers:
+                del self._subscribers[company_id]
+        if not self._subscribers:
+            self._close()
+
+    async def ensure_connected(self):
+        loop = asyncio.get_running_loop()
+        if self._connection is not None and self._loop is loop:
+            return
+        if loop.time() < self._retry_at:
+            return
+        self._close()
+        try:
+            conn = await loop.run_in_executor(None, self._connect)
+        except psycopg2.Error:
+            self._retry_at = loop.time() + RECONNECT_DELAY
+            logger.exception('Could not LISTEN for change events, streams fall back to heartbeat polling')
+            return
+        if self._connection is not None:
+            # Another stream connected meanwhile
+            conn.close()
+            return
+        self._connection, self._loop = conn, loop
+        loop.add_reader(conn.fileno(), self._on_readable)
+
+    def _connect(self):
+        conn = psycopg2.connect(**connections['default'].get_connection_params())
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.channel}')
+        return conn
+
+    def _on_readable(self):
+        try:
+            self._connection.poll()
+        except psycopg2.Error:
+            logger.warning('Lost the change event LISTEN connection')
+            self._close()
+            # Let every stream look for what it may have missed
+            for subscribers in self._subscribers.values():
+                for wakeup in subscribers:
+                    wakeup.set()
+            return
+        while self._connection.notifies:
+            notify = self._connection.notifies.pop(0)
+            for wakeup in self._subscribers.get(int(notify.payload), ()):
+                wakeup.set()
+
+    def _close(self):
+        if self._connection is None:
+            return
+        if not self._loop.is_closed():
+            self._loop.remove_reader(self._connection.fileno())
+        self._connection.close()
+        self._connection = self._loop = None
+
+
+listener = Listener()
+
+STREAM_FIELDS = ['id', 'kind', 'action', 'object_id', 'data', 'created_at']
+
+
+def format_event(event):
+    data = json.dumps(event, cls=DjangoJSONEncoder)
+    return f"id: {event['id']}\nevent: {event['kind']}\ndata: {data}\n\n"
+
+
+# The transaction that wrote the event (core_changeevent.xid, migration 0015)
+XID = RawSQL('core_changeevent.xid::text::bigint', [])
+# Written by a transaction that has ended, or by the current one (its own
+# writes are final to it). A transaction still running has an xid of at
+# least the snapshot's xmin, so every event it commits later sorts after
+# those read now by (xid, id).
+ENDED = RawSQL(
+    'core_changeevent.xid < pg_snapshot_xmin(pg_current_snapshot())'
+    ' OR core_changeevent.xid = pg_current_xact_id_if_assigned()',
+    [], output_field=BooleanField(),
+)
+
+
+def _release_connection():
+    # A stream mostly waits: it gives its thread's connection back between
+    # reads (to the pool with DB_POOL), unless in a transaction (tests)
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+def _events(company_id):
+    return ChangeEvent.objects.filter(company_id=company_id).annotate(xid=XID)
+
+
+@sync_to_async
+def _position(company_id, last_event_id):
+    """
+    The (xid, id) of event `last_event_id`, or of the latest one that ended
+    if None. A pruned event falls back on the latest before it.
+    """
+    events = _events(company_id)
+    if last_event_id is None:
+        events = events.filter(ENDED).order_by(RawSQL('core_changeevent.xid', []).desc(), '-id')
+    else:
+        events = events.filter(id__lte=last_event_id).order_by('-id')
+    try:
+        return events.values_list('xid', 'id').first() or (0, 0)
+    finally:
+        _release_connection()
+
+
+@sync_to_async
+def _read(company_id, position):
+    """The next events after `position` that ended, in (xid, id) order"""
+    xid, event_id = position
+    events = (
+        _events(company_id).filter(ENDED)
+        .filter(RawSQL(
+            '(core_changeevent.xid, core_changeevent.id) > (%s::text::xid8, %s)',
+            [xid, event_id], output_field=BooleanField(),
+        ))
+        .order_by(RawSQL('core_changeevent.xid', []), 'id')
+    )
+    try:
+        return list(events.values(*STREAM_FIELDS, 'xid')[:BATCH_SIZE])
+    finally:
+        _release_connection()
+
+
+async def stream(company_id, last_event_id=None):
+    """
+    Yield the company's events after `last_event_id` (from now on if None)
+    as server-sent event messages, and a comment line every
+    EVENTS_HEARTBEAT seconds without any.
+    """
+    position = await _position(company_id, last_event_id)
+    yield f'retry: {RETRY_MS}\n\n'
+
+    wakeup = await listener.subscribe(company_id)
+    try:
+        while True:
+            # Cleared before reading, a notification arriving meanwhile isn't lost
+            wakeup.clear()
+            events = await _read(company_id, position)
+            for event in events:
+                position = (event.pop('xid'), event['id'])
+                yield format_event(event)
+            if len(events) == BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), settings.EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Also keeps proxies from closing an idle connection
+                yield ': heartbeat\n\n'
+                await listener.ensure_connected()
+    finally:
+        listener.unsubscribe(company_id, wakeup)
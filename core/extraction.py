@@ -0,0 +1,169 @@
+# ==== core/extraction.py ====
+"""
+Resume text extraction as a chain of generators:
+
+    iter_text(path) -> iter_lines(chunks) -> extract_fields(lines)
+
+Each stage holds one chunk / paragraph / page at a time, and the collected
+fields are capped, so memory stays bounded whatever the size of the file.
+"""
+import codecs
+import os
+import re
+import zipfile
+import zlib
+from xml.etree.ElementTree import ParseError, iterparse
+
+try:
+    from pypdf import PdfReader
+    from pypdf.errors import PyPdfError
+except ImportError:  # PDF support is optional
+    PdfReader = None
+
+CHUNK_SIZE = 64 * 2 ** 10
+MAX_LINE_LENGTH = 500
+MAX_ITEMS = 50
+MAX_SUMMARY_LENGTH = 2000
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE_RE = re.compile(r'\+?\d[\d\s().-]{7,}\d')
+SKILL_SPLIT_RE = re.compile(r'\s*[,;|•·]\s*')
+
+SECTION_HEADINGS = {
+    'summary': ('summary', 'profile', 'about me', 'objective'),
+    'experience': ('experience', 'work experience', 'employment', 'work history'),
+    'education': ('education', 'studies', 'academic background'),
+    'skills': ('skills', 'technical skills', 'competencies', 'technologies'),
+}
+
+
+class ExtractionError(Exception):
+    pass
+
+
+def _iter_txt(path):
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+def _iter_docx(path):
+    try:
+        with zipfile.ZipFile(path) as archive, archive.open('word/document.xml') as document:
+            # One paragraph at a time, finished elements are cleared
+            for event, element in iterparse(document):
+                if element.tag == WORD_NS + 'p':
+                    yield ''.join(node.text or '' for node in element.iter(WORD_NS + 't')) + '\n'
+                    element.clear()
+    # Not a zip, no document.xml (KeyError), corrupt data or malformed XML
+    except (zipfile.BadZipFile, KeyError, zlib.error, EOFError, ParseError) as exc:
+        raise ExtractionError('Not a valid DOCX file') from exc
+
+
+def _iter_pdf(path):
+    if PdfReader is None:
+        raise ExtractionError('PDF extraction needs the pypdf package')
+    try:
+        reader = PdfReader(path)
+        for page in reader.pages:
+            yield (page.extract_text() or '') + '\n'
+    except PyPdfError as exc:
+        raise ExtractionError('Not a valid PDF file') from exc
+
+
+EXTRACTORS = {
+    '.txt': _iter_txt,
+    '.docx': _iter_docx,
+    '.pdf': _iter_pdf,
+}
+
+
+def iter_text(path):
+    """Yield the text of a resume file in chunks"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXTRACTORS:
+        raise ExtractionError(f'Unsupported file type {extension!r}')
+    return EXTRACTORS[extension](path)
+
+
+def iter_lines(chunks):
+    """Re-chunk text into stripped, non-empty lines of bounded length"""
+    pending = ''
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            line = line.strip()[:MAX_LINE_LENGTH]
+            if line:
+                yield line
+        # A file without newlines must not grow `pending` forever
+        if len(pending) > MAX_LINE_LENGTH:
+            yield pending.strip()[:MAX_LINE_LENGTH]
+            pending = ''
+    if pending.strip():
+        yield pending.strip()[:MAX_LINE_LENGTH]
+
+
+def _heading(line):
+    normalized = line.lower().strip(' :#-*').strip()
+    for section, headings in SECTION_HEADINGS.items():
+        if normalized in headings:
+            return section
+    return None
+
+
+def extract_fields(lines):
+    """Sort lines into resume sections, the result matches `raw_extracted_data`"""
+    data = {
+        'email': None,
+        'phone': None,
+        'summary': '',
+        'skills': [],
+        'experience': [],
+        'education': [],
+    }
+    section = None
+    line_count = 0
+
+    for line in lines:
+        line_count += 1
+        if data['email'] is None:
+            match = EMAIL_RE.search(line)
+            if match:
+                data['email'] = match.group()
+        if data['phone'] is None:
+            match = PHONE_RE.search(line)
+            if match:
+                data['phone'] = match.group().strip()
+
+        heading = _heading(line)
+        if heading:
+            section = heading
+            continue
+
+        if section == 'summary':
+            if len(data['summary']) < MAX_SUMMARY_LENGTH:
+                data['summary'] = (data['summary'] + ' ' + line).strip()[:MAX_SUMMARY_LENGTH]
+        elif section == 'skills':
+            for skill in SKILL_SPLIT_RE.split(line.lstrip('-*• ')):
+                skill = skill.strip()
+                if skill and skill not in data['skills'] and len(data['skills']) < MAX_ITEMS:
+                    data['skills'].append(skill)
+        elif section in ('experience', 'education'):
+            if len(data[section]) < MAX_ITEMS:
+                data[section].append({'description': line.lstrip('-*• ')})
+
+    data['line_count'] = line_count
+    return data
+
+
+def extract_resume(path):
+    """Run the whole pipeline over one file"""
+    return extract_fields(iter_lines(iter_text(path)))
@@ -0,0 +1,17 @@
+# ==== core/hashers.py ====
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher as BasePBKDF2PasswordHasher
+
+
+class PBKDF2PasswordHasher(BasePBKDF2PasswordHasher):
+    """
+    PBKDF2 with the iteration count taken from PASSWORD_HASH_ITERATIONS.
+
+    Hashes made with a different count still verify (the count is part of
+    the stored hash) and are flagged by `must_update`, so changing the
+    setting upgrades or downgrades users as they log in.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
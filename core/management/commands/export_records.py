@@ -0,0 +1,28 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bulk_io import FORMATS, IMPORTERS, export_queryset, iter_export
+from core.models import Company
+
+
+class Command(BaseCommand):
+    help = "Stream a company's jobs, resumes or applications out as CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('--company', required=True, help='Registration code of the company')
+        parser.add_argument('--format', dest='fmt', choices=FORMATS, default='csv')
+        parser.add_argument('--output', default='-', help="Output file, '-' for stdout")
+
+    def handle(self, *args, **options):
+        company = Company.objects.filter(registration_code=options['company']).first()
+        if company is None:
+            raise CommandError(f"Company {options['company']} does not exist")
+
+        lines = iter_export(export_queryset(options['kind'], company), options['fmt'])
+        if options['output'] == '-':
+            sys.stdout.writelines(lines)
+        else:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+                f.writelines(lines)
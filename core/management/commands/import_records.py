@@ -0,0 +1,48 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bulk_io import BATCH_SIZE, IMPORTERS, BulkImportError, format_from_name, iter_records
+from core.models import Company, UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Stream a CSV or NDJSON file of jobs, resumes or applications into a company'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help="File to import, '-' for stdin")
+        parser.add_argument('--company', required=True, help='Registration code of the company')
+        parser.add_argument('--created-by', help='Username of the HR user the jobs are created by')
+        parser.add_argument('--format', dest='fmt', help='csv or ndjson (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        company = Company.objects.filter(registration_code=options['company']).first()
+        if company is None:
+            raise CommandError(f"Company {options['company']} does not exist")
+
+        hr_profiles = UserProfile.objects.select_related('user').filter(company=company, user_type='HR')
+        if options['created_by']:
+            hr_profiles = hr_profiles.filter(user__username=options['created_by'])
+        profile = hr_profiles.order_by('pk').first()
+        if profile is None:
+            raise CommandError(f'No HR user of {company.name} to create the records as')
+
+        path = options['path']
+        fmt = options['fmt'] or format_from_name(path)
+        importer = IMPORTERS[options['kind']](company, user=profile.user, batch_size=options['batch_size'])
+        try:
+            if path == '-':
+                report = importer.run(iter_records(sys.stdin.buffer, fmt))
+            else:
+                with open(path, 'rb') as f:
+                    report = importer.run(iter_records(f, fmt))
+        except (BulkImportError, OSError) as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors']:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['created']} {options['kind']}, {report['error_count']} rows skipped"
+        ))
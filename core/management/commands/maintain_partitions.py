@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Make the coming monthly partitions of applications and interviews and archive the old '
+        'ones of closed jobs (run it daily, e.g. from cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=partitions.MONTHS_AHEAD,
+            help='Make the partitions of the next MONTHS_AHEAD months',
+        )
+        parser.add_argument(
+            '--archive-after', type=int, default=settings.ARCHIVE_AFTER_MONTHS,
+            help='Archive the applications of closed jobs older than ARCHIVE_AFTER months',
+        )
+        parser.add_argument('--batch-size', type=int, default=partitions.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        # Archiving first leaves no old rows to make hot partitions for
+        applications, interviews, archive = partitions.archive(options['archive_after'], options['batch_size'])
+        partitions.freeze(archive)
+        created = partitions.create_partitions(options['months_ahead'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Made {len(created)} partitions, archived {applications} applications and {interviews} interviews'
+        ))
+        if created and options['verbosity'] > 1:
+            self.stdout.write(f"partitions: {', '.join(created)}")
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import events
+
+
+class Command(BaseCommand):
+    help = 'Delete change feed events older than EVENTS_RETENTION_DAYS (run it daily, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.EVENTS_RETENTION_DAYS, help='Keep events of the last DAYS days'
+        )
+
+    def handle(self, *args, **options):
+        deleted = events.prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} events'))
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import recommendations
+
+
+class Command(BaseCommand):
+    help = 'Build the job recommendation index from scratch (needed once, job changes keep it current)'
+
+    def handle(self, *args, **options):
+        count = recommendations.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {count} active jobs in {settings.RECOMMENDATIONS_INDEX_DIR}'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core import counters
+
+
+class Command(BaseCommand):
+    help = 'Recount the application, interview and job counters of jobs and companies, repairing any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what has drifted')
+        parser.add_argument('--batch-size', type=int, default=counters.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        drifted = counters.reconcile(dry_run=options['dry_run'], batch_size=options['batch_size'])
+        verb = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(drifted['jobs'])} jobs and {len(drifted['companies'])} companies with drifted counters"
+        ))
+        for kind in ('jobs', 'companies'):
+            if drifted[kind] and options['verbosity'] > 1:
+                self.stdout.write(f"{kind}: {', '.join(map(str, drifted[kind]))}")
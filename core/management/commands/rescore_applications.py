@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import JobPosting
+from core import scoring
+
+
+class Command(BaseCommand):
+    help = 'Recompute AI match scores for the applications of one or all job postings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, help='Only re-score this job posting')
+        parser.add_argument('--status', help='Only jobs with this status (e.g. ACTIVE)')
+
+    def handle(self, *args, **options):
+        jobs = JobPosting.objects.all()
+        if options['job']:
+            jobs = jobs.filter(pk=options['job'])
+            if not jobs.exists():
+                raise CommandError(f"Job posting {options['job']} does not exist")
+        if options['status']:
+            jobs = jobs.filter(status=options['status'])
+
+        total = 0
+        started = time.perf_counter()
+        for job in jobs.iterator():
+            count = scoring.rescore_job(job)
+            total += count
+            self.stdout.write(f'{job.pk}: {count} applications')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Re-scored {total} applications in {elapsed:.2f}s'))
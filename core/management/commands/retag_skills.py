@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core import signals, skills
+
+
+class Command(BaseCommand):
+    help = 'Recompute the skill tags of every resume and job, e.g. after loading a skill vocabulary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=skills.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        resumes, companies = skills.retag_all(batch_size=options['batch_size'])
+        for company_id in companies:
+            signals.invalidate_job_lists(company_id)
+        self.stdout.write(self.style.SUCCESS(
+            f'Retagged {resumes} resumes and the jobs of {len(companies)} companies'
+        ))
@@ -0,0 +1,80 @@
+import logging
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from core import queue
+
+logger = logging.getLogger(__name__)
+
+_stopping = False
+
+
+def _request_stop(signum, frame):
+    global _stopping
+    _stopping = True
+
+
+def work(batch_size, poll_interval, once=False):
+    """Worker loop: claim, run, sleep when the queue is empty"""
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    while not _stopping:
+        close_old_connections()
+        try:
+            tasks = queue.claim(batch_size)
+        except Exception:
+            # e.g. the database restarting, keep the worker alive and retry
+            logger.exception('Could not claim tasks')
+            connections.close_all()
+            time.sleep(poll_interval)
+            continue
+        for t in tasks:
+            queue.execute(t)
+        if once and not tasks:
+            return
+        if not tasks:
+            time.sleep(poll_interval)
+
+
+class Command(BaseCommand):
+    help = 'Run background task workers (resume parsing, match scoring, notifications)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.WORKER_PROCESSES,
+            help='Number of worker processes (default: WORKER_PROCESSES setting)',
+        )
+        parser.add_argument('--batch-size', type=int, default=1, help='Tasks claimed per poll')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when idle')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        processes = max(options['processes'], 1)
+        worker_args = (options['batch_size'], options['poll_interval'], options['once'])
+
+        if processes == 1:
+            self.stdout.write('Starting worker')
+            work(*worker_args)
+            return
+
+        # Forked children must not share the parent's database connection
+        connections.close_all()
+        pool = [
+            multiprocessing.Process(target=work, args=worker_args, name=f'worker-{i}')
+            for i in range(processes)
+        ]
+        for process in pool:
+            process.start()
+        self.stdout.write(f'Started {processes} worker processes')
+
+        # The children stop on SIGTERM/SIGINT too, just wait for them
+        signal.signal(signal.SIGTERM, lambda signum, frame: [p.terminate() for p in pool])
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for process in pool:
+            process.join()
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from core import recommendations
+from core.seeding import BATCH_SIZE, SCALES, Scale, Seeder
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic companies, jobs, resumes, applications and interviews for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', default='10k',
+            help=f"Number of applications: {', '.join(SCALES)} or a plain number (default: 10k)",
+        )
+        parser.add_argument('--companies', type=int, help='Override the derived number of companies')
+        parser.add_argument('--jobs-per-company', type=int, help='Override the derived number of jobs per company')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, same seed same data')
+        parser.add_argument('--password', default='benchmark', help='Password of the generated HR users')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        scale_name = options['scale'].lower()
+        try:
+            applications = SCALES[scale_name] if scale_name in SCALES else int(scale_name.replace('_', ''))
+        except ValueError:
+            raise CommandError(f"Unknown scale {options['scale']!r}")
+
+        scale = Scale.for_applications(applications)
+        if options['companies']:
+            scale.companies = options['companies']
+        if options['jobs_per_company']:
+            scale.jobs_per_company = options['jobs_per_company']
+
+        seeder = Seeder(
+            scale, seed=options['seed'], password=options['password'], batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+        result = seeder.run()
+        # The jobs were bulk created, without index updates
+        self.stdout.write(f'Indexed {recommendations.rebuild()} active jobs for recommendations')
+
+        hr_user_id = next(iter(result['hr_users'].values()))[0]
+        token = Token.objects.select_related('user').get(user_id=hr_user_id)
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {result['applications']} applications in {len(result['companies'])} companies.\n"
+            f"Log in as {token.user.email} / {options['password']}, or use the API token {token.key}"
+        ))
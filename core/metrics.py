@@ -0,0 +1,286 @@
+# ==== core/metrics.py ====
+"""
+In-process request metrics, exposed in the Prometheus text format at
+/api/metrics/.
+
+RequestMetricsMiddleware (core/middleware.py) opens a `RequestStats` for
+each request. The database execute wrapper installed on every connection
+and DynamicFieldsMixin add their timings to the stats of the current
+request through a context variable, so the async ORM's worker threads
+count too. Each process keeps its own figures: scrape every worker, or
+sum them in the query.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from collections import Counter as _Tally
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Repeated query signatures logged per process, not to flood the log
+MAX_LOGGED_SIGNATURES = 1000
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_value(self, key, value):
+        yield f'{self.name}{_format_labels(self.labels, key)} {_format_number(value)}'
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def _render_value(self, key, value):
+        yield f'{self.name}{_format_labels(self.labels, key)} {_format_number(value)}'
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0)
+            # A new list, render() reads the stored ones outside the lock
+            counts = list(counts)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def _render_value(self, key, value):
+        counts, total = value
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), counts):
+            cumulative += count
+            le = bound if bound == '+Inf' else _format_number(bound)
+            yield f'{self.name}_bucket{_format_labels(self.labels, key, [("le", le)])} {cumulative}'
+        yield f'{self.name}_sum{_format_labels(self.labels, key)} {_format_number(total)}'
+        yield f'{self.name}_count{_format_labels(self.labels, key)} {cumulative}'
+
+
+REQUEST_LABELS = ('view', 'method')
+
+requests_total = Counter(
+    'talentflow_requests_total', 'Requests handled, by view, method and status code',
+    ('view', 'method', 'status'),
+)
+request_duration = Histogram(
+    'talentflow_request_duration_seconds', 'Wall time of the view and the middleware below it', REQUEST_LABELS,
+)
+db_queries = Histogram(
+    'talentflow_request_db_queries', 'Database queries per request', REQUEST_LABELS, QUERY_COUNT_BUCKETS,
+)
+db_duration = Histogram(
+    'talentflow_request_db_duration_seconds', 'Time spent in database queries per request', REQUEST_LABELS,
+)
+serializer_duration = Histogram(
+    'talentflow_request_serializer_duration_seconds',
+    'Time spent in serializers per request, lazy loads they trigger included', REQUEST_LABELS,
+)
+response_size = Histogram(
+    'talentflow_response_size_bytes', 'Response body size, streaming responses excluded', REQUEST_LABELS,
+    SIZE_BUCKETS,
+)
+repeated_queries = Counter(
+    'talentflow_repeated_queries_total',
+    'Executions of a query signature beyond its first, in requests where it ran at least '
+    'METRICS_REPEATED_QUERY_THRESHOLD times (N+1 candidates)',
+    ('view',),
+)
+
+
+# Connection pools of the core.postgresql_pool backend (core/pool.py), by database alias
+POOL_LABELS = ('pool',)
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+pool_checkout_duration = Histogram(
+    'talentflow_db_pool_checkout_seconds',
+    'Time to get a pooled connection, waiting for a free one and connecting included', POOL_LABELS, WAIT_BUCKETS,
+)
+pool_waits = Counter(
+    'talentflow_db_pool_waits_total', 'Checkouts that waited for a connection to be returned', POOL_LABELS,
+)
+pool_timeouts = Counter(
+    'talentflow_db_pool_timeouts_total', 'Checkouts that gave up waiting for a connection', POOL_LABELS,
+)
+pool_opened = Counter('talentflow_db_pool_opened_total', 'Connections opened by the pool', POOL_LABELS)
+pool_discarded = Counter(
+    'talentflow_db_pool_discarded_total', 'Connections the pool closed, by reason', ('pool', 'reason'),
+)
+pool_connections = Gauge(
+    'talentflow_db_pool_connections', 'Connections of the pool, idle or in use', ('pool', 'state'),
+)
+
+REGISTRY = [
+    requests_total, request_duration, db_queries, db_duration, serializer_duration, response_size,
+    repeated_queries, pool_checkout_duration, pool_waits, pool_timeouts, pool_opened, pool_discarded,
+    pool_connections,
+]
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def clear():
+    for metric in REGISTRY:
+        metric.clear()
+
+
+class RequestStats:
+    """What one request spent, filled in while it runs"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        # SQL with placeholders, so the same query with other parameters matches
+        self.signatures = _Tally()
+
+    def add_query(self, sql, duration):
+        self.queries += 1
+        self.db_time += duration
+        self.signatures[sql] += 1
+
+
+_current = contextvars.ContextVar('request_stats', default=None)
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # connection_created is sent again on reconnects of the same wrapper
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@contextmanager
+def serializer_timer():
+    """Time the outermost serializer call, nested ones are part of it"""
+    stats = _current.get()
+    if stats is None or stats.serializer_depth:
+        yield
+        return
+    stats.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_time += time.perf_counter() - started
+        stats.serializer_depth -= 1
+
+
+_logged_signatures = set()
+
+
+def observe(stats, view, method, status, size=None):
+    duration = time.perf_counter() - stats.started
+    requests_total.inc(view=view, method=method, status=status)
+    request_duration.observe(duration, view=view, method=method)
+    db_queries.observe(stats.queries, view=view, method=method)
+    db_duration.observe(stats.db_time, view=view, method=method)
+    serializer_duration.observe(stats.serializer_time, view=view, method=method)
+    if size is not None:
+        response_size.observe(size, view=view, method=method)
+
+    threshold = settings.METRICS_REPEATED_QUERY_THRESHOLD
+    for sql, count in stats.signatures.items():
+        if count < threshold:
+            continue
+        repeated_queries.inc(count - 1, view=view)
+        if (view, sql) not in _logged_signatures and len(_logged_signatures) < MAX_LOGGED_SIGNATURES:
+            _logged_signatures.add((view, sql))
+            logger.warning('%s %s ran the same query %d times: %s', method, view, count, sql)
+    return duration
@@ -0,0 +1,157 @@
+# ==== core/middleware.py ====
+import cProfile
+import logging
+import os
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.permissions import SAFE_METHODS
+
+from .authentication import CachedTokenAuthentication
+from . import metrics, replicas
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+def _is_admin(request):
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    # Token clients aren't authenticated before the view, the token cache makes this cheap
+    try:
+        result = CachedTokenAuthentication().authenticate(request)
+    except exceptions.AuthenticationFailed:
+        return False
+    return bool(result and result[0].is_staff)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records wall time, database queries and time, serializer time and
+    response size of every request into core.metrics.
+
+    Admins get a cProfile dump of a request by sending `X-Profile: 1`; a
+    PROFILE_SAMPLE_RATE share of all requests is profiled as well. Dumps go
+    to PROFILE_DIR (read them with `python -m pstats`); on-demand responses
+    name the file in `X-Profile-File`. Async requests aren't profiled, cProfile
+    only follows the current thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        profiler, on_demand = self._profiler(request)
+        stats, token = metrics.start_request()
+        try:
+            if profiler is None:
+                response = self.get_response(request)
+            else:
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+        finally:
+            metrics.end_request(token)
+
+        self._observe(request, response, stats)
+        if profiler is not None:
+            name = self._save_profile(request, profiler)
+            if name and on_demand:
+                response['X-Profile-File'] = name
+        return response
+
+    async def __acall__(self, request):
+        stats, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        self._observe(request, response, stats)
+        return response
+
+    def _observe(self, request, response, stats):
+        size = None if response.streaming else len(response.content)
+        metrics.observe(stats, _view_name(request), request.method, response.status_code, size)
+
+    def _profiler(self, request):
+        on_demand = request.headers.get(PROFILE_HEADER) == '1' and _is_admin(request)
+        if on_demand or random.random() < settings.PROFILE_SAMPLE_RATE:
+            return cProfile.Profile(), on_demand
+        return None, False
+
+    def _save_profile(self, request, profiler):
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{random.getrandbits(32):08x}.prof"
+        try:
+            os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(os.path.join(settings.PROFILE_DIR, name))
+        except OSError:
+            logger.exception('Could not write the profile of %s %s', request.method, request.path)
+            return None
+        logger.info('Profiled %s %s into %s', request.method, request.path, name)
+        return name
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Scopes the replica routing of core/replicas.py to the request: admin
+    changelists read from a replica, and a successful write pins the user to
+    the primary. Needs request.user, the API views set it when they
+    authenticate.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with replicas.primary():
+            response = self.get_response(request)
+        self._pin_writer(request, response)
+        return response
+
+    async def __acall__(self, request):
+        with replicas.primary():
+            response = await self.get_response(request)
+        self._pin_writer(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (
+            request.method in SAFE_METHODS and match.namespace == 'admin'
+            and (match.url_name or '').endswith('_changelist')
+        ):
+            replicas.read_from_replica(request.user)
+
+    def _pin_writer(self, request, response):
+        user = getattr(request, 'user', None)
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return
+        if user is not None and user.is_authenticated:
+            replicas.pin(user.pk)
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['interviewer', 'scheduled_time'], name='interview_interviewer_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(condition=models.Q(('status', 'SCHEDULED')), fields=['scheduled_time'], name='interview_upcoming_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job_posting', 'status', '-ai_match_score'], name='jobapp_job_status_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['candidate', '-applied_at'], name='jobapp_candidate_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['company', 'status', '-created_at'], name='jobposting_company_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(condition=models.Q(('status', 'ACTIVE')), fields=['-created_at'], name='jobposting_active_idx'),
+        ),
+    ]
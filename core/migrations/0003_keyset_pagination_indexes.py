@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tenant_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['scheduled_time', 'id'], name='interview_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job_posting', '-applied_at', '-id'], name='jobapp_job_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['-applied_at', '-id'], name='jobapp_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['company', '-created_at', '-id'], name='jobposting_company_keyset_idx'),
+        ),
+    ]
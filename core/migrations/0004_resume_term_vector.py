@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumedata',
+            name='term_vector',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
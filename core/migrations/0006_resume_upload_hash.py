@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_task_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumedata',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='resumedata',
+            constraint=models.UniqueConstraint(condition=models.Q(('content_hash__isnull', False)), fields=('candidate', 'content_hash'), name='resume_candidate_hash_uniq'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:17
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# The search documents are built by BEFORE triggers, so they stay current for
+# every write path (ORM saves, bulk_create, raw SQL, COPY imports).
+JOBPOSTING_TRIGGER = """
+CREATE FUNCTION core_jobposting_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.requirements, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.department, '') || ' ' || coalesce(NEW.location, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_jobposting_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, requirements, department, location
+    ON core_jobposting FOR EACH ROW EXECUTE FUNCTION core_jobposting_search_vector();
+
+UPDATE core_jobposting SET title = title;
+"""
+
+RESUMEDATA_TRIGGER = """
+CREATE FUNCTION core_resumedata_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.full_name, '')), 'A') ||
+        setweight(jsonb_to_tsvector('english', coalesce(NEW.skills, '[]'::jsonb), '["string"]'), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.summary, '')), 'B') ||
+        setweight(jsonb_to_tsvector('english', coalesce(NEW.experience, '[]'::jsonb), '["string"]'), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_resumedata_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF full_name, skills, summary, experience
+    ON core_resumedata FOR EACH ROW EXECUTE FUNCTION core_resumedata_search_vector();
+
+UPDATE core_resumedata SET full_name = full_name;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_resume_upload_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumedata',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='jobposting_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumedata',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='resume_search_idx'),
+        ),
+        migrations.RunSQL(
+            JOBPOSTING_TRIGGER,
+            reverse_sql="""
+            DROP TRIGGER core_jobposting_search_vector_trigger ON core_jobposting;
+            DROP FUNCTION core_jobposting_search_vector();
+            """,
+        ),
+        migrations.RunSQL(
+            RESUMEDATA_TRIGGER,
+            reverse_sql="""
+            DROP TRIGGER core_resumedata_search_vector_trigger ON core_resumedata;
+            DROP FUNCTION core_resumedata_search_vector();
+            """,
+        ),
+    ]
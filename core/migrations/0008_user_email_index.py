@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0007_full_text_search'),
+    ]
+
+    operations = [
+        # Login looks users up with email__iexact, which Django compiles to
+        # UPPER("auth_user"."email"::text) = UPPER(%s) on PostgreSQL
+        migrations.RunSQL(
+            'CREATE INDEX auth_user_email_upper_idx ON auth_user (UPPER(email::text));',
+            reverse_sql='DROP INDEX auth_user_email_upper_idx;',
+        ),
+    ]
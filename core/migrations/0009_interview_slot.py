@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:36
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.db import migrations, models
+
+
+# Like the search documents (0007), the slot is set by a BEFORE trigger so
+# every write path fills it before the exclusion constraint is checked.
+SLOT_TRIGGER = """
+CREATE FUNCTION core_interview_slot() RETURNS trigger AS $$
+BEGIN
+    NEW.slot := tstzrange(
+        NEW.scheduled_time, NEW.scheduled_time + make_interval(mins => NEW.duration_minutes), '[)'
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_interview_slot_trigger
+    BEFORE INSERT OR UPDATE OF scheduled_time, duration_minutes, slot
+    ON core_interview FOR EACH ROW EXECUTE FUNCTION core_interview_slot();
+
+UPDATE core_interview SET scheduled_time = scheduled_time;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_user_email_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='slot',
+            field=django.contrib.postgres.fields.ranges.DateTimeRangeField(editable=False, null=True),
+        ),
+        migrations.RunSQL(
+            SLOT_TRIGGER,
+            reverse_sql="""
+            DROP TRIGGER core_interview_slot_trigger ON core_interview;
+            DROP FUNCTION core_interview_slot();
+            """,
+        ),
+        # Fails if scheduled interviews already overlap; cancel or move them first
+        migrations.AddConstraint(
+            model_name='interview',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ['SCHEDULED', 'RESCHEDULED'])), expressions=[(models.Func('interviewer', 'interviewer', models.Value('[]'), function='int4range', output_field=django.contrib.postgres.fields.ranges.IntegerRangeField()), '&&'), ('slot', '&&')], name='interview_no_double_booking'),
+        ),
+    ]
@@ -0,0 +1,313 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+# Statement-level AFTER triggers with transition tables: a bulk_create or a
+# queryset .update() of thousands of rows adds up its changes per job and
+# updates each job and company row once. Like the search documents (0007)
+# they cover every write path, signals or not. A transition table trigger
+# fires for a single event, hence three triggers per table; each function
+# picks the rows that changed by TG_OP.
+APPLICATION_TRIGGER = """
+CREATE FUNCTION core_application_counters() RETURNS trigger AS $$
+DECLARE
+    changes text;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT job_posting_id, status, applied_at, 1 AS n FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := 'SELECT job_posting_id, status, applied_at, -1 AS n FROM old_rows';
+    ELSE
+        -- Updates count as a removal and an addition, when they move an application
+        changes := 'WITH moved AS (
+                SELECT o.job_posting_id AS old_job, o.status AS old_status, o.applied_at AS old_applied_at,
+                       r.job_posting_id, r.status, r.applied_at
+                FROM old_rows o JOIN new_rows r ON r.id = o.id
+                WHERE (o.job_posting_id, o.status, o.applied_at) IS DISTINCT FROM (r.job_posting_id, r.status, r.applied_at)
+            )
+            SELECT old_job, old_status, old_applied_at, -1 AS n FROM moved
+            UNION ALL
+            SELECT job_posting_id, status, applied_at, 1 FROM moved';
+    END IF;
+
+    EXECUTE format($sql$
+        WITH changes (job_posting_id, status, applied_at, n) AS (%s),
+        deltas AS (
+            SELECT job_posting_id,
+                   sum(n) AS total,
+                   coalesce(sum(n) FILTER (WHERE status = 'APPLIED'), 0) AS applied,
+                   coalesce(sum(n) FILTER (WHERE status = 'UNDER_REVIEW'), 0) AS under_review,
+                   coalesce(sum(n) FILTER (WHERE status = 'INTERVIEW_SCHEDULED'), 0) AS interview_scheduled,
+                   coalesce(sum(n) FILTER (WHERE status = 'INTERVIEWED'), 0) AS interviewed,
+                   coalesce(sum(n) FILTER (WHERE status = 'REJECTED'), 0) AS rejected,
+                   coalesce(sum(n) FILTER (WHERE status = 'ACCEPTED'), 0) AS accepted,
+                   max(applied_at) FILTER (WHERE n > 0) AS added_at,
+                   max(applied_at) FILTER (WHERE n < 0) AS removed_at
+            FROM changes GROUP BY job_posting_id
+        ),
+        jobs AS (
+            UPDATE core_jobposting j SET
+                applications_count = j.applications_count + d.total,
+                applied_count = j.applied_count + d.applied,
+                under_review_count = j.under_review_count + d.under_review,
+                interview_scheduled_count = j.interview_scheduled_count + d.interview_scheduled,
+                interviewed_count = j.interviewed_count + d.interviewed,
+                rejected_count = j.rejected_count + d.rejected,
+                accepted_count = j.accepted_count + d.accepted,
+                -- Only a removal of the latest application needs a look at the others
+                last_applied_at = CASE
+                    WHEN d.removed_at >= j.last_applied_at THEN
+                        (SELECT max(a.applied_at) FROM core_jobapplication a WHERE a.job_posting_id = j.id)
+                    ELSE greatest(j.last_applied_at, d.added_at)
+                END
+            FROM deltas d
+            WHERE j.id = d.job_posting_id
+            RETURNING j.company_id, d.total
+        )
+        UPDATE core_company c SET applicants_count = c.applicants_count + t.total
+        FROM (SELECT company_id, sum(total) AS total FROM jobs GROUP BY company_id) t
+        WHERE c.id = t.company_id AND t.total <> 0
+    $sql$, changes);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_application_counters_insert
+    AFTER INSERT ON core_jobapplication REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_application_counters();
+CREATE TRIGGER core_application_counters_update
+    AFTER UPDATE ON core_jobapplication REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_application_counters();
+CREATE TRIGGER core_application_counters_delete
+    AFTER DELETE ON core_jobapplication REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_application_counters();
+"""
+
+INTERVIEW_TRIGGER = """
+CREATE FUNCTION core_interview_counters() RETURNS trigger AS $$
+DECLARE
+    changes text;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT application_id, 1 AS n FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := 'SELECT application_id, -1 AS n FROM old_rows';
+    ELSE
+        changes := 'SELECT o.application_id, -1 AS n FROM old_rows o JOIN new_rows r ON r.id = o.id
+                WHERE o.application_id <> r.application_id
+            UNION ALL
+            SELECT r.application_id, 1 FROM old_rows o JOIN new_rows r ON r.id = o.id
+                WHERE o.application_id <> r.application_id';
+    END IF;
+
+    EXECUTE format($sql$
+        WITH changes (application_id, n) AS (%s)
+        UPDATE core_jobposting j SET interviews_count = j.interviews_count + d.n
+        FROM (
+            SELECT a.job_posting_id, sum(c.n) AS n
+            FROM changes c JOIN core_jobapplication a ON a.id = c.application_id
+            GROUP BY a.job_posting_id
+        ) d
+        WHERE j.id = d.job_posting_id AND d.n <> 0
+    $sql$, changes);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_interview_counters_insert
+    AFTER INSERT ON core_interview REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_counters();
+CREATE TRIGGER core_interview_counters_update
+    AFTER UPDATE ON core_interview REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_counters();
+CREATE TRIGGER core_interview_counters_delete
+    AFTER DELETE ON core_interview REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_counters();
+"""
+
+JOBPOSTING_TRIGGER = """
+CREATE FUNCTION core_jobposting_counters() RETURNS trigger AS $$
+DECLARE
+    changes text;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT company_id, status, applications_count, 1 AS n FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := 'SELECT company_id, status, applications_count, -1 AS n FROM old_rows';
+    ELSE
+        -- The application trigger updates jobs too, their counts are on the company already
+        changes := 'WITH moved AS (
+                SELECT o.company_id AS old_company, o.status AS old_status, o.applications_count AS old_count,
+                       r.company_id, r.status, r.applications_count
+                FROM old_rows o JOIN new_rows r ON r.id = o.id
+                WHERE (o.company_id, o.status) IS DISTINCT FROM (r.company_id, r.status)
+            )
+            SELECT old_company, old_status, old_count, -1 AS n FROM moved
+            UNION ALL
+            SELECT company_id, status, applications_count, 1 FROM moved';
+    END IF;
+
+    EXECUTE format($sql$
+        WITH changes (company_id, status, applications_count, n) AS (%s)
+        UPDATE core_company c SET
+            open_jobs_count = c.open_jobs_count + d.open_jobs,
+            applicants_count = c.applicants_count + d.applicants
+        FROM (
+            SELECT company_id,
+                   coalesce(sum(n) FILTER (WHERE status = 'ACTIVE'), 0) AS open_jobs,
+                   sum(n * applications_count) AS applicants
+            FROM changes GROUP BY company_id
+        ) d
+        WHERE c.id = d.company_id AND (d.open_jobs <> 0 OR d.applicants <> 0)
+    $sql$, changes);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_jobposting_counters_insert
+    AFTER INSERT ON core_jobposting REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_jobposting_counters();
+CREATE TRIGGER core_jobposting_counters_update
+    AFTER UPDATE ON core_jobposting REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_jobposting_counters();
+CREATE TRIGGER core_jobposting_counters_delete
+    AFTER DELETE ON core_jobposting REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_jobposting_counters();
+"""
+
+# Counters of the existing rows (core.counters.reconcile recounts them the same way)
+BACKFILL = """
+UPDATE core_jobposting j SET
+    applications_count = coalesce(a.total, 0),
+    applied_count = coalesce(a.applied, 0),
+    under_review_count = coalesce(a.under_review, 0),
+    interview_scheduled_count = coalesce(a.interview_scheduled, 0),
+    interviewed_count = coalesce(a.interviewed, 0),
+    rejected_count = coalesce(a.rejected, 0),
+    accepted_count = coalesce(a.accepted, 0),
+    interviews_count = coalesce(i.total, 0),
+    last_applied_at = a.last_applied_at
+FROM core_jobposting j2
+LEFT JOIN (
+    SELECT job_posting_id,
+           count(*) AS total,
+           count(*) FILTER (WHERE status = 'APPLIED') AS applied,
+           count(*) FILTER (WHERE status = 'UNDER_REVIEW') AS under_review,
+           count(*) FILTER (WHERE status = 'INTERVIEW_SCHEDULED') AS interview_scheduled,
+           count(*) FILTER (WHERE status = 'INTERVIEWED') AS interviewed,
+           count(*) FILTER (WHERE status = 'REJECTED') AS rejected,
+           count(*) FILTER (WHERE status = 'ACCEPTED') AS accepted,
+           max(applied_at) AS last_applied_at
+    FROM core_jobapplication GROUP BY job_posting_id
+) a ON a.job_posting_id = j2.id
+LEFT JOIN (
+    SELECT ja.job_posting_id, count(*) AS total
+    FROM core_interview iv JOIN core_jobapplication ja ON ja.id = iv.application_id
+    GROUP BY ja.job_posting_id
+) i ON i.job_posting_id = j2.id
+WHERE j.id = j2.id;
+
+UPDATE core_company c SET
+    open_jobs_count = coalesce(j.open_jobs, 0),
+    applicants_count = coalesce(j.applicants, 0)
+FROM core_company c2
+LEFT JOIN (
+    SELECT company_id, count(*) FILTER (WHERE status = 'ACTIVE') AS open_jobs, sum(applications_count) AS applicants
+    FROM core_jobposting GROUP BY company_id
+) j ON j.company_id = c2.id
+WHERE c.id = c2.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_change_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='applicants_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='open_jobs_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='accepted_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='applications_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='applied_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='interview_scheduled_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='interviewed_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='interviews_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='last_applied_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='rejected_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='under_review_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            APPLICATION_TRIGGER,
+            reverse_sql="""
+            DROP TRIGGER core_application_counters_insert ON core_jobapplication;
+            DROP TRIGGER core_application_counters_update ON core_jobapplication;
+            DROP TRIGGER core_application_counters_delete ON core_jobapplication;
+            DROP FUNCTION core_application_counters();
+            """,
+        ),
+        migrations.RunSQL(
+            INTERVIEW_TRIGGER,
+            reverse_sql="""
+            DROP TRIGGER core_interview_counters_insert ON core_interview;
+            DROP TRIGGER core_interview_counters_update ON core_interview;
+            DROP TRIGGER core_interview_counters_delete ON core_interview;
+            DROP FUNCTION core_interview_counters();
+            """,
+        ),
+        migrations.RunSQL(
+            JOBPOSTING_TRIGGER,
+            reverse_sql="""
+            DROP TRIGGER core_jobposting_counters_insert ON core_jobposting;
+            DROP TRIGGER core_jobposting_counters_update ON core_jobposting;
+            DROP TRIGGER core_jobposting_counters_delete ON core_jobposting;
+            DROP FUNCTION core_jobposting_counters();
+            """,
+        ),
+        migrations.RunSQL(BACKFILL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,196 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:13
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+
+
+# Skill tags are normalized in the database by the functions below, called
+# from BEFORE triggers like the search documents (0007), so they hold for
+# every write path. core/skills.py mirrors core_skill_term() for query terms.
+SKILL_TAGS_SQL = r"""
+CREATE FUNCTION core_skill_term(term text) RETURNS text AS $$
+    SELECT regexp_replace(lower(btrim(term)), '\s+', ' ', 'g')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Canonical spellings: the aliases and the skill names themselves
+CREATE VIEW core_skill_terms AS
+    SELECT alias AS term, skill_id FROM core_skillalias
+    UNION ALL
+    SELECT lower(name), id FROM core_skill;
+
+-- Resume skills are whole entries: known ones map to their skill, others are kept
+CREATE FUNCTION core_resume_skill_tags(skills jsonb) RETURNS jsonb AS $$
+    SELECT coalesce(jsonb_agg(DISTINCT coalesce(lower(s.name), e.term)), '[]'::jsonb)
+    FROM (
+        SELECT core_skill_term(value) AS term
+        FROM jsonb_array_elements_text(CASE WHEN jsonb_typeof(skills) = 'array' THEN skills ELSE '[]' END)
+    ) e
+    LEFT JOIN core_skill_terms t ON t.term = e.term
+    LEFT JOIN core_skill s ON s.id = t.skill_id
+    WHERE e.term <> ''
+$$ LANGUAGE sql STABLE;
+
+-- Requirements are prose: the skills whose spellings appear in it as words
+-- (phrases of up to three)
+CREATE FUNCTION core_job_skill_tags(requirements text) RETURNS jsonb AS $$
+    WITH words AS (
+        SELECT m[1] AS word, n
+        FROM regexp_matches(lower(coalesce(requirements, '')), '([a-z0-9+#]+(?:[./-][a-z0-9+#]+)*)', 'g')
+            WITH ORDINALITY AS w(m, n)
+    ), phrases AS (
+        SELECT word AS phrase FROM words
+        UNION
+        SELECT w1.word || ' ' || w2.word FROM words w1 JOIN words w2 ON w2.n = w1.n + 1
+        UNION
+        SELECT w1.word || ' ' || w2.word || ' ' || w3.word
+        FROM words w1 JOIN words w2 ON w2.n = w1.n + 1 JOIN words w3 ON w3.n = w1.n + 2
+    )
+    SELECT coalesce(jsonb_agg(DISTINCT lower(s.name)), '[]'::jsonb)
+    FROM phrases p
+    JOIN core_skill_terms t ON t.term = p.phrase
+    JOIN core_skill s ON s.id = t.skill_id
+$$ LANGUAGE sql STABLE;
+
+CREATE FUNCTION core_resumedata_skill_tags() RETURNS trigger AS $$
+BEGIN
+    NEW.skill_tags := core_resume_skill_tags(NEW.skills);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_resumedata_skill_tags_trigger
+    BEFORE INSERT OR UPDATE OF skills
+    ON core_resumedata FOR EACH ROW EXECUTE FUNCTION core_resumedata_skill_tags();
+
+CREATE FUNCTION core_jobposting_skill_tags() RETURNS trigger AS $$
+BEGIN
+    NEW.skill_tags := core_job_skill_tags(NEW.requirements);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_jobposting_skill_tags_trigger
+    BEFORE INSERT OR UPDATE OF requirements
+    ON core_jobposting FOR EACH ROW EXECUTE FUNCTION core_jobposting_skill_tags();
+"""
+
+DROP_SKILL_TAGS_SQL = """
+DROP TRIGGER core_jobposting_skill_tags_trigger ON core_jobposting;
+DROP FUNCTION core_jobposting_skill_tags();
+DROP TRIGGER core_resumedata_skill_tags_trigger ON core_resumedata;
+DROP FUNCTION core_resumedata_skill_tags();
+DROP FUNCTION core_job_skill_tags(text);
+DROP FUNCTION core_resume_skill_tags(jsonb);
+DROP VIEW core_skill_terms;
+DROP FUNCTION core_skill_term(text);
+"""
+
+# Set directly rather than through the triggers, which would also rebuild
+# the search documents
+BACKFILL = """
+UPDATE core_resumedata SET skill_tags = core_resume_skill_tags(skills);
+UPDATE core_jobposting SET skill_tags = core_job_skill_tags(requirements);
+"""
+
+# A starting vocabulary, extended in the admin: skill -> aliases
+VOCABULARY = {
+    'AWS': ['amazon web services'],
+    'C#': ['csharp', 'c sharp'],
+    'C++': ['cpp'],
+    'Celery': [],
+    'CI/CD': ['continuous integration', 'continuous delivery'],
+    'Django': ['django rest framework', 'drf'],
+    'Docker': [],
+    'Figma': [],
+    'Go': ['golang'],
+    'GraphQL': [],
+    'Java': [],
+    'JavaScript': ['js', 'ecmascript', 'es6'],
+    'Kafka': ['apache kafka'],
+    'Kubernetes': ['k8s'],
+    'Linux': [],
+    'Machine Learning': ['ml'],
+    'Node.js': ['node', 'nodejs'],
+    'Pandas': [],
+    'PostgreSQL': ['postgres', 'psql', 'pgsql'],
+    'Python': ['python3', 'py'],
+    'React': ['react.js', 'reactjs'],
+    'Redis': [],
+    'REST': ['rest api', 'restful'],
+    'Rust': [],
+    'Spark': ['apache spark', 'pyspark'],
+    'SQL': [],
+    'Terraform': [],
+    'TypeScript': ['ts'],
+}
+
+
+def load_vocabulary(apps, schema_editor):
+    Skill = apps.get_model('core', 'Skill')
+    SkillAlias = apps.get_model('core', 'SkillAlias')
+    for name, aliases in VOCABULARY.items():
+        skill = Skill.objects.create(name=name)
+        SkillAlias.objects.bulk_create(SkillAlias(skill=skill, alias=alias) for alias in aliases)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SkillAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Skill aliases',
+            },
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='skill_tags',
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='resumedata',
+            name='skill_tags',
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_tags'], name='jobposting_skill_tags_idx', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='resumedata',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skill_tags'], name='resume_skill_tags_idx', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddField(
+            model_name='skillalias',
+            name='skill',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='core.skill'),
+        ),
+        migrations.AddConstraint(
+            model_name='skill',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='skill_name_uniq'),
+        ),
+        migrations.RunPython(load_vocabulary, migrations.RunPython.noop),
+        migrations.RunSQL(SKILL_TAGS_SQL, reverse_sql=DROP_SKILL_TAGS_SQL),
+        migrations.RunSQL(BACKFILL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,407 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:12
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Applications and interviews become partitioned tables (core/partitions.py):
+#
+#   core_jobapplication              LIST (archived)
+#     core_jobapplication_hot          false, RANGE (applied_at)
+#       core_jobapplication_p2026_10     a month each
+#       core_jobapplication_hot_default  rows of months without a partition
+#     core_jobapplication_archive      true, RANGE (applied_at)
+#       core_jobapplication_archive_p2024  a year each, made when archiving
+#
+# and the same for core_interview by scheduled_time. The tables are rebuilt
+# and their rows copied, in one transaction: plan for the downtime on big
+# tables. Monthly partitions are made from the month of the oldest row to
+# three months ahead, `manage.py maintain_partitions` makes the later ones.
+#
+# The primary and unique keys of a partitioned table must hold its partition
+# keys, so:
+# - the primary keys are (id, archived, applied_at / scheduled_time), ids
+#   still come from one sequence per table;
+# - interviews point to their application by (application_id, archived,
+#   application_applied_at), kept by a trigger, and follow it into the
+#   archive through ON UPDATE CASCADE;
+# - one application per candidate and job, and no double booking of an
+#   interviewer, are checked by statement-level triggers instead of a
+#   unique and an exclusion constraint. They lock the job / interviewer rows
+#   first, so concurrent writers wait for each other (in READ COMMITTED),
+#   and raise the errors the constraints did, under the same names.
+PARTITION_SQL = """
+SET LOCAL TimeZone = 'UTC';
+
+ALTER TABLE core_interview DROP CONSTRAINT core_interview_application_id_100d603b_fk_core_joba;
+
+CREATE TABLE core_jobapplication_partitioned (
+    LIKE core_jobapplication INCLUDING CONSTRAINTS,
+    archived boolean NOT NULL DEFAULT false
+) PARTITION BY LIST (archived);
+CREATE TABLE core_interview_partitioned (
+    LIKE core_interview INCLUDING CONSTRAINTS,
+    archived boolean NOT NULL DEFAULT false,
+    application_applied_at timestamp with time zone NOT NULL
+) PARTITION BY LIST (archived);
+
+DO $$
+DECLARE
+    spec record;
+    first_month timestamptz;
+    month timestamptz;
+BEGIN
+    FOR spec IN SELECT * FROM (VALUES ('core_jobapplication', 'applied_at'), ('core_interview', 'scheduled_time'))
+            AS t (parent, key) LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES IN (false) PARTITION BY RANGE (%I)',
+            spec.parent || '_hot', spec.parent || '_partitioned', spec.key
+        );
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES IN (true) PARTITION BY RANGE (%I)',
+            spec.parent || '_archive', spec.parent || '_partitioned', spec.key
+        );
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', spec.parent || '_hot_default', spec.parent || '_hot');
+        EXECUTE format('SELECT date_trunc(''month'', min(%I)) FROM %I', spec.key, spec.parent) INTO first_month;
+        FOR month IN SELECT generate_series(
+            least(first_month, date_trunc('month', now())), date_trunc('month', now()) + interval '3 months',
+            interval '1 month'
+        ) LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                spec.parent || to_char(month, '"_p"YYYY_MM'), spec.parent || '_hot', month, month + interval '1 month'
+            );
+        END LOOP;
+    END LOOP;
+END
+$$;
+
+INSERT INTO core_jobapplication_partitioned SELECT *, false FROM core_jobapplication;
+INSERT INTO core_interview_partitioned
+SELECT i.*, false, a.applied_at FROM core_interview i JOIN core_jobapplication a ON a.id = i.application_id;
+
+DROP TABLE core_interview;
+DROP TABLE core_jobapplication;
+ALTER TABLE core_jobapplication_partitioned RENAME TO core_jobapplication;
+ALTER TABLE core_interview_partitioned RENAME TO core_interview;
+
+CREATE SEQUENCE core_jobapplication_id_seq OWNED BY core_jobapplication.id;
+ALTER TABLE core_jobapplication ALTER COLUMN id SET DEFAULT nextval('core_jobapplication_id_seq');
+SELECT setval('core_jobapplication_id_seq', coalesce(max(id), 0) + 1, false) FROM core_jobapplication;
+CREATE SEQUENCE core_interview_id_seq OWNED BY core_interview.id;
+ALTER TABLE core_interview ALTER COLUMN id SET DEFAULT nextval('core_interview_id_seq');
+SELECT setval('core_interview_id_seq', coalesce(max(id), 0) + 1, false) FROM core_interview;
+
+ALTER TABLE core_jobapplication ADD CONSTRAINT core_jobapplication_pkey PRIMARY KEY (id, archived, applied_at);
+CREATE INDEX core_jobapplication_candidate_id_b54ee0c5 ON core_jobapplication (candidate_id);
+CREATE INDEX core_jobapplication_job_posting_id_7732d97a ON core_jobapplication (job_posting_id);
+CREATE INDEX core_jobapplication_resume_data_id_b3970920 ON core_jobapplication (resume_data_id);
+CREATE INDEX jobapp_job_candidate_idx ON core_jobapplication (job_posting_id, candidate_id);
+CREATE INDEX jobapp_job_status_score_idx ON core_jobapplication (job_posting_id, status, ai_match_score DESC);
+CREATE INDEX jobapp_candidate_applied_idx ON core_jobapplication (candidate_id, applied_at DESC);
+CREATE INDEX jobapp_job_keyset_idx ON core_jobapplication (job_posting_id, applied_at DESC, id DESC);
+CREATE INDEX jobapp_keyset_idx ON core_jobapplication (applied_at DESC, id DESC);
+ALTER TABLE core_jobapplication
+    ADD CONSTRAINT core_jobapplication_candidate_id_b54ee0c5_fk_auth_user_id
+        FOREIGN KEY (candidate_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED,
+    ADD CONSTRAINT core_jobapplication_job_posting_id_7732d97a_fk_core_jobp
+        FOREIGN KEY (job_posting_id) REFERENCES core_jobposting (id) DEFERRABLE INITIALLY DEFERRED,
+    ADD CONSTRAINT core_jobapplication_resume_data_id_b3970920_fk_core_resu
+        FOREIGN KEY (resume_data_id) REFERENCES core_resumedata (id) DEFERRABLE INITIALLY DEFERRED;
+
+ALTER TABLE core_interview ADD CONSTRAINT core_interview_pkey PRIMARY KEY (id, archived, scheduled_time);
+CREATE INDEX core_interview_application_id_100d603b ON core_interview (application_id);
+CREATE INDEX core_interview_interviewer_id_c0621c0f ON core_interview (interviewer_id);
+CREATE INDEX interview_interviewer_time_idx ON core_interview (interviewer_id, scheduled_time);
+CREATE INDEX interview_upcoming_idx ON core_interview (scheduled_time) WHERE status = 'SCHEDULED';
+CREATE INDEX interview_keyset_idx ON core_interview (scheduled_time, id);
+CREATE INDEX interview_no_double_booking ON core_interview
+    USING gist (int4range(interviewer_id, interviewer_id, '[]'), slot)
+    WHERE status IN ('SCHEDULED', 'RESCHEDULED');
+ALTER TABLE core_interview
+    ADD CONSTRAINT core_interview_interviewer_id_c0621c0f_fk_auth_user_id
+        FOREIGN KEY (interviewer_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED,
+    ADD CONSTRAINT core_interview_application_fk
+        FOREIGN KEY (application_id, archived, application_applied_at)
+        REFERENCES core_jobapplication (id, archived, applied_at)
+        ON UPDATE CASCADE DEFERRABLE INITIALLY DEFERRED;
+
+CREATE TRIGGER core_interview_slot_trigger
+    BEFORE INSERT OR UPDATE OF scheduled_time, duration_minutes, slot
+    ON core_interview FOR EACH ROW EXECUTE FUNCTION core_interview_slot();
+
+CREATE TRIGGER core_application_counters_insert
+    AFTER INSERT ON core_jobapplication REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_application_counters();
+CREATE TRIGGER core_application_counters_update
+    AFTER UPDATE ON core_jobapplication REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_application_counters();
+CREATE TRIGGER core_application_counters_delete
+    AFTER DELETE ON core_jobapplication REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_application_counters();
+CREATE TRIGGER core_interview_counters_insert
+    AFTER INSERT ON core_interview REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_counters();
+CREATE TRIGGER core_interview_counters_update
+    AFTER UPDATE ON core_interview REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_counters();
+CREATE TRIGGER core_interview_counters_delete
+    AFTER DELETE ON core_interview REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_counters();
+
+CREATE FUNCTION core_interview_application() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' OR NEW.application_id IS DISTINCT FROM OLD.application_id THEN
+        SELECT applied_at INTO NEW.application_applied_at
+        FROM core_jobapplication WHERE id = NEW.application_id;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_interview_application_trigger
+    BEFORE INSERT OR UPDATE OF application_id
+    ON core_interview FOR EACH ROW EXECUTE FUNCTION core_interview_application();
+
+CREATE FUNCTION core_jobapplication_unique() RETURNS trigger AS $$
+DECLARE
+    changes text;
+    duplicate record;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT id, job_posting_id, candidate_id FROM new_rows';
+    ELSE
+        changes := 'SELECT r.id, r.job_posting_id, r.candidate_id
+            FROM old_rows o JOIN new_rows r ON r.id = o.id
+            WHERE (o.job_posting_id, o.candidate_id) IS DISTINCT FROM (r.job_posting_id, r.candidate_id)';
+    END IF;
+
+    -- The check runs once the lock is held, with a snapshot that shows
+    -- what the writers it waited for committed
+    EXECUTE format(
+        'SELECT count(*) FROM (SELECT FROM core_jobposting WHERE id IN (SELECT job_posting_id FROM (%s) c)
+         ORDER BY id FOR NO KEY UPDATE) locked',
+        changes
+    );
+    EXECUTE format($sql$
+        SELECT c.job_posting_id, c.candidate_id
+        FROM (%s) c
+        WHERE EXISTS (
+            SELECT FROM core_jobapplication a
+            WHERE a.job_posting_id = c.job_posting_id AND a.candidate_id = c.candidate_id AND a.id <> c.id
+        )
+        LIMIT 1
+    $sql$, changes) INTO duplicate;
+
+    IF duplicate IS NOT NULL THEN
+        RAISE unique_violation USING
+            MESSAGE = 'duplicate key value violates unique constraint "jobapplication_job_candidate_uniq"',
+            DETAIL = format('Key (job_posting_id, candidate_id)=(%s, %s) already exists.',
+                            duplicate.job_posting_id, duplicate.candidate_id),
+            CONSTRAINT = 'jobapplication_job_candidate_uniq',
+            TABLE = 'core_jobapplication';
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_jobapplication_unique_insert
+    AFTER INSERT ON core_jobapplication REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_jobapplication_unique();
+CREATE TRIGGER core_jobapplication_unique_update
+    AFTER UPDATE ON core_jobapplication REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_jobapplication_unique();
+
+CREATE FUNCTION core_interview_no_double_booking() RETURNS trigger AS $$
+DECLARE
+    changes text;
+    conflict record;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT id, interviewer_id, slot FROM new_rows
+            WHERE status IN (''SCHEDULED'', ''RESCHEDULED'')';
+    ELSE
+        changes := 'SELECT r.id, r.interviewer_id, r.slot
+            FROM old_rows o JOIN new_rows r ON r.id = o.id
+            WHERE r.status IN (''SCHEDULED'', ''RESCHEDULED'')
+              AND (o.interviewer_id, o.slot, o.status) IS DISTINCT FROM (r.interviewer_id, r.slot, r.status)';
+    END IF;
+
+    EXECUTE format(
+        'SELECT count(*) FROM (SELECT FROM auth_user WHERE id IN (SELECT interviewer_id FROM (%s) c)
+         ORDER BY id FOR NO KEY UPDATE) locked',
+        changes
+    );
+    EXECUTE format($sql$
+        SELECT c.interviewer_id, c.slot
+        FROM (%s) c
+        WHERE EXISTS (
+            SELECT FROM core_interview i
+            WHERE int4range(i.interviewer_id, i.interviewer_id, '[]') && int4range(c.interviewer_id, c.interviewer_id, '[]')
+              AND i.slot && c.slot
+              AND i.status IN ('SCHEDULED', 'RESCHEDULED')
+              AND i.id <> c.id
+        )
+        LIMIT 1
+    $sql$, changes) INTO conflict;
+
+    IF conflict IS NOT NULL THEN
+        RAISE exclusion_violation USING
+            MESSAGE = 'conflicting key value violates exclusion constraint "interview_no_double_booking"',
+            DETAIL = format('Interviewer %s is already booked during %s.', conflict.interviewer_id, conflict.slot),
+            CONSTRAINT = 'interview_no_double_booking',
+            TABLE = 'core_interview';
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_interview_no_double_booking_insert
+    AFTER INSERT ON core_interview REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_no_double_booking();
+CREATE TRIGGER core_interview_no_double_booking_update
+    AFTER UPDATE ON core_interview REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_no_double_booking();
+"""
+
+UNPARTITION_SQL = """
+CREATE TABLE core_jobapplication_plain (LIKE core_jobapplication INCLUDING CONSTRAINTS);
+ALTER TABLE core_jobapplication_plain DROP COLUMN archived;
+INSERT INTO core_jobapplication_plain
+SELECT id, status, ai_match_score, ai_match_details, cover_letter, notes, applied_at, updated_at,
+       candidate_id, job_posting_id, resume_data_id
+FROM core_jobapplication;
+
+CREATE TABLE core_interview_plain (LIKE core_interview INCLUDING CONSTRAINTS);
+ALTER TABLE core_interview_plain DROP COLUMN archived, DROP COLUMN application_applied_at;
+INSERT INTO core_interview_plain
+SELECT id, interview_type, scheduled_time, duration_minutes, location, meeting_link, status, notes, feedback,
+       created_at, updated_at, interviewer_id, application_id, slot
+FROM core_interview;
+
+DROP TABLE core_interview;
+DROP TABLE core_jobapplication;
+DROP FUNCTION core_interview_application();
+DROP FUNCTION core_jobapplication_unique();
+DROP FUNCTION core_interview_no_double_booking();
+ALTER TABLE core_jobapplication_plain RENAME TO core_jobapplication;
+ALTER TABLE core_interview_plain RENAME TO core_interview;
+
+ALTER TABLE core_jobapplication ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+SELECT setval(pg_get_serial_sequence('core_jobapplication', 'id'), coalesce(max(id), 0) + 1, false)
+FROM core_jobapplication;
+ALTER TABLE core_interview ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+SELECT setval(pg_get_serial_sequence('core_interview', 'id'), coalesce(max(id), 0) + 1, false)
+FROM core_interview;
+
+ALTER TABLE core_jobapplication
+    ADD CONSTRAINT core_jobapplication_pkey PRIMARY KEY (id),
+    ADD CONSTRAINT core_jobapplication_job_posting_id_candidate_id_42bc95f1_uniq UNIQUE (job_posting_id, candidate_id);
+CREATE INDEX core_jobapplication_candidate_id_b54ee0c5 ON core_jobapplication (candidate_id);
+CREATE INDEX core_jobapplication_job_posting_id_7732d97a ON core_jobapplication (job_posting_id);
+CREATE INDEX core_jobapplication_resume_data_id_b3970920 ON core_jobapplication (resume_data_id);
+CREATE INDEX jobapp_job_status_score_idx ON core_jobapplication (job_posting_id, status, ai_match_score DESC);
+CREATE INDEX jobapp_candidate_applied_idx ON core_jobapplication (candidate_id, applied_at DESC);
+CREATE INDEX jobapp_job_keyset_idx ON core_jobapplication (job_posting_id, applied_at DESC, id DESC);
+CREATE INDEX jobapp_keyset_idx ON core_jobapplication (applied_at DESC, id DESC);
+ALTER TABLE core_jobapplication
+    ADD CONSTRAINT core_jobapplication_candidate_id_b54ee0c5_fk_auth_user_id
+        FOREIGN KEY (candidate_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED,
+    ADD CONSTRAINT core_jobapplication_job_posting_id_7732d97a_fk_core_jobp
+        FOREIGN KEY (job_posting_id) REFERENCES core_jobposting (id) DEFERRABLE INITIALLY DEFERRED,
+    ADD CONSTRAINT core_jobapplication_resume_data_id_b3970920_fk_core_resu
+        FOREIGN KEY (resume_data_id) REFERENCES core_resumedata (id) DEFERRABLE INITIALLY DEFERRED;
+
+ALTER TABLE core_interview
+    ADD CONSTRAINT core_interview_pkey PRIMARY KEY (id),
+    ADD CONSTRAINT interview_no_double_booking EXCLUDE USING gist (
+        int4range(interviewer_id, interviewer_id, '[]') WITH &&, slot WITH &&
+    ) WHERE (status IN ('SCHEDULED', 'RESCHEDULED'));
+CREATE INDEX core_interview_application_id_100d603b ON core_interview (application_id);
+CREATE INDEX core_interview_interviewer_id_c0621c0f ON core_interview (interviewer_id);
+CREATE INDEX interview_interviewer_time_idx ON core_interview (interviewer_id, scheduled_time);
+CREATE INDEX interview_upcoming_idx ON core_interview (scheduled_time) WHERE status = 'SCHEDULED';
+CREATE INDEX interview_keyset_idx ON core_interview (scheduled_time, id);
+ALTER TABLE core_interview
+    ADD CONSTRAINT core_interview_interviewer_id_c0621c0f_fk_auth_user_id
+        FOREIGN KEY (interviewer_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED,
+    ADD CONSTRAINT core_interview_application_id_100d603b_fk_core_joba
+        FOREIGN KEY (application_id) REFERENCES core_jobapplication (id) DEFERRABLE INITIALLY DEFERRED;
+
+CREATE TRIGGER core_interview_slot_trigger
+    BEFORE INSERT OR UPDATE OF scheduled_time, duration_minutes, slot
+    ON core_interview FOR EACH ROW EXECUTE FUNCTION core_interview_slot();
+CREATE TRIGGER core_application_counters_insert
+    AFTER INSERT ON core_jobapplication REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_application_counters();
+CREATE TRIGGER core_application_counters_update
+    AFTER UPDATE ON core_jobapplication REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_application_counters();
+CREATE TRIGGER core_application_counters_delete
+    AFTER DELETE ON core_jobapplication REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_application_counters();
+CREATE TRIGGER core_interview_counters_insert
+    AFTER INSERT ON core_interview REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_counters();
+CREATE TRIGGER core_interview_counters_update
+    AFTER UPDATE ON core_interview REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_counters();
+CREATE TRIGGER core_interview_counters_delete
+    AFTER DELETE ON core_interview REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION core_interview_counters();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_skills'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(PARTITION_SQL, reverse_sql=UNPARTITION_SQL),
+            ],
+            state_operations=[
+                migrations.AlterUniqueTogether(
+                    name='jobapplication',
+                    unique_together=set(),
+                ),
+                migrations.RemoveConstraint(
+                    model_name='interview',
+                    name='interview_no_double_booking',
+                ),
+                migrations.AddField(
+                    model_name='jobapplication',
+                    name='archived',
+                    field=models.BooleanField(default=False, editable=False),
+                ),
+                migrations.AddField(
+                    model_name='interview',
+                    name='archived',
+                    field=models.BooleanField(default=False, editable=False),
+                ),
+                migrations.AddField(
+                    model_name='interview',
+                    name='application_applied_at',
+                    field=models.DateTimeField(editable=False, null=True),
+                ),
+                migrations.AlterField(
+                    model_name='interview',
+                    name='application',
+                    field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='core.jobapplication'),
+                ),
+                migrations.AddIndex(
+                    model_name='jobapplication',
+                    index=models.Index(fields=['job_posting', 'candidate'], name='jobapp_job_candidate_idx'),
+                ),
+                migrations.AddIndex(
+                    model_name='interview',
+                    index=django.contrib.postgres.indexes.GistIndex(models.Func('interviewer', 'interviewer', models.Value('[]'), function='int4range', output_field=django.contrib.postgres.fields.ranges.IntegerRangeField()), models.F('slot'), condition=models.Q(('status__in', ['SCHEDULED', 'RESCHEDULED'])), name='interview_no_double_booking'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumedata',
+            name='imported_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='imported_resumes', to='core.company'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:41
+
+from django.db import migrations
+
+
+# The transaction that wrote each change event. Ids are taken before commit,
+# so events commit out of id order: streams read them by (xid, id), only
+# those of ended transactions (core/events.py). Not a model field, Django
+# has no xid8 type and inserts must leave the column to its default. Rows
+# from before this migration are all committed, xid 0 keeps their id order.
+XID_SQL = """
+ALTER TABLE core_changeevent ADD COLUMN xid xid8 NOT NULL DEFAULT '0';
+ALTER TABLE core_changeevent ALTER COLUMN xid SET DEFAULT pg_current_xact_id();
+CREATE INDEX changeevent_stream_idx ON core_changeevent (company_id, xid, id);
+"""
+
+DROP_XID_SQL = """
+DROP INDEX changeevent_stream_idx;
+ALTER TABLE core_changeevent DROP COLUMN xid;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_resume_imported_by'),
+    ]
+
+    operations = [
+        # Replaced by the (company_id, xid, id) index of the same name
+        migrations.RemoveIndex(
+            model_name='changeevent',
+            name='changeevent_stream_idx',
+        ),
+        migrations.RunSQL(XID_SQL, reverse_sql=DROP_XID_SQL),
+    ]
@@ -0,0 +1,129 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:58
+
+from django.db import migrations
+
+
+# The counter trigger functions of 0011, writing the company counter under
+# its new name ({column})
+COUNTER_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION core_application_counters() RETURNS trigger AS $$
+DECLARE
+    changes text;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT job_posting_id, status, applied_at, 1 AS n FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := 'SELECT job_posting_id, status, applied_at, -1 AS n FROM old_rows';
+    ELSE
+        -- Updates count as a removal and an addition, when they move an application
+        changes := 'WITH moved AS (
+                SELECT o.job_posting_id AS old_job, o.status AS old_status, o.applied_at AS old_applied_at,
+                       r.job_posting_id, r.status, r.applied_at
+                FROM old_rows o JOIN new_rows r ON r.id = o.id
+                WHERE (o.job_posting_id, o.status, o.applied_at) IS DISTINCT FROM (r.job_posting_id, r.status, r.applied_at)
+            )
+            SELECT old_job, old_status, old_applied_at, -1 AS n FROM moved
+            UNION ALL
+            SELECT job_posting_id, status, applied_at, 1 FROM moved';
+    END IF;
+
+    EXECUTE format($sql$
+        WITH changes (job_posting_id, status, applied_at, n) AS (%s),
+        deltas AS (
+            SELECT job_posting_id,
+                   sum(n) AS total,
+                   coalesce(sum(n) FILTER (WHERE status = 'APPLIED'), 0) AS applied,
+                   coalesce(sum(n) FILTER (WHERE status = 'UNDER_REVIEW'), 0) AS under_review,
+                   coalesce(sum(n) FILTER (WHERE status = 'INTERVIEW_SCHEDULED'), 0) AS interview_scheduled,
+                   coalesce(sum(n) FILTER (WHERE status = 'INTERVIEWED'), 0) AS interviewed,
+                   coalesce(sum(n) FILTER (WHERE status = 'REJECTED'), 0) AS rejected,
+                   coalesce(sum(n) FILTER (WHERE status = 'ACCEPTED'), 0) AS accepted,
+                   max(applied_at) FILTER (WHERE n > 0) AS added_at,
+                   max(applied_at) FILTER (WHERE n < 0) AS removed_at
+            FROM changes GROUP BY job_posting_id
+        ),
+        jobs AS (
+            UPDATE core_jobposting j SET
+                applications_count = j.applications_count + d.total,
+                applied_count = j.applied_count + d.applied,
+                under_review_count = j.under_review_count + d.under_review,
+                interview_scheduled_count = j.interview_scheduled_count + d.interview_scheduled,
+                interviewed_count = j.interviewed_count + d.interviewed,
+                rejected_count = j.rejected_count + d.rejected,
+                accepted_count = j.accepted_count + d.accepted,
+                -- Only a removal of the latest application needs a look at the others
+                last_applied_at = CASE
+                    WHEN d.removed_at >= j.last_applied_at THEN
+                        (SELECT max(a.applied_at) FROM core_jobapplication a WHERE a.job_posting_id = j.id)
+                    ELSE greatest(j.last_applied_at, d.added_at)
+                END
+            FROM deltas d
+            WHERE j.id = d.job_posting_id
+            RETURNING j.company_id, d.total
+        )
+        UPDATE core_company c SET {column} = c.{column} + t.total
+        FROM (SELECT company_id, sum(total) AS total FROM jobs GROUP BY company_id) t
+        WHERE c.id = t.company_id AND t.total <> 0
+    $sql$, changes);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION core_jobposting_counters() RETURNS trigger AS $$
+DECLARE
+    changes text;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT company_id, status, applications_count, 1 AS n FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := 'SELECT company_id, status, applications_count, -1 AS n FROM old_rows';
+    ELSE
+        -- The application trigger updates jobs too, their counts are on the company already
+        changes := 'WITH moved AS (
+                SELECT o.company_id AS old_company, o.status AS old_status, o.applications_count AS old_count,
+                       r.company_id, r.status, r.applications_count
+                FROM old_rows o JOIN new_rows r ON r.id = o.id
+                WHERE (o.company_id, o.status) IS DISTINCT FROM (r.company_id, r.status)
+            )
+            SELECT old_company, old_status, old_count, -1 AS n FROM moved
+            UNION ALL
+            SELECT company_id, status, applications_count, 1 FROM moved';
+    END IF;
+
+    EXECUTE format($sql$
+        WITH changes (company_id, status, applications_count, n) AS (%s)
+        UPDATE core_company c SET
+            open_jobs_count = c.open_jobs_count + d.open_jobs,
+            {column} = c.{column} + d.applications
+        FROM (
+            SELECT company_id,
+                   coalesce(sum(n) FILTER (WHERE status = 'ACTIVE'), 0) AS open_jobs,
+                   sum(n * applications_count) AS applications
+            FROM changes GROUP BY company_id
+        ) d
+        WHERE c.id = d.company_id AND (d.open_jobs <> 0 OR d.applications <> 0)
+    $sql$, changes);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_change_event_xid'),
+    ]
+
+    operations = [
+        # A count of applications to the company's jobs, not of distinct candidates
+        migrations.RenameField(
+            model_name='company',
+            old_name='applicants_count',
+            new_name='applications_count',
+        ),
+        migrations.RunSQL(
+            COUNTER_FUNCTIONS.format(column='applications_count'),
+            reverse_sql=COUNTER_FUNCTIONS.format(column='applicants_count'),
+        ),
+    ]
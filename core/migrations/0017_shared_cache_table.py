@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:24
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    # The table of CACHES['shared'] when it's a DatabaseCache, the other
+    # backends need none. Tests get it from the test database creation.
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_rename_company_applicants_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,33 @@
 # ==== core/models.py ====
 import uuid
+from datetime import timedelta
+from django.contrib.postgres.fields import DateTimeRangeField, IntegerRangeField
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 from django.utils import timezone
 
-class Company(models.Model):
+class CounterFieldsMixin:
+    """
+    For models with columns kept by the database, the counters of triggers
+    (migration 0011) or the archive flags (core/partitions.py): saving an
+    instance loaded earlier leaves them alone instead of writing back stale
+    values.
+    """
+    counter_fields = ()
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+class Company(CounterFieldsMixin, models.Model):
     name = models.CharField(max_length=200)
     registration_code = models.CharField(max_length=50, unique=True)
     is_active = models.BooleanField(default=True)
@@ -16,6 +39,12 @@ class Company(models.Model):
     description = models.TextField(blank=True, null=True)
     logo = models.ImageField(upload_to='company_logos/', blank=True, null=True)
     
+    # Kept by database triggers (migration 0011), repaired by `manage.py reconcile_counters`
+    open_jobs_count = models.IntegerField(default=0, editable=False)
+    # Applications to all of its jobs: a candidate applying to two counts twice
+    applications_count = models.IntegerField(default=0, editable=False)
+    counter_fields = ('open_jobs_count', 'applications_count')
+    
     class Meta:
         verbose_name_plural = "Companies"
     
@@ -38,7 +67,7 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} ({self.user_type})"
 
-class JobPosting(models.Model):
+class JobPosting(CounterFieldsMixin, models.Model):
     STATUS_CHOICES = [
         ('DRAFT', 'Draft'),
         ('ACTIVE', 'Active'),
@@ -60,9 +89,42 @@ class JobPosting(models.Model):
     # Public link for sharing
     public_id = models.UUIDField(default=uuid.uuid4, unique=True)
     
+    # Full-text search document, maintained by a database trigger (migration 0007)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Vocabulary skills named in the requirements, kept by a database trigger (see core/skills.py)
+    skill_tags = models.JSONField(default=list, editable=False)
+    
+    # Applications by status and interviews, kept by database triggers
+    # (migration 0011), repaired by `manage.py reconcile_counters`
+    applications_count = models.IntegerField(default=0, editable=False)
+    applied_count = models.IntegerField(default=0, editable=False)
+    under_review_count = models.IntegerField(default=0, editable=False)
+    interview_scheduled_count = models.IntegerField(default=0, editable=False)
+    interviewed_count = models.IntegerField(default=0, editable=False)
+    rejected_count = models.IntegerField(default=0, editable=False)
+    accepted_count = models.IntegerField(default=0, editable=False)
+    interviews_count = models.IntegerField(default=0, editable=False)
+    last_applied_at = models.DateTimeField(null=True, blank=True, editable=False)
+    counter_fields = (
+        'applications_count', 'applied_count', 'under_review_count', 'interview_scheduled_count',
+        'interviewed_count', 'rejected_count', 'accepted_count', 'interviews_count', 'last_applied_at',
+    )
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='jobposting_search_idx'),
+            GinIndex(fields=['skill_tags'], opclasses=['jsonb_path_ops'], name='jobposting_skill_tags_idx'),
+            # HR job list: company's jobs, optionally by status, newest first
+            models.Index(fields=['company', 'status', '-created_at'], name='jobposting_company_status_idx'),
+            # Candidate feed: only active jobs
+            models.Index(fields=['-created_at'], condition=models.Q(status='ACTIVE'), name='jobposting_active_idx'),
+            # Keyset pagination order of the HR job list
+            models.Index(fields=['company', '-created_at', '-id'], name='jobposting_company_keyset_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.title} - {self.company.name}"
 
@@ -86,17 +148,45 @@ class ResumeData(models.Model):
     # Raw extracted data (backup)
     raw_extracted_data = models.JSONField(default=dict)
     
+    # Company whose bulk import created the resume (core/bulk_io.py), it finds
+    # it like the resumes submitted to its jobs
+    imported_by = models.ForeignKey(
+        Company, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='imported_resumes'
+    )
+    
     # File reference
     original_file_name = models.CharField(max_length=255)
     file_path = models.CharField(max_length=500, blank=True, null=True)
+    # SHA-256 of the uploaded file, identical uploads are not stored twice
+    content_hash = models.CharField(max_length=64, blank=True, null=True, editable=False)
+    
+    # Packed term vector used for AI matching (see core/scoring.py)
+    term_vector = models.BinaryField(null=True, blank=True, editable=False)
+    # Full-text search document, maintained by a database trigger (migration 0007)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Normalized `skills`, kept by a database trigger (see core/skills.py)
+    skill_tags = models.JSONField(default=list, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='resume_search_idx'),
+            GinIndex(fields=['skill_tags'], opclasses=['jsonb_path_ops'], name='resume_skill_tags_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['candidate', 'content_hash'],
+                condition=models.Q(content_hash__isnull=False),
+                name='resume_candidate_hash_uniq',
+            ),
+        ]
+    
     def __str__(self):
         return f"{self.full_name} - {self.original_file_name}"
 
-class JobApplication(models.Model):
+class JobApplication(CounterFieldsMixin, models.Model):
     STATUS_CHOICES = [
         ('APPLIED', 'Applied'),
         ('UNDER_REVIEW', 'Under Review'),
@@ -106,6 +196,16 @@ class JobApplication(models.Model):
         ('ACCEPTED', 'Accepted'),
     ]
     
+    # Allowed moves for bulk status changes, status -> statuses it can move to
+    STATUS_TRANSITIONS = {
+        'APPLIED': ['UNDER_REVIEW', 'INTERVIEW_SCHEDULED', 'REJECTED'],
+        'UNDER_REVIEW': ['INTERVIEW_SCHEDULED', 'REJECTED', 'ACCEPTED'],
+        'INTERVIEW_SCHEDULED': ['INTERVIEWED', 'REJECTED'],
+        'INTERVIEWED': ['ACCEPTED', 'REJECTED'],
+        'REJECTED': ['UNDER_REVIEW'],
+        'ACCEPTED': [],
+    }
+    
     job_posting = models.ForeignKey(JobPosting, on_delete=models.CASCADE)
     candidate = models.ForeignKey(User, on_delete=models.CASCADE)
     resume_data = models.ForeignKey(ResumeData, on_delete=models.CASCADE)
@@ -123,13 +223,29 @@ class JobApplication(models.Model):
     applied_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Moved to the archive partitions by `manage.py maintain_partitions`
+    archived = models.BooleanField(default=False, editable=False)
+    counter_fields = ('archived',)
+    
     class Meta:
-        unique_together = ('job_posting', 'candidate')
+        # Partitioned by (archived, applied_at), see core/partitions.py. One
+        # application per candidate and job is checked by a trigger
+        # (migration 0013), a partitioned table can't have that unique key.
+        indexes = [
+            models.Index(fields=['job_posting', 'candidate'], name='jobapp_job_candidate_idx'),
+            # Applicants of a job by status, best matches first
+            models.Index(fields=['job_posting', 'status', '-ai_match_score'], name='jobapp_job_status_score_idx'),
+            # Candidate's own applications, newest first
+            models.Index(fields=['candidate', '-applied_at'], name='jobapp_candidate_applied_idx'),
+            # Keyset pagination order
+            models.Index(fields=['job_posting', '-applied_at', '-id'], name='jobapp_job_keyset_idx'),
+            models.Index(fields=['-applied_at', '-id'], name='jobapp_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.candidate.username} -> {self.job_posting.title}"
 
-class Interview(models.Model):
+class Interview(CounterFieldsMixin, models.Model):
     INTERVIEW_TYPES = [
         ('PHONE', 'Phone'),
         ('VIDEO', 'Video Call'),
@@ -144,12 +260,16 @@ class Interview(models.Model):
         ('RESCHEDULED', 'Rescheduled'),
     ]
     
-    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE)
+    # The database's foreign key is (application_id, archived,
+    # application_applied_at), migration 0013
+    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, db_constraint=False)
     interviewer = models.ForeignKey(User, on_delete=models.CASCADE)
     
     interview_type = models.CharField(max_length=20, choices=INTERVIEW_TYPES)
     scheduled_time = models.DateTimeField()
     duration_minutes = models.PositiveIntegerField(default=60)
+    # [scheduled_time, scheduled_time + duration), kept by a trigger (migration 0009)
+    slot = DateTimeRangeField(null=True, editable=False)
     
     location = models.CharField(max_length=200, blank=True, null=True)
     meeting_link = models.URLField(blank=True, null=True)
@@ -161,5 +281,135 @@ class Interview(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Follow the application, to the archive partitions too (core/partitions.py)
+    archived = models.BooleanField(default=False, editable=False)
+    application_applied_at = models.DateTimeField(null=True, editable=False)
+    counter_fields = ('archived', 'application_applied_at')
+    
+    class Meta:
+        # Partitioned by (archived, scheduled_time), see core/partitions.py
+        indexes = [
+            # Interviewer's calendar
+            models.Index(fields=['interviewer', 'scheduled_time'], name='interview_interviewer_time_idx'),
+            # Upcoming interviews that are still on
+            models.Index(fields=['scheduled_time'], condition=models.Q(status='SCHEDULED'), name='interview_upcoming_idx'),
+            # Keyset pagination order
+            models.Index(fields=['scheduled_time', 'id'], name='interview_keyset_idx'),
+            # No double booking, checked by a trigger (migration 0013) with this
+            # index, which also serves the availability queries: a partitioned
+            # table can't have the exclusion constraint. The interviewer is
+            # compared as a one-id range, `=` on integers would need the
+            # btree_gist extension.
+            GistIndex(
+                models.Func(
+                    'interviewer', 'interviewer', models.Value('[]'),
+                    function='int4range', output_field=IntegerRangeField(),
+                ),
+                models.F('slot'),
+                condition=models.Q(status__in=['SCHEDULED', 'RESCHEDULED']),
+                name='interview_no_double_booking',
+            ),
+        ]
+    
+    @property
+    def end_time(self):
+        return self.scheduled_time + timedelta(minutes=self.duration_minutes)
+    
     def __str__(self):
         return f"Interview: {self.application.candidate.username} for {self.application.job_posting.title}"
+
+class Task(models.Model):
+    """A unit of background work, see core/queue.py"""
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    # Claimed tasks are invisible to other workers until then
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, null=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            # Only pending/running rows are polled, failures don't bloat the index
+            models.Index(fields=['run_at'], condition=models.Q(status__in=['PENDING', 'RUNNING']), name='task_runnable_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+class ChangeEvent(models.Model):
+    """An application or interview change, for the event stream (core/events.py)"""
+    KINDS = [
+        ('application', 'Application'),
+        ('interview', 'Interview'),
+    ]
+    
+    ACTIONS = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+    ]
+    
+    # Indexed by changeevent_stream_idx (company_id, xid, id), created by
+    # migration 0015 with the `xid` column (the writing transaction's id)
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, db_index=False)
+    kind = models.CharField(max_length=20, choices=KINDS)
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    object_id = models.BigIntegerField()
+    # The fields a pipeline view shows, so clients needn't refetch
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            # Pruning
+            models.Index(fields=['created_at'], name='changeevent_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.object_id} {self.action} (#{self.pk})"
+
+class Skill(models.Model):
+    """A canonical skill, resumes and jobs are tagged with its name lower-cased (core/skills.py)"""
+    name = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(Lower('name'), name='skill_name_uniq'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        self.name = ' '.join(self.name.split())
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return self.name
+
+class SkillAlias(models.Model):
+    """Another spelling of a skill ("postgres" for PostgreSQL), stored normalized"""
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='aliases')
+    alias = models.CharField(max_length=100, unique=True)
+    
+    class Meta:
+        verbose_name_plural = "Skill aliases"
+    
+    def save(self, *args, **kwargs):
+        self.alias = ' '.join(self.alias.lower().split())
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return f"{self.alias} -> {self.skill.name}"
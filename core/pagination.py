@@ -0,0 +1,240 @@
+# ==== core/pagination.py ====
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _wants_count(request, param, default=True):
+    value = request.query_params.get(param)
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'false', 'no')
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    """
+    Page number pagination where clients can opt out of the total count
+    with `?count=false`, which skips the COUNT(*) query. Subclasses where
+    counting is expensive can make that the default with `count_by_default`.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_query_param = 'count'
+    count_by_default = True
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if _wants_count(request, self.count_query_param, self.count_by_default):
+            self.with_count = True
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.with_count = False
+        self.request = request
+        try:
+            self.page_number = _positive_int(
+                request.query_params.get(self.page_query_param, 1), strict=True
+            )
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message)
+
+        # One extra row tells us whether there is a next page
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if self.with_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.with_count:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        if self.with_count:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination on a unique ordering, e.g. `('-applied_at', '-id')`.
+
+    The cursor holds the ordering values of the last row that was seen, so
+    every page is a `WHERE (applied_at, id) < (...) ... LIMIT n` index range
+    scan and page 500 costs the same as page 1. There is no total count.
+
+    Views set `keyset_ordering`; all ordering fields must be non-null and
+    sorted in the same direction, and the last one must be unique.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-id',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.build_page(list(queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Everything except running the query: returns the ordered, filtered
+        and sliced queryset for the requested page (or `None` when
+        pagination is disabled). Pass the fetched rows to `build_page`.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.ordering = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        descending = {name.startswith('-') for name in self.ordering}
+        assert len(descending) == 1, 'keyset_ordering fields must all sort in the same direction'
+        self.descending = descending.pop()
+        self.field_names = [name.lstrip('-') for name in self.ordering]
+
+        self.position, self.reverse = self.decode_cursor(queryset.model, request)
+
+        ordering = self.ordering
+        if self.reverse:
+            # Walk backwards from the cursor, `build_page` puts the rows back in order
+            ordering = [name[1:] if name.startswith('-') else '-' + name for name in ordering]
+        queryset = queryset.order_by(*ordering)
+
+        if self.position is not None:
+            queryset = queryset.filter(self.get_position_filter())
+
+        return queryset[:self.page_size + 1]
+
+    def build_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+
+        self.first_position = self.get_row_position(rows[0]) if rows else None
+        self.last_position = self.get_row_position(rows[-1]) if rows else None
+        return rows
+
+    def get_position_filter(self):
+        # Rows strictly after the cursor in the (possibly reversed) ordering:
+        # (a < x) OR (a = x AND b < y) ...
+        after_descending = self.descending != self.reverse
+        lookup = 'lt' if after_descending else 'gt'
+        conditions = []
+        for i, name in enumerate(self.field_names):
+            condition = {self.field_names[j]: self.position[j] for j in range(i)}
+            condition[f'{name}__{lookup}'] = self.position[i]
+            conditions.append(Q(**condition))
+        # The redundant bound on the leading column keeps it an index range scan
+        leading = {f"{self.field_names[0]}__{lookup}e": self.position[0]}
+        return Q(**leading) & reduce(or_, conditions)
+
+    def get_row_position(self, row):
+        return [getattr(row, name) for name in self.field_names]
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def decode_cursor(self, model, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(encoded + padding).decode('ascii'))
+            values = payload['p']
+            if len(values) != len(self.field_names):
+                raise ValueError
+            position = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.field_names, values)
+            ]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse=False):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]
+        payload = {'p': values}
+        if reverse:
+            payload['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('ascii'))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded.decode('ascii').rstrip('='))
+
+    def get_next_link(self):
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.encode_cursor(self.last_position)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_position is None:
+            return None
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class SearchPagination(PageNumberPagination):
+    """Search results: counting every match would cost more than finding the page"""
+    count_by_default = False
@@ -0,0 +1,207 @@
+# ==== core/partitions.py ====
+"""
+Time partitions of applications and interviews (migration 0013).
+
+Both tables are partitioned by `archived`, then by month of `applied_at` /
+`scheduled_time` for the hot rows and by year for the archived ones. Rows
+of a month without a partition go to the `_hot_default` partition, so
+`create_partitions` runs ahead of time: it makes the partitions of the
+coming MONTHS_AHEAD months and moves the rows that landed in the default
+partition into the partitions of their months.
+
+`archive` moves the applications of closed jobs from before the last
+ARCHIVE_AFTER_MONTHS months into the archive partitions, their interviews
+follow through the foreign key. Archived rows are still rows of the tables,
+only stored apart: packed (fillfactor 100), with the long text and JSON
+values compressed with lz4 where the server has it, in the
+PARTITION_ARCHIVE_TABLESPACE if set (e.g. on a compressed file system),
+and frozen by `freeze` so vacuum skips them from then on.
+
+`manage.py maintain_partitions` runs all three.
+"""
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> the column of its months
+TABLES = {'core_jobapplication': 'applied_at', 'core_interview': 'scheduled_time'}
+MONTHS_AHEAD = 3
+BATCH_SIZE = 1000
+
+DEFAULT_MONTHS_SQL = """
+SELECT DISTINCT date_trunc('month', {key}, 'UTC') FROM {table}_hot_default
+"""
+
+# Rows of the default partition referenced by an interview can't leave it:
+# the foreign key is checked against the partition they are deleted from
+REFERENCED_SQL = """
+SELECT EXISTS (
+    SELECT FROM core_jobapplication_hot_default a JOIN core_interview i ON i.application_id = a.id
+    WHERE a.applied_at >= %s AND a.applied_at < %s
+)
+"""
+
+MOVE_SQL = """
+WITH moved AS (
+    DELETE FROM {table}_hot_default WHERE {key} >= %s AND {key} < %s RETURNING *
+)
+INSERT INTO {partition} SELECT * FROM moved
+"""
+
+# Locked, so no interview is added to them until they are archived
+TO_ARCHIVE_SQL = """
+SELECT a.id, extract(year FROM a.applied_at AT TIME ZONE 'UTC')::integer
+FROM core_jobapplication a JOIN core_jobposting j ON j.id = a.job_posting_id
+WHERE NOT a.archived AND a.applied_at < %s AND j.status = 'CLOSED'
+ORDER BY a.id
+LIMIT %s
+FOR UPDATE OF a
+"""
+
+INTERVIEW_YEARS_SQL = """
+SELECT extract(year FROM scheduled_time AT TIME ZONE 'UTC')::integer, count(*)
+FROM core_interview WHERE application_id = ANY(%s)
+GROUP BY 1
+"""
+
+
+def month_start(value):
+    """The first instant of the month of `value`, in UTC"""
+    return value.astimezone(dt_timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month, months):
+    index = month.month - 1 + months
+    return month.replace(year=month.year + index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y_%m}'
+
+
+def archive_partition_name(table, year):
+    return f'{table}_archive_p{year}'
+
+
+def _exists(cursor, name):
+    cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [name])
+    return cursor.fetchone()[0]
+
+
+def create_partitions(months_ahead=MONTHS_AHEAD, since=None):
+    """
+    Make the monthly partitions from the month of `since` (default now) to
+    `months_ahead` months ahead, and those of the months with rows in the
+    default partitions, moving the rows in. Returns the partitions made.
+    """
+    this_month = month_start(timezone.now())
+    month = month_start(since) if since is not None else this_month
+    wanted = set()
+    while month <= add_months(this_month, months_ahead):
+        wanted.add(month)
+        month = add_months(month, 1)
+
+    created = []
+    with connection.cursor() as cursor:
+        for table, key in TABLES.items():
+            cursor.execute(DEFAULT_MONTHS_SQL.format(table=table, key=key))
+            for month in sorted(wanted | {month_start(row[0]) for row in cursor.fetchall()}):
+                name = partition_name(table, month)
+                with transaction.atomic():
+                    if not _exists(cursor, name) and _create_partition(cursor, table, key, name, month):
+                        created.append(name)
+    return created
+
+
+def _create_partition(cursor, table, key, name, month):
+    end = add_months(month, 1)
+    cursor.execute(
+        f'SELECT EXISTS (SELECT FROM {table}_hot_default WHERE {key} >= %s AND {key} < %s)', [month, end]
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(f'CREATE TABLE {name} PARTITION OF {table}_hot FOR VALUES FROM (%s) TO (%s)', [month, end])
+        return True
+
+    if table == 'core_jobapplication':
+        cursor.execute(REFERENCED_SQL, [month, end])
+        if cursor.fetchone()[0]:
+            logger.warning(
+                'Not partitioning %s: applications of that month in the default partition have interviews', name
+            )
+            return False
+    cursor.execute(f'CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    cursor.execute(MOVE_SQL.format(table=table, key=key, partition=name), [month, end])
+    cursor.execute(f'ALTER TABLE {table}_hot ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)', [month, end])
+    return True
+
+
+def _create_archive_partition(cursor, table, year):
+    """Make the archive partition of the year unless it exists, returns its name"""
+    name = archive_partition_name(table, year)
+    if _exists(cursor, name):
+        return name
+    tablespace = ''
+    if settings.PARTITION_ARCHIVE_TABLESPACE:
+        tablespace = f' TABLESPACE {connection.ops.quote_name(settings.PARTITION_ARCHIVE_TABLESPACE)}'
+    cursor.execute(
+        f'CREATE TABLE {name} PARTITION OF {table}_archive FOR VALUES FROM (%s) TO (%s) '
+        f'WITH (fillfactor = 100){tablespace}',
+        [datetime(year, 1, 1, tzinfo=dt_timezone.utc), datetime(year + 1, 1, 1, tzinfo=dt_timezone.utc)],
+    )
+    cursor.execute("SELECT 'lz4' = ANY(enumvals) FROM pg_settings WHERE name = 'default_toast_compression'")
+    if cursor.fetchone()[0]:
+        # The columns whose long values are compressed
+        cursor.execute(
+            "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass AND attnum > 0 "
+            "AND NOT attisdropped AND attstorage IN ('x', 'm')",
+            [name],
+        )
+        columns = [row[0] for row in cursor.fetchall()]
+        if columns:
+            cursor.execute(f'ALTER TABLE {name} ' + ', '.join(
+                f'ALTER COLUMN {connection.ops.quote_name(column)} SET COMPRESSION lz4' for column in columns
+            ))
+    return name
+
+
+def archive(months=None, batch_size=BATCH_SIZE):
+    """
+    Move the applications of closed jobs made before the last `months`
+    months (ARCHIVE_AFTER_MONTHS), and their interviews, to the archive
+    partitions in batches. Returns the numbers of applications and
+    interviews moved, and the archive partitions they went to.
+    """
+    cutoff = add_months(
+        month_start(timezone.now()), -(settings.ARCHIVE_AFTER_MONTHS if months is None else months)
+    )
+    applications = interviews = 0
+    partitions = set()
+    with connection.cursor() as cursor:
+        while True:
+            with transaction.atomic():
+                cursor.execute(TO_ARCHIVE_SQL, [cutoff, batch_size])
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                ids = [row[0] for row in rows]
+                for year in {row[1] for row in rows}:
+                    partitions.add(_create_archive_partition(cursor, 'core_jobapplication', year))
+                cursor.execute(INTERVIEW_YEARS_SQL, [ids])
+                for year, count in cursor.fetchall():
+                    partitions.add(_create_archive_partition(cursor, 'core_interview', year))
+                    interviews += count
+                cursor.execute('UPDATE core_jobapplication SET archived = true WHERE id = ANY(%s)', [ids])
+                applications += cursor.rowcount
+    return applications, interviews, sorted(partitions)
+
+
+def freeze(partitions):
+    """VACUUM (FREEZE, ANALYZE) the partitions, outside of any transaction"""
+    with connection.cursor() as cursor:
+        for name in partitions:
+            cursor.execute(f'VACUUM (FREEZE, ANALYZE) {name}')
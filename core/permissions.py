@@ -0,0 +1,36 @@
+# ==== core/permissions.py ====
+import hmac
+
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+
+class IsHRUser(BasePermission):
+    """Allows access only to HR members attached to a company"""
+    message = 'Only HR users can do this'
+
+    def has_permission(self, request, view):
+        user_profile = getattr(request.user, 'userprofile', None)
+        return bool(user_profile and user_profile.user_type == 'HR' and user_profile.company_id)
+
+
+class IsCandidate(BasePermission):
+    """Allows access only to candidates"""
+    message = 'Only candidates can do this'
+
+    def has_permission(self, request, view):
+        user_profile = getattr(request.user, 'userprofile', None)
+        return bool(user_profile and user_profile.user_type == 'CANDIDATE')
+
+
+class CanReadMetrics(BasePermission):
+    """Staff users, or a scraper sending `Authorization: Bearer <METRICS_TOKEN>`"""
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        return bool(
+            settings.METRICS_TOKEN and scheme.lower() == 'bearer'
+            and hmac.compare_digest(token.strip(), settings.METRICS_TOKEN)
+        )
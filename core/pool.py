@@ -0,0 +1,262 @@
+# ==== core/pool.py ====
+"""
+Database connection pools, one per database and worker process, for the
+`core.postgresql_pool` backend (DB_POOL in talentflow/settings.py).
+
+Django still opens and closes a thread's connection around each request;
+the backend takes it from the pool instead of connecting and gives it back
+instead of closing it. The server session outlives the request, and so do
+the plans PL/pgSQL caches for the trigger functions (search documents,
+counters, skill tags) and, with psycopg 3, the statements it prepared
+(`prepare_threshold`).
+
+Once `max_size` connections are out, a checkout waits up to `timeout`
+seconds for one to come back and then fails with PoolTimeout. Returned
+connections get any open transaction rolled back, broken ones are closed.
+Before reuse, a connection idle for more than `check_after` seconds must
+answer a `SELECT 1`. Connections are replaced after `max_lifetime` seconds,
+and idle ones beyond `min_size` are closed after `max_idle` seconds.
+Threads share a pool safely. A forked process starts its own pool and
+never touches its parent's connections. Waits, timeouts and pool sizes are
+in /api/metrics/.
+"""
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+
+from django.db.backends.postgresql.base import Database
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'min_size': 2,
+    'max_size': 10,
+    'timeout': 10.0,
+    'max_lifetime': 3600.0,
+    'max_idle': 600.0,
+    'check_after': 5.0,
+}
+# libpq's PGTransactionStatusType, the same in psycopg2 and psycopg 3
+TRANSACTION_IDLE = 0
+TRANSACTION_UNKNOWN = 4
+# Connections dropped without being returned only free their slot on a poll
+WAIT_POLL_INTERVAL = 0.5
+
+
+class PoolTimeout(Database.OperationalError):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, name, connect, min_size=DEFAULTS['min_size'], max_size=DEFAULTS['max_size'],
+                 timeout=DEFAULTS['timeout'], max_lifetime=DEFAULTS['max_lifetime'],
+                 max_idle=DEFAULTS['max_idle'], check_after=DEFAULTS['check_after']):
+        self.name = name
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.pid = os.getpid()
+        self._condition = threading.Condition()
+        # (connection, opened at, returned at), the last returned on the right
+        self._idle = deque()
+        # Connection -> opened at; one dropped without being returned leaves
+        self._in_use = weakref.WeakKeyDictionary()
+        self._opening = 0
+        self._closed = False
+
+    @property
+    def size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def get(self):
+        """A connection for the caller's use, opened or checked as needed"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+        while True:
+            with self._condition:
+                self._shrink()
+                entry = self._idle.pop() if self._idle else None
+                if entry is None and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        metrics.pool_timeouts.inc(pool=self.name)
+                        raise PoolTimeout(
+                            f'No connection of the {self.name} pool came free in {self.timeout}s '
+                            f'({self.max_size} in use)'
+                        )
+                    waited = True
+                    self._condition.wait(min(remaining, WAIT_POLL_INTERVAL))
+                    continue
+                if entry is None:
+                    self._opening += 1
+
+            if entry is None:
+                conn, opened_at = self._open(), time.monotonic()
+            else:
+                conn, opened_at, returned_at = entry
+                problem = self._check(conn, opened_at, returned_at)
+                if problem:
+                    self._discard(conn, problem)
+                    continue
+
+            with self._condition:
+                self._in_use[conn] = opened_at
+                self._update_gauges()
+            if waited:
+                metrics.pool_waits.inc(pool=self.name)
+            metrics.pool_checkout_duration.observe(time.monotonic() - started, pool=self.name)
+            return conn
+
+    def put(self, conn):
+        """Give back a connection from `get`"""
+        problem = None
+        if conn.closed:
+            problem = 'closed'
+        elif conn.info.transaction_status == TRANSACTION_UNKNOWN:
+            problem = 'broken'
+        elif conn.info.transaction_status != TRANSACTION_IDLE:
+            try:
+                conn.rollback()
+            except Database.Error:
+                problem = 'broken'
+
+        with self._condition:
+            opened_at = self._in_use.pop(conn, None)
+            if opened_at is None:
+                # Not from this pool, e.g. checked out before a fork: the
+                # parent's socket, closing it would end the parent's session
+                _orphans.append(conn)
+                return
+            now = time.monotonic()
+            if problem is None and now - opened_at > self.max_lifetime:
+                problem = 'expired'
+            if problem is None and self._closed:
+                problem = 'pool_closed'
+            if problem is None:
+                self._idle.append((conn, opened_at, now))
+            self._update_gauges()
+            self._condition.notify()
+        if problem:
+            self._discard(conn, problem)
+
+    def fill(self):
+        """Open connections up to `min_size`"""
+        while True:
+            with self._condition:
+                if self._closed or self.size >= self.min_size:
+                    return
+                self._opening += 1
+            try:
+                conn = self._open()
+            except Database.Error:
+                logger.exception('Could not fill the %s connection pool', self.name)
+                return
+            with self._condition:
+                closed = self._closed
+                if not closed:
+                    now = time.monotonic()
+                    self._idle.append((conn, now, now))
+                    self._update_gauges()
+                    self._condition.notify()
+            if closed:
+                self._discard(conn, 'pool_closed')
+                return
+
+    def close(self):
+        """Close the idle connections, and the others when they come back"""
+        with self._condition:
+            self._closed = True
+            idle = [conn for conn, _, _ in self._idle]
+            self._idle.clear()
+            self._update_gauges()
+        for conn in idle:
+            self._discard(conn, 'pool_closed')
+
+    def _open(self):
+        """A new connection, `_opening` was counted for it by the caller"""
+        try:
+            conn = self.connect()
+        finally:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+        metrics.pool_opened.inc(pool=self.name)
+        return conn
+
+    def _check(self, conn, opened_at, returned_at):
+        """Why the idle connection can't be used, None if it can"""
+        now = time.monotonic()
+        if conn.closed:
+            return 'closed'
+        if now - opened_at > self.max_lifetime:
+            return 'expired'
+        if now - returned_at > self.check_after:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                if conn.info.transaction_status != TRANSACTION_IDLE:
+                    conn.rollback()
+            except Database.Error:
+                return 'broken'
+        return None
+
+    def _shrink(self):
+        # Under the lock. The least recently used connections are on the left.
+        now = time.monotonic()
+        while self._idle and self.size > self.min_size and now - self._idle[0][2] > self.max_idle:
+            conn, _, _ = self._idle.popleft()
+            self._discard(conn, 'idle')
+        self._update_gauges()
+
+    def _discard(self, conn, reason):
+        metrics.pool_discarded.inc(pool=self.name, reason=reason)
+        try:
+            conn.close()
+        except Database.Error:
+            pass
+
+    def _update_gauges(self):
+        metrics.pool_connections.set(len(self._idle), pool=self.name, state='idle')
+        metrics.pool_connections.set(len(self._in_use), pool=self.name, state='in_use')
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Connections inherited over a fork, kept so they are never closed here
+_orphans = []
+
+
+def get_pool(name, key, connect, options=None):
+    """
+    The process' pool for `key` (the connection parameters), created with
+    `connect` and `options` on first use.
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.pid != os.getpid():
+            # Inherited over a fork
+            _orphans.append(pool)
+            pool = None
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(name, connect, **{**DEFAULTS, **(options or {})})
+            threading.Thread(target=pool.fill, name=f'pool-fill-{name}', daemon=True).start()
+    return pool
+
+
+def close_all():
+    """Close every pool of the process, their idle connections at once"""
+    with _pools_lock:
+        pools = [pool for pool in _pools.values() if pool.pid == os.getpid()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,57 @@
+# ==== core/postgresql_pool/base.py ====
+"""
+The PostgreSQL backend with its connections kept in a pool (core/pool.py).
+
+OPTIONS['pool'] holds the pool's settings (min_size, max_size, timeout,
+max_lifetime, max_idle, check_after), the rest of the settings are the
+postgresql backend's. Keep CONN_MAX_AGE at 0: the connection goes back to
+the pool at the end of each request instead of staying with the thread.
+"""
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base as postgresql
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from .. import pool
+from .creation import DatabaseCreation
+
+
+class DatabaseWrapper(postgresql.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def _get_pool(self, conn_params):
+        key = (self.alias,) + tuple(
+            conn_params.get(name) for name in ('dbname', 'host', 'port', 'user', 'service')
+        )
+        settings_dict, alias = self.settings_dict, self.alias
+
+        def connect():
+            # Through a wrapper of its own, `self` belongs to another thread
+            return postgresql.DatabaseWrapper(settings_dict, alias).get_new_connection(conn_params)
+
+        return pool.get_pool(alias, key, connect, settings_dict['OPTIONS'].get('pool'))
+
+    def get_new_connection(self, conn_params):
+        if self.alias == NO_DB_ALIAS:
+            # Creating and dropping databases, not worth keeping
+            return super().get_new_connection(conn_params)
+        self._pool = self._get_pool(conn_params)
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return self._pool.get()
+
+    def _close(self):
+        connection_pool = getattr(self, '_pool', None)
+        if self.connection is None or connection_pool is None:
+            return super()._close()
+        if self.in_atomic_block:
+            # The wrapper keeps the connection until the atomic block ends,
+            # it can't go to someone else before
+            with self.wrap_database_errors:
+                self.connection.close()
+        connection_pool.put(self.connection)
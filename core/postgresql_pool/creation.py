@@ -0,0 +1,11 @@
+# ==== core/postgresql_pool/creation.py ====
+from django.db.backends.postgresql.creation import DatabaseCreation as PostgreSQLDatabaseCreation
+
+from .. import pool
+
+
+class DatabaseCreation(PostgreSQLDatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections to the test database would block DROP DATABASE
+        pool.close_all()
+        super()._destroy_test_db(test_database_name, verbosity)
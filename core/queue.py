@@ -0,0 +1,149 @@
+# ==== core/queue.py ====
+"""
+Database-backed task queue.
+
+Tasks are rows in `core_task`. Workers claim them with
+`SELECT ... FOR UPDATE SKIP LOCKED`, so any number of worker processes can
+poll the same table without blocking each other or running a task twice.
+A claimed task is invisible until `locked_until`; if the worker dies, the
+task becomes claimable again once that visibility timeout has passed.
+
+Because tasks are plain rows, enqueueing inside a request's transaction is
+atomic with the data it refers to: no task for a rolled back resume.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class TaskDefinition:
+    def __init__(self, func, name, max_attempts, visibility_timeout):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.visibility_timeout = visibility_timeout
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, **payload):
+        """Enqueue the task, keyword arguments must be JSON serialisable"""
+        return enqueue(self.name, **payload)
+
+    def delay_many(self, payloads):
+        """Enqueue one task per payload dict with a single INSERT"""
+        return enqueue_many(self.name, payloads)
+
+
+def task(name=None, max_attempts=5, visibility_timeout=None):
+    """Register a function as a queue task: `@task()` then `func.delay(...)`"""
+    def decorator(func):
+        definition = TaskDefinition(
+            func,
+            name or func.__name__,
+            max_attempts,
+            visibility_timeout or settings.TASK_VISIBILITY_TIMEOUT,
+        )
+        _registry[definition.name] = definition
+        return definition
+    return decorator
+
+
+def enqueue(name, run_at=None, **payload):
+    definition = _registry[name]
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=definition.max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def enqueue_many(name, payloads, run_at=None):
+    definition = _registry[name]
+    run_at = run_at or timezone.now()
+    return Task.objects.bulk_create([
+        Task(name=name, payload=payload, max_attempts=definition.max_attempts, run_at=run_at)
+        for payload in payloads
+    ], batch_size=1000)
+
+
+def claim(batch_size=10):
+    """Lock up to `batch_size` runnable tasks for this worker"""
+    now = timezone.now()
+    runnable = (
+        Q(status='PENDING', run_at__lte=now) |
+        # Claimed by a worker that died or overran its visibility timeout
+        Q(status='RUNNING', locked_until__lt=now)
+    )
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(runnable)
+            .order_by('run_at')[:batch_size]
+        )
+        for t in tasks:
+            definition = _registry.get(t.name)
+            timeout = definition.visibility_timeout if definition else settings.TASK_VISIBILITY_TIMEOUT
+            t.status = 'RUNNING'
+            t.locked_until = now + timedelta(seconds=timeout)
+            t.attempts += 1
+            Task.objects.filter(pk=t.pk).update(
+                status=t.status, locked_until=t.locked_until, attempts=F('attempts') + 1
+            )
+    return tasks
+
+
+def _retry_delay(attempts):
+    # 10s, 20s, 40s ... capped at an hour
+    return timedelta(seconds=min(settings.TASK_RETRY_DELAY * 2 ** (attempts - 1), 3600))
+
+
+def execute(t):
+    """Run one claimed task and record the outcome"""
+    definition = _registry.get(t.name)
+    try:
+        if definition is None:
+            raise LookupError(f'Unknown task {t.name!r}')
+        definition(**t.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Task %s (%s) failed, attempt %s', t.pk, t.name, t.attempts)
+        if t.attempts >= t.max_attempts or definition is None:
+            Task.objects.filter(pk=t.pk).update(status='FAILED', locked_until=None, last_error=error)
+        else:
+            Task.objects.filter(pk=t.pk).update(
+                status='PENDING',
+                locked_until=None,
+                run_at=timezone.now() + _retry_delay(t.attempts),
+                last_error=error,
+            )
+        return False
+
+    # Finished tasks are not kept, the table only holds pending work and failures
+    Task.objects.filter(pk=t.pk).delete()
+    return True
+
+
+def run_pending(batch_size=10, max_tasks=None):
+    """Claim and run tasks until the queue is empty, returns how many ran"""
+    ran = 0
+    while max_tasks is None or ran < max_tasks:
+        tasks = claim(batch_size)
+        if not tasks:
+            break
+        for t in tasks:
+            execute(t)
+            ran += 1
+    return ran
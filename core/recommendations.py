@@ -0,0 +1,261 @@
+# ==== core/recommendations.py ====
+"""
+Job recommendations for candidates.
+
+Active jobs are ranked by the cosine similarity of their term vectors
+(core/scoring.py) with the candidate's latest resume. The job vectors are
+held as a CSC matrix, one column per hashed term, so a lookup only reads
+the columns of the resume's terms.
+
+The index lives in RECOMMENDATIONS_INDEX_DIR as immutable segments of .npy
+arrays that each process maps read-only, so the workers of a host share
+one copy through the page cache. `manifest.json` lists the segments and
+the jobs removed since they were written; a job in a later segment
+replaces its copies in the earlier ones. The `update_job_index` task
+applies job changes as a small new segment or a removal, and merges the
+segments back into one once there are more than
+RECOMMENDATIONS_MAX_SEGMENTS. `manage.py rebuild_job_index` starts over
+from the database. The queue workers must write to the directory the web
+workers read, i.e. run on the same host or share it.
+"""
+import fcntl
+import json
+import logging
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+
+from .models import JobPosting, ResumeData, JobApplication
+from .scoring import N_FEATURES, job_vector, refresh_resume_vector, unpack_vector
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Only the heaviest terms of a resume are looked up, the cost grows with each
+MAX_QUERY_TERMS = 100
+# Removals kept in the manifest before the segments are merged
+MAX_REMOVED = 10000
+BUILD_CHUNK_SIZE = 2000
+# Fields the index is built from, changes to others don't touch it
+INDEXED_FIELDS = {'status', 'title', 'description', 'requirements'}
+
+
+class Segment:
+    """One immutable part of the index, memory-mapped"""
+
+    def __init__(self, path):
+        def load(name):
+            return np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+
+        self.job_ids = load('job_ids')
+        self.matrix = sparse.csc_matrix(
+            (load('data'), load('indices'), load('indptr')), shape=(len(self.job_ids), N_FEATURES), copy=False,
+        )
+        # Rows not removed nor replaced by a later segment, set by JobIndex
+        self.live = np.ones(len(self.job_ids), dtype=bool)
+
+
+class JobIndex:
+    def __init__(self, directory, manifest):
+        self.segments = [Segment(os.path.join(directory, name)) for name in manifest['segments']]
+        hidden = np.array(manifest['removed'], dtype=np.int64)
+        for segment in reversed(self.segments):
+            segment.live = ~np.isin(segment.job_ids, hidden)
+            hidden = np.concatenate([hidden, segment.job_ids])
+
+    def __len__(self):
+        return sum(int(segment.live.sum()) for segment in self.segments)
+
+    def search(self, indices, weights, limit=DEFAULT_LIMIT, exclude=()):
+        """The `limit` best (job id, score 0-100) for a term vector, jobs in `exclude` left out"""
+        if len(indices) > MAX_QUERY_TERMS:
+            keep = np.sort(np.argpartition(-weights, MAX_QUERY_TERMS)[:MAX_QUERY_TERMS])
+            indices, weights = indices[keep], weights[keep]
+        exclude = set(exclude)
+        wanted = limit + len(exclude)
+
+        candidates = []
+        for segment in self.segments:
+            if not len(segment.job_ids) or not len(indices):
+                continue
+            scores = np.where(segment.live, segment.matrix[:, indices] @ weights, 0)
+            top = np.argpartition(-scores, min(wanted, len(scores)) - 1)[:wanted]
+            candidates.extend(
+                (float(scores[row]), int(segment.job_ids[row])) for row in top if scores[row] > 0
+            )
+        candidates.sort(reverse=True)
+        ranked = [(job_id, round(score * 100, 1)) for score, job_id in candidates if job_id not in exclude]
+        return ranked[:limit]
+
+
+_loaded = {'key': None, 'index': None}
+
+
+def _manifest_path(directory):
+    return os.path.join(directory, MANIFEST)
+
+
+def get_index():
+    """The current index of this process, reloaded when the manifest changed; None before the first build"""
+    directory = settings.RECOMMENDATIONS_INDEX_DIR
+    for _ in range(3):
+        try:
+            with open(_manifest_path(directory)) as f:
+                stat = os.fstat(f.fileno())
+                key = (directory, stat.st_ino, stat.st_mtime_ns)
+                if _loaded['key'] == key:
+                    return _loaded['index']
+                manifest = json.load(f)
+            index = JobIndex(directory, manifest)
+        except FileNotFoundError:
+            if not os.path.exists(_manifest_path(directory)):
+                return None
+            # A merge deleted segments of the manifest just read, read the new one
+            continue
+        _loaded.update(key=key, index=index)
+        return index
+    raise RuntimeError(f'Could not load the job index in {directory}')
+
+
+def recommend(user, limit=DEFAULT_LIMIT):
+    """
+    The `limit` active jobs that best match the user's latest resume as
+    (job id, score) pairs, jobs they applied to left out. None if there is
+    no index yet.
+    """
+    index = get_index()
+    if index is None:
+        return None
+    resume = (
+        ResumeData.objects.filter(candidate=user).order_by('-created_at', '-id')
+        .only('id', 'term_vector', 'skills', 'summary', 'experience').first()
+    )
+    if resume is None:
+        return []
+    indices, weights = unpack_vector(resume.term_vector or refresh_resume_vector(resume))
+    applied = JobApplication.objects.filter(candidate=user).values_list('job_posting_id', flat=True)
+    return index.search(indices, weights, limit, exclude=applied)
+
+
+@contextmanager
+def _writing(directory):
+    """One writer at a time, across processes"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _read_manifest(directory):
+    try:
+        with open(_manifest_path(directory)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_manifest(directory, manifest):
+    path = _manifest_path(directory)
+    tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+    # Merged segments, and leftovers of a writer that died. Processes still
+    # mapping them keep their pages until they reload.
+    for name in set(os.listdir(directory)) - set(manifest['segments']):
+        if name.startswith('segment-'):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def _save_segment(directory, job_ids, matrix):
+    name = f'segment-{uuid.uuid4().hex}'
+    tmp = os.path.join(directory, f'{name}.tmp')
+    os.makedirs(tmp)
+    matrix = matrix.tocsc()
+    # One index type for both, scipy would convert them to a private copy otherwise
+    index_dtype = np.int32 if matrix.nnz < np.iinfo(np.int32).max else np.int64
+    arrays = {
+        'job_ids': np.asarray(job_ids, dtype=np.int64),
+        'indptr': matrix.indptr.astype(index_dtype),
+        'indices': matrix.indices.astype(index_dtype),
+        'data': matrix.data.astype(np.float32),
+    }
+    for array_name, array in arrays.items():
+        np.save(os.path.join(tmp, f'{array_name}.npy'), array)
+    os.rename(tmp, os.path.join(directory, name))
+    return name
+
+
+def _job_vectors(queryset):
+    """Ids and a CSR matrix of the term vectors of `queryset`'s jobs"""
+    job_ids, indices, weights = [], [], []
+    jobs = queryset.only('id', 'title', 'description', 'requirements').order_by('id')
+    for job in jobs.iterator(chunk_size=BUILD_CHUNK_SIZE):
+        job_indices, job_weights = job_vector(job)
+        job_ids.append(job.pk)
+        indices.append(job_indices)
+        weights.append(job_weights)
+    indptr = np.zeros(len(job_ids) + 1, dtype=np.int64)
+    np.cumsum([len(i) for i in indices], out=indptr[1:])
+    matrix = sparse.csr_matrix(
+        (
+            np.concatenate(weights) if weights else np.empty(0, dtype=np.float32),
+            np.concatenate(indices) if indices else np.empty(0, dtype=np.int32),
+            indptr,
+        ),
+        shape=(len(job_ids), N_FEATURES),
+    )
+    return job_ids, matrix
+
+
+def _build(directory):
+    job_ids, matrix = _job_vectors(JobPosting.objects.filter(status='ACTIVE'))
+    _save_manifest(directory, {'segments': [_save_segment(directory, job_ids, matrix)], 'removed': []})
+    return len(job_ids)
+
+
+def _merge(directory, manifest):
+    index = JobIndex(directory, manifest)
+    segments = [segment for segment in index.segments if segment.live.any()]
+    if not segments:
+        return {'segments': [], 'removed': []}
+    job_ids = np.concatenate([segment.job_ids[segment.live] for segment in segments])
+    matrix = sparse.vstack([segment.matrix[np.flatnonzero(segment.live)] for segment in segments], format='csc')
+    return {'segments': [_save_segment(directory, job_ids, matrix)], 'removed': []}
+
+
+def rebuild():
+    """Index every active job from scratch, returns their number"""
+    directory = settings.RECOMMENDATIONS_INDEX_DIR
+    with _writing(directory):
+        count = _build(directory)
+    logger.info('Indexed %d active jobs for recommendations', count)
+    return count
+
+
+def update(job_ids):
+    """Bring these jobs up to date in the index, builds it if there is none"""
+    directory = settings.RECOMMENDATIONS_INDEX_DIR
+    with _writing(directory):
+        manifest = _read_manifest(directory)
+        if manifest is None:
+            _build(directory)
+            return
+
+        active_ids, matrix = _job_vectors(JobPosting.objects.filter(pk__in=job_ids, status='ACTIVE'))
+        segments = list(manifest['segments'])
+        if active_ids:
+            segments.append(_save_segment(directory, active_ids, matrix))
+        # Re-added jobs are hidden in the earlier segments by the new one
+        removed = (set(manifest['removed']) - set(active_ids)) | (set(job_ids) - set(active_ids))
+        updated = {'segments': segments, 'removed': sorted(removed)}
+        if len(segments) > settings.RECOMMENDATIONS_MAX_SEGMENTS or len(removed) > MAX_REMOVED:
+            updated = _merge(directory, updated)
+        _save_manifest(directory, updated)
@@ -0,0 +1,159 @@
+# ==== core/replicas.py ====
+"""
+Read replicas.
+
+DB_REPLICAS (talentflow/settings.py) adds a `replica<n>` database per
+replica. `ReplicaRouter` sends a request's reads to one of them once the
+request opted in with `read_from_replica()`: safe-method requests of the
+core viewsets (`ReplicaReadMixin`) and the admin changelists
+(core.middleware.ReplicaRoutingMiddleware). Everything else reads from the
+primary, and so do transactions opened after the opt-in. Writes always go
+to the primary.
+
+A user's successful write pins them to the primary for REPLICA_PIN_SECONDS,
+so they read their own writes: keep it above the replication lag. Pins are
+kept in the shared cache (CACHES['shared']), which every process sees.
+Replicas more than REPLICA_MAX_LAG seconds behind, not streaming from the
+primary, or unreachable, are left out; each process checks them every
+REPLICA_CHECK_INTERVAL seconds. Without a fit replica the reads stay on the
+primary.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+# NULL when the replica isn't streaming from the primary: it then replays
+# all it received and looks current however far behind it is. Roles without
+# pg_read_all_stats see a NULL status, the receiver's row at least exists.
+# Zero once the replica replayed everything it received: an idle primary
+# sends nothing, so the last replayed transaction can be old without lag
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN NOT EXISTS (SELECT FROM pg_stat_wal_receiver WHERE status = 'streaming' OR status IS NULL) THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+# (replica alias, transactions open at the opt-in) of the current request
+_reads = ContextVar('replica_reads', default=None)
+# Replica alias -> (time.monotonic() of the check, fit)
+_checked = {}
+
+
+def _pin_key(user_id):
+    return f'replicas:pinned:{user_id}'
+
+
+def pin(user_id):
+    """Read from the primary for the user for REPLICA_PIN_SECONDS"""
+    if settings.DATABASE_REPLICAS:
+        shared_cache.set(_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return bool(shared_cache.get(_pin_key(user_id)))
+
+
+def replica_lag(alias):
+    """Seconds the replica is behind, None if it can't be reached or isn't streaming"""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        logger.exception('Could not reach the replica %s', alias)
+        connections[alias].close()
+        return None
+    if lag is None:
+        logger.warning('The replica %s is not streaming from the primary', alias)
+        return None
+    return float(lag)
+
+
+def _is_fit(alias):
+    now = time.monotonic()
+    checked = _checked.get(alias)
+    if checked is None or now - checked[0] >= settings.REPLICA_CHECK_INTERVAL:
+        lag = replica_lag(alias)
+        fit = lag is not None and lag <= settings.REPLICA_MAX_LAG
+        if lag is not None and not fit:
+            logger.warning('The replica %s is %.1fs behind, reading from the primary', alias, lag)
+        checked = _checked[alias] = (now, fit)
+    return checked[1]
+
+
+def read_from_replica(user=None):
+    """
+    Send the rest of the request's reads to a fit replica, unless `user`
+    wrote lately. Returns the replica's alias, None for the primary.
+    """
+    if not settings.DATABASE_REPLICAS:
+        return None
+    if user is not None and user.is_authenticated and is_pinned(user.pk):
+        return None
+    fit = [alias for alias in settings.DATABASE_REPLICAS if _is_fit(alias)]
+    if not fit:
+        return None
+    alias = random.choice(fit)
+    _reads.set((alias, len(connections[DEFAULT_DB_ALIAS].atomic_blocks)))
+    return alias
+
+
+@contextmanager
+def primary():
+    """
+    Reads in the block go to the primary, unless it calls
+    `read_from_replica()`. Also for results cached for everyone: from a
+    lagging replica, stale data would be cached under the new version.
+    """
+    token = _reads.set(None)
+    try:
+        yield
+    finally:
+        _reads.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        reads = _reads.get()
+        # The shared cache's table (DatabaseCache) holds pins and revocations,
+        # a lagging replica would miss the latest
+        if reads is None or model._meta.app_label == 'django_cache':
+            return DEFAULT_DB_ALIAS
+        alias, atomic_depth = reads
+        # A transaction opened since reads its own writes
+        if len(connections[DEFAULT_DB_ALIAS].atomic_blocks) > atomic_depth:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Also for instances read from a replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema through replication
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """Viewset reads from a replica, decided once the user is authenticated"""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            read_from_replica(request.user)
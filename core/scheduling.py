@@ -0,0 +1,147 @@
+# ==== core/scheduling.py ====
+"""
+Interviewer availability and panel scheduling.
+
+`Interview.slot` is the tstzrange [scheduled_time, scheduled_time +
+duration) maintained by a trigger, and the `interview_no_double_booking`
+trigger (an exclusion constraint before the table was partitioned,
+migration 0013) keeps the slots of an interviewer's scheduled interviews
+from overlapping. The GiST index on (interviewer range, slot) it checks with
+also serves the overlap lookups below, which run as one statement for all
+interviewers instead of walking their calendars in Python; they spell the
+interviewer test like the index does so the planner can use it.
+"""
+from django.db import IntegrityError, connection, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Interview
+
+# Interviews that hold their slot, same as the check's condition
+ACTIVE_STATUSES = ['SCHEDULED', 'RESCHEDULED']
+DOUBLE_BOOKING_CONSTRAINT = 'interview_no_double_booking'
+
+AVAILABILITY_SQL = """
+WITH search_window AS (
+    SELECT tstzrange(%(start)s, %(end)s, '[)') AS slot
+),
+busy AS (
+    SELECT p.interviewer_id,
+           coalesce(range_agg(i.slot) FILTER (WHERE i.id IS NOT NULL), '{}'::tstzmultirange) AS slots
+    FROM unnest(%(interviewers)s::integer[]) AS p(interviewer_id)
+    CROSS JOIN search_window w
+    LEFT JOIN core_interview i
+        ON int4range(i.interviewer_id, i.interviewer_id, '[]') && int4range(p.interviewer_id, p.interviewer_id, '[]')
+        AND i.status = ANY(%(statuses)s)
+        AND i.slot && w.slot
+    GROUP BY p.interviewer_id
+),
+free AS (
+    SELECT b.interviewer_id, tstzmultirange(w.slot) - b.slots AS slots
+    FROM busy b CROSS JOIN search_window w
+),
+everyone AS (
+    SELECT NULL::integer AS interviewer_id, range_intersect_agg(slots) AS slots FROM free
+)
+SELECT f.interviewer_id, lower(r.slot), upper(r.slot)
+FROM (SELECT * FROM free UNION ALL SELECT * FROM everyone) AS f
+CROSS JOIN unnest(f.slots) AS r(slot)
+WHERE upper(r.slot) - lower(r.slot) >= make_interval(mins => %(duration)s)
+ORDER BY f.interviewer_id NULLS FIRST, lower(r.slot)
+"""
+
+CONFLICTS_SQL = """
+WITH booking AS (
+    SELECT b.n - 1 AS position, b.interviewer_id, tstzrange(b.starts, b.ends, '[)') AS slot
+    FROM unnest(%(interviewers)s::integer[], %(starts)s::timestamptz[], %(ends)s::timestamptz[])
+        WITH ORDINALITY AS b(interviewer_id, starts, ends, n)
+)
+SELECT b.position, 'interview', i.id
+FROM booking b
+JOIN core_interview i
+    ON int4range(i.interviewer_id, i.interviewer_id, '[]') && int4range(b.interviewer_id, b.interviewer_id, '[]')
+    AND i.status = ANY(%(statuses)s)
+    AND i.slot && b.slot
+UNION ALL
+SELECT b.position, 'booking', o.position
+FROM booking b
+JOIN booking o
+    ON o.interviewer_id = b.interviewer_id
+    AND o.position < b.position
+    AND o.slot && b.slot
+ORDER BY 1, 2, 3
+"""
+
+
+class ScheduleConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The interviewer is already booked at that time.'
+    default_code = 'schedule_conflict'
+
+    def __init__(self, conflicts=None):
+        super().__init__()
+        if conflicts:
+            # Set afterwards, APIException would turn the ids into strings
+            self.detail = {'detail': self.detail, 'conflicts': conflicts}
+
+
+def is_double_booking(exc):
+    """Whether an IntegrityError comes from the double booking check"""
+    diag = getattr(exc.__cause__, 'diag', None)
+    return getattr(diag, 'constraint_name', None) == DOUBLE_BOOKING_CONSTRAINT
+
+
+def availability(interviewer_ids, start, end, duration_minutes):
+    """
+    Free ranges of at least `duration_minutes` within [start, end):
+    {'interviewers': {id: [(start, end), ...]}, 'common': [...]}, where
+    `common` is the time every interviewer is free (panel interviews).
+    """
+    free = {interviewer_id: [] for interviewer_id in interviewer_ids}
+    common = []
+    with connection.cursor() as cursor:
+        cursor.execute(AVAILABILITY_SQL, {
+            'start': start,
+            'end': end,
+            'interviewers': list(interviewer_ids),
+            'statuses': ACTIVE_STATUSES,
+            'duration': duration_minutes,
+        })
+        for interviewer_id, free_from, free_until in cursor.fetchall():
+            (common if interviewer_id is None else free[interviewer_id]).append((free_from, free_until))
+    return {'interviewers': free, 'common': common}
+
+
+def find_conflicts(interviews):
+    """
+    Overlaps of unsaved interviews with scheduled ones and with each other,
+    as [{'index': i, 'interview': id} or {'index': i, 'booking': j}].
+    """
+    if not interviews:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(CONFLICTS_SQL, {
+            'interviewers': [interview.interviewer_id for interview in interviews],
+            'starts': [interview.scheduled_time for interview in interviews],
+            'ends': [interview.end_time for interview in interviews],
+            'statuses': ACTIVE_STATUSES,
+        })
+        return [{'index': position, kind: other} for position, kind, other in cursor.fetchall()]
+
+
+def schedule(interviews):
+    """
+    Create the interviews all or nothing. Raises ScheduleConflict listing
+    the overlaps if any would double-book an interviewer.
+    """
+    conflicts = find_conflicts(interviews)
+    if conflicts:
+        raise ScheduleConflict(conflicts)
+    try:
+        with transaction.atomic():
+            return Interview.objects.bulk_create(interviews)
+    except IntegrityError as exc:
+        # Someone booked one of the slots after the check
+        if is_double_booking(exc):
+            raise ScheduleConflict()
+        raise
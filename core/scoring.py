@@ -0,0 +1,226 @@
+# ==== core/scoring.py ====
+"""
+AI match scoring.
+
+Job postings and resumes are turned into hashed, sublinear-TF, L2-normalised
+sparse term vectors; the match score is their cosine similarity (0-100).
+Resume vectors are precomputed and stored on `ResumeData.term_vector`, so
+re-scoring a whole applicant pool is one sparse matrix-vector product.
+"""
+import json
+import math
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from django.db import connection, transaction
+
+from .models import JobApplication, ResumeData
+from . import stats
+
+ENGINE_VERSION = 'hashed-tf-v1'
+N_FEATURES = 2 ** 18
+
+# Skills are the strongest signal on both sides
+SKILL_WEIGHT = 3
+REQUIREMENTS_WEIGHT = 2
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+STOP_WORDS = frozenset("""
+    a an and are as at be by for from has have in is it its of on or our that
+    the this to we will with you your years year experience work working team
+""".split())
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def _flatten(value):
+    """Yield every string inside a JSON value (experience/education entries)"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _flatten(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten(item)
+
+
+def _feature(term):
+    # crc32 rather than hash(): stable across processes and restarts
+    return zlib.crc32(term.encode('utf-8')) % N_FEATURES
+
+
+def _vectorize(weighted_texts):
+    counts = Counter()
+    for text, weight in weighted_texts:
+        for term in tokenize(text):
+            counts[_feature(term)] += weight
+    if not counts:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+    indices = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    weights = np.fromiter((1.0 + math.log(c) for c in counts.values()), dtype=np.float32, count=len(counts))
+    order = np.argsort(indices)
+    indices, weights = indices[order], weights[order]
+    weights /= np.linalg.norm(weights)
+    return indices, weights
+
+
+def job_vector(job):
+    return _vectorize([
+        (job.title, SKILL_WEIGHT),
+        (job.description, 1),
+        (job.requirements, REQUIREMENTS_WEIGHT),
+    ])
+
+
+def resume_vector(resume):
+    skills = ' '.join(_flatten(resume.skills))
+    return _vectorize([
+        (skills, SKILL_WEIGHT),
+        (resume.summary, 1),
+        (' '.join(_flatten(resume.experience)), 1),
+    ])
+
+
+def pack_vector(indices, weights):
+    return indices.astype('<i4').tobytes() + weights.astype('<f4').tobytes()
+
+
+def unpack_vector(data):
+    data = bytes(data)
+    n = len(data) // 8
+    indices = np.frombuffer(data, dtype='<i4', count=n)
+    weights = np.frombuffer(data, dtype='<f4', count=n, offset=4 * n)
+    return indices, weights
+
+
+def refresh_resume_vector(resume, save=True):
+    """Recompute the stored term vector after the resume content changed"""
+    resume.term_vector = pack_vector(*resume_vector(resume))
+    if save:
+        ResumeData.objects.filter(pk=resume.pk).update(term_vector=resume.term_vector)
+    return resume.term_vector
+
+
+def _dense(indices, weights):
+    dense = np.zeros(N_FEATURES, dtype=np.float32)
+    dense[indices] = weights
+    return dense
+
+
+def _matched_skills(job_terms, skills):
+    return [skill for skill in _flatten(skills) if set(tokenize(skill)) & job_terms][:20]
+
+
+def _job_terms(job):
+    return set(tokenize(' '.join(filter(None, [job.title, job.description, job.requirements]))))
+
+
+def _details(job_terms, skills):
+    return {'engine': ENGINE_VERSION, 'matched_skills': _matched_skills(job_terms, skills)}
+
+
+def score_application(application):
+    """Score a single application and save the result"""
+    job = application.job_posting
+    resume = application.resume_data
+    if not resume.term_vector:
+        refresh_resume_vector(resume)
+
+    indices, weights = unpack_vector(resume.term_vector)
+    score = float(_dense(*job_vector(job))[indices] @ weights) if len(indices) else 0.0
+
+    application.ai_match_score = round(score * 100, 1)
+    application.ai_match_details = _details(_job_terms(job), resume.skills)
+    JobApplication.objects.filter(pk=application.pk).update(
+        ai_match_score=application.ai_match_score,
+        ai_match_details=application.ai_match_details,
+    )
+    # .update() sends no signals, the dashboard averages are stale now
+    stats.invalidate(job.company_id)
+    return application.ai_match_score
+
+
+def score_matrix(job, vectors):
+    """
+    Cosine scores (0-100) of `job` against a list of packed resume vectors,
+    as one CSR matrix times the dense job vector.
+    """
+    unpacked = [unpack_vector(v) for v in vectors]
+    lengths = np.fromiter((len(i) for i, _ in unpacked), dtype=np.int64, count=len(unpacked))
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    if len(unpacked):
+        indices = np.concatenate([i for i, _ in unpacked])
+        data = np.concatenate([w for _, w in unpacked])
+    else:
+        indices = np.empty(0, dtype=np.int32)
+        data = np.empty(0, dtype=np.float32)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(unpacked), N_FEATURES))
+    scores = matrix @ _dense(*job_vector(job))
+    return np.round(scores * 100, 1)
+
+
+def _ensure_vectors(rows):
+    """Fill in term vectors for resumes that were saved without one"""
+    missing = {resume_id for _, resume_id, vector, _ in rows if not vector}
+    if not missing:
+        return rows
+    resumes = list(ResumeData.objects.filter(pk__in=missing))
+    for resume in resumes:
+        refresh_resume_vector(resume, save=False)
+    ResumeData.objects.bulk_update(resumes, ['term_vector'], batch_size=1000)
+    vectors = {resume.pk: resume.term_vector for resume in resumes}
+    return [
+        (app_id, resume_id, vector or vectors[resume_id], skills)
+        for app_id, resume_id, vector, skills in rows
+    ]
+
+
+def _write_scores(ids, scores, details):
+    if connection.vendor == 'postgresql':
+        # One UPDATE for the whole pool instead of one per row
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE core_jobapplication AS a
+                SET ai_match_score = v.score, ai_match_details = v.details
+                FROM unnest(%s::bigint[], %s::float8[], %s::jsonb[]) AS v(id, score, details)
+                WHERE a.id = v.id
+                """,
+                [ids, scores, [json.dumps(d) for d in details]],
+            )
+        return
+    applications = [
+        JobApplication(pk=pk, ai_match_score=score, ai_match_details=detail)
+        for pk, score, detail in zip(ids, scores, details)
+    ]
+    JobApplication.objects.bulk_update(applications, ['ai_match_score', 'ai_match_details'], batch_size=1000)
+
+
+def rescore_job(job):
+    """Re-score every application to `job` in one batch, returns the count"""
+    rows = list(
+        JobApplication.objects.filter(job_posting=job).values_list(
+            'id', 'resume_data_id', 'resume_data__term_vector', 'resume_data__skills'
+        )
+    )
+    if not rows:
+        return 0
+    rows = _ensure_vectors(rows)
+
+    scores = score_matrix(job, [vector for _, _, vector, _ in rows])
+    job_terms = _job_terms(job)
+    details = [_details(job_terms, skills) for _, _, _, skills in rows]
+
+    with transaction.atomic():
+        _write_scores([row[0] for row in rows], scores.tolist(), details)
+    stats.invalidate(job.company_id)
+    return len(rows)
@@ -0,0 +1,44 @@
+# ==== core/search.py ====
+"""
+Full-text search over the stored `search_vector` columns.
+
+The vectors are maintained by database triggers (migration 0007), so a
+search is a GIN index lookup plus ranking of the matches; nothing is
+parsed from the document text except the snippet of the rows returned.
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F
+
+# Must match the configuration the triggers build the vectors with
+SEARCH_CONFIG = 'english'
+
+HEADLINE_OPTIONS = {
+    'start_sel': '<mark>',
+    'stop_sel': '</mark>',
+    'max_words': 35,
+    'min_words': 15,
+    'max_fragments': 2,
+}
+
+
+def parse_query(text):
+    """Web-search syntax: `python -java "data engineer" or spark`"""
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def search(queryset, text, headline_field):
+    """
+    Filter `queryset` to the rows matching `text`, best match first, with
+    `rank` and a highlighted `headline` of `headline_field` annotated.
+    """
+    query = parse_query(text)
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(
+            rank=SearchRank(F('search_vector'), query, normalization=32),
+            # ts_headline re-parses the text; Postgres only evaluates it
+            # for the rows left after ORDER BY ... LIMIT
+            headline=SearchHeadline(headline_field, query, config=SEARCH_CONFIG, **HEADLINE_OPTIONS),
+        )
+        .order_by('-rank', '-id')
+    )
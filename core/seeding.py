@@ -0,0 +1,299 @@
+# ==== core/seeding.py ====
+"""
+Synthetic data for benchmarks and load tests (`manage.py seed_data`, and
+the fixtures of benchmarks/).
+
+The size is given as a number of applications; companies, jobs, candidates,
+resumes and interviews are derived from it (see `Scale.for_applications`).
+Rows are written with `bulk_create` in batches, and the generator is
+seeded, so the same arguments always produce the same data set. Names and
+codes carry a random run id, so seeding twice adds a second data set
+instead of failing on unique usernames and company codes.
+"""
+import itertools
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .models import Company, UserProfile, JobPosting, ResumeData, JobApplication, Interview
+from . import partitions, signals, stats
+
+BATCH_SIZE = 5000
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+TITLES = [
+    'Backend Engineer', 'Frontend Engineer', 'Data Scientist', 'Product Manager', 'DevOps Engineer',
+    'QA Analyst', 'Mobile Developer', 'Security Engineer', 'UX Designer', 'Data Engineer',
+    'Machine Learning Engineer', 'Technical Writer', 'Support Engineer', 'Sales Engineer', 'Recruiter',
+]
+SENIORITY = ['Junior', '', 'Senior', 'Staff', 'Lead']
+DEPARTMENTS = ['Engineering', 'Data', 'Product', 'Design', 'Operations', 'Sales', 'People']
+LOCATIONS = ['Remote', 'Berlin', 'London', 'Paris', 'Casablanca', 'New York', 'Toronto', 'Madrid']
+JOB_TYPES = ['FULL_TIME', 'PART_TIME', 'CONTRACT', 'INTERNSHIP']
+SKILLS = [
+    'Python', 'Django', 'PostgreSQL', 'JavaScript', 'TypeScript', 'React', 'Docker', 'Kubernetes',
+    'AWS', 'Go', 'Java', 'SQL', 'Redis', 'Kafka', 'Terraform', 'Linux', 'Pandas', 'Spark',
+    'Figma', 'CI/CD', 'GraphQL', 'REST', 'Celery', 'Rust',
+]
+FIRST_NAMES = ['Amina', 'Youssef', 'Sara', 'Omar', 'Lina', 'Adam', 'Maya', 'Karim', 'Nora', 'Ilyas', 'Emma', 'Leo']
+LAST_NAMES = ['Benali', 'Haddad', 'Martin', 'Garcia', 'Smith', 'Nguyen', 'Rossi', 'Kowalski', 'Silva', 'Idrissi']
+# (status, weight) of applications and interviews
+APPLICATION_STATUSES = [
+    ('APPLIED', 50), ('UNDER_REVIEW', 20), ('INTERVIEW_SCHEDULED', 10), ('INTERVIEWED', 5),
+    ('REJECTED', 12), ('ACCEPTED', 3),
+]
+INTERVIEW_STATUSES = [('SCHEDULED', 80), ('COMPLETED', 10), ('CANCELLED', 10)]
+INTERVIEW_TYPES = ['PHONE', 'VIDEO', 'ONSITE', 'TECHNICAL']
+# Spread of created_at / applied_at into the past
+JOB_AGE = timedelta(days=90)
+APPLICATION_AGE = timedelta(days=60)
+
+
+@dataclass
+class Scale:
+    companies: int
+    hr_per_company: int
+    jobs_per_company: int
+    candidates: int
+    applications_per_candidate: int
+    interview_share: float
+
+    @classmethod
+    def for_applications(cls, applications):
+        """About 5000 applications per company, each candidate applying to 4 of its jobs"""
+        return cls(
+            companies=max(1, applications // 5000),
+            hr_per_company=5,
+            jobs_per_company=25,
+            candidates=max(1, applications // 4),
+            applications_per_candidate=4,
+            interview_share=0.1,
+        )
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+class Seeder:
+    """Builds one data set; `run()` returns the ids benchmarks need"""
+
+    def __init__(self, scale, seed=0, password='benchmark', batch_size=BATCH_SIZE, log=None):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.password = password
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.run_id = uuid.uuid4().hex[:8]
+
+    def run(self):
+        started = time.perf_counter()
+        companies = self.step('companies', self.create_companies)
+        hr_users = self.step('HR users', lambda: self.create_hr_users(companies))
+        jobs = self.step('job postings', lambda: self.create_jobs(companies, hr_users))
+        candidates, resumes = self.step('candidates and resumes', self.create_candidates)
+        # Backdated rows would otherwise pile up in the default partitions
+        partitions.create_partitions(since=timezone.now() - APPLICATION_AGE)
+        applications, to_interview = self.step(
+            'applications', lambda: self.create_applications(jobs, candidates, resumes)
+        )
+        interviews = self.step('interviews', lambda: self.create_interviews(to_interview, hr_users))
+
+        # bulk_create sends no signals
+        for company_id in companies:
+            stats.invalidate(company_id)
+            signals.invalidate_job_lists(company_id)
+        self.log(f'Seeded run {self.run_id} in {time.perf_counter() - started:.1f}s')
+        return {
+            'run_id': self.run_id,
+            'companies': companies,
+            'hr_users': hr_users,
+            'jobs': jobs,
+            'candidates': candidates,
+            'applications': applications,
+            'interviews': interviews,
+        }
+
+    def step(self, label, create):
+        started = time.perf_counter()
+        result = create()
+        self.log(f'{label} done in {time.perf_counter() - started:.1f}s')
+        return result
+
+    def bulk_create(self, model, objects):
+        """Insert any iterable of unsaved objects in batches, returns the saved ones' ids"""
+        ids = []
+        for batch in _chunks(objects, self.batch_size):
+            ids.extend(obj.pk for obj in self.insert(model, batch))
+        return ids
+
+    def insert(self, model, batch):
+        with transaction.atomic():
+            return model.objects.bulk_create(batch)
+
+    def backdate(self, table, column, ids, age):
+        """Spread the auto_now_add timestamps of freshly inserted rows over `age`"""
+        with connection.cursor() as cursor:
+            for batch in _chunks(ids, self.batch_size):
+                cursor.execute(
+                    f'UPDATE {table} SET {column} = {column} - random() * %s WHERE id = ANY(%s)',
+                    [age, batch],
+                )
+
+    def create_companies(self):
+        return self.bulk_create(Company, [
+            Company(name=f'Company {self.run_id}-{n}', registration_code=f'SEED-{self.run_id}-{n}')
+            for n in range(self.scale.companies)
+        ])
+
+    def create_hr_users(self, companies):
+        """{company id: [HR user ids]}, all with `password` and an API token"""
+        encoded = make_password(self.password)
+        users = [
+            User(
+                username=f'hr-{self.run_id}-{company_n}-{n}', email=f'hr-{self.run_id}-{company_n}-{n}@example.com',
+                password=encoded, first_name=self.rng.choice(FIRST_NAMES), last_name=self.rng.choice(LAST_NAMES),
+            )
+            for company_n in range(len(companies)) for n in range(self.scale.hr_per_company)
+        ]
+        user_ids = self.bulk_create(User, users)
+        by_company = {
+            company_id: user_ids[n * self.scale.hr_per_company:(n + 1) * self.scale.hr_per_company]
+            for n, company_id in enumerate(companies)
+        }
+        self.bulk_create(UserProfile, [
+            UserProfile(user_id=user_id, user_type='HR', company_id=company_id)
+            for company_id, ids in by_company.items() for user_id in ids
+        ])
+        Token.objects.bulk_create([Token(key=Token.generate_key(), user_id=user_id) for user_id in user_ids])
+        return by_company
+
+    def create_jobs(self, companies, hr_users):
+        """{company id: [job ids]}"""
+        jobs = []
+        for company_id in companies:
+            for _ in range(self.scale.jobs_per_company):
+                title = f'{self.rng.choice(SENIORITY)} {self.rng.choice(TITLES)}'.strip()
+                skills = self.rng.sample(SKILLS, 5)
+                jobs.append(JobPosting(
+                    company_id=company_id,
+                    created_by_id=self.rng.choice(hr_users[company_id]),
+                    title=title,
+                    description=f'We are hiring a {title} to work with {", ".join(skills[:3])}.',
+                    requirements=', '.join(skills),
+                    location=self.rng.choice(LOCATIONS),
+                    job_type=self.rng.choice(JOB_TYPES),
+                    department=self.rng.choice(DEPARTMENTS),
+                    status=_weighted(self.rng, [('ACTIVE', 70), ('DRAFT', 10), ('PAUSED', 10), ('CLOSED', 10)]),
+                ))
+        job_ids = self.bulk_create(JobPosting, jobs)
+        self.backdate('core_jobposting', 'created_at', job_ids, JOB_AGE)
+        per_company = self.scale.jobs_per_company
+        return {
+            company_id: job_ids[n * per_company:(n + 1) * per_company]
+            for n, company_id in enumerate(companies)
+        }
+
+    def create_candidates(self):
+        """Candidate user ids and their resume ids, one resume each"""
+        user_ids, resume_ids = [], []
+        for numbers in _chunks(range(self.scale.candidates), self.batch_size):
+            users = []
+            for n in numbers:
+                user = User(
+                    username=f'cand-{self.run_id}-{n}', email=f'cand-{self.run_id}-{n}@example.com',
+                    first_name=self.rng.choice(FIRST_NAMES), last_name=self.rng.choice(LAST_NAMES),
+                )
+                # No hashing cost, nobody logs in as a seeded candidate
+                user.set_unusable_password()
+                users.append(user)
+            users = self.insert(User, users)
+            self.insert(UserProfile, [UserProfile(user=user, user_type='CANDIDATE') for user in users])
+            resumes = self.insert(ResumeData, [self.build_resume(user) for user in users])
+            user_ids.extend(user.pk for user in users)
+            resume_ids.extend(resume.pk for resume in resumes)
+        self.log(f'{len(user_ids)} candidates')
+        return user_ids, resume_ids
+
+    def build_resume(self, user):
+        skills = self.rng.sample(SKILLS, self.rng.randint(3, 8))
+        return ResumeData(
+            candidate=user,
+            full_name=f'{user.first_name} {user.last_name}',
+            email=user.email,
+            location=self.rng.choice(LOCATIONS),
+            summary=f'{self.rng.choice(TITLES)} with {self.rng.randint(1, 15)} years of {skills[0]}.',
+            skills=skills,
+            experience=[{'title': self.rng.choice(TITLES), 'years': self.rng.randint(1, 6)}],
+            education=[{'degree': 'BSc Computer Science'}],
+            original_file_name='resume.pdf',
+        )
+
+    def create_applications(self, jobs, candidates, resumes):
+        """
+        The number of applications, and the (application id, company id)
+        pairs picked for an interview; only those are kept in memory.
+        """
+        count, to_interview = 0, []
+        for batch in _chunks(self.build_applications(jobs, candidates, resumes), self.batch_size):
+            applications = self.insert(JobApplication, batch)
+            self.backdate('core_jobapplication', 'applied_at', [app.pk for app in applications], APPLICATION_AGE)
+            count += len(applications)
+            to_interview.extend(
+                (app.pk, app.seed_company_id) for app in applications
+                if self.rng.random() < self.scale.interview_share
+            )
+        self.log(f'{count} applications')
+        return count, to_interview
+
+    def build_applications(self, jobs, candidates, resumes):
+        company_ids = list(jobs)
+        per_candidate = min(self.scale.applications_per_candidate, self.scale.jobs_per_company)
+        for candidate_id, resume_id in zip(candidates, resumes):
+            company_id = self.rng.choice(company_ids)
+            for job_id in self.rng.sample(jobs[company_id], per_candidate):
+                application = JobApplication(
+                    job_posting_id=job_id,
+                    candidate_id=candidate_id,
+                    resume_data_id=resume_id,
+                    status=_weighted(self.rng, APPLICATION_STATUSES),
+                    ai_match_score=round(self.rng.uniform(0, 100), 1),
+                )
+                application.seed_company_id = company_id
+                yield application
+
+    def create_interviews(self, to_interview, hr_users):
+        # Back to back hourly slots per interviewer, never double-booked
+        start = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+        next_slot = {}
+        interviews = []
+        for application_id, company_id in to_interview:
+            interviewer_id = self.rng.choice(hr_users[company_id])
+            slot = next_slot.get(interviewer_id, 0)
+            next_slot[interviewer_id] = slot + 1
+            interviews.append(Interview(
+                application_id=application_id,
+                interviewer_id=interviewer_id,
+                interview_type=self.rng.choice(INTERVIEW_TYPES),
+                scheduled_time=start + timedelta(hours=slot),
+                duration_minutes=60,
+                status=_weighted(self.rng, INTERVIEW_STATUSES),
+            ))
+        ids = self.bulk_create(Interview, interviews)
+        self.log(f'{len(ids)} interviews')
+        return ids
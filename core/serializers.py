@@ -1,14 +1,81 @@
 # ==== core/serializers.py (create this new file) ====
+from datetime import timedelta
+
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Company, UserProfile, JobPosting, ResumeData, JobApplication, Interview
+from . import metrics
+
+
+def split_field_paths(paths):
+    """['id', 'job_posting.title'] -> {'id': [], 'job_posting': ['title']}"""
+    tree = {}
+    for path in paths:
+        name, _, rest = path.partition('.')
+        tree.setdefault(name, [])
+        if rest:
+            tree[name].append(rest)
+    return tree
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets for model serializers.
+
+    `fields=[...]` keeps only the named fields (`default_fields` when not
+    given) and `expand=[...]` renders the relations in `expandable_fields`
+    with their nested serializer instead of a primary key. Dotted names
+    (`job_posting.title`) are passed on to the nested serializer.
+    """
+    default_fields = None
+    expandable_fields = {}
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requested_fields = fields
+        self.requested_expand = expand or []
+
+    def to_representation(self, instance):
+        # Reported per request by core.metrics
+        with metrics.serializer_timer():
+            return super().to_representation(instance)
+
+    def get_fields(self):
+        fields = super().get_fields()
 
-class CompanySerializer(serializers.ModelSerializer):
+        requested = self.requested_fields
+        if requested is None:
+            requested = self.default_fields
+        requested = split_field_paths(requested) if requested is not None else None
+
+        expand = split_field_paths(self.requested_expand)
+        if requested:
+            # Asking for `job_posting.title` implies expanding `job_posting`
+            for name, sub_fields in requested.items():
+                if sub_fields:
+                    expand.setdefault(name, [])
+
+        for name, sub_expand in expand.items():
+            if name in self.expandable_fields and name in fields:
+                fields[name] = self.expandable_fields[name](read_only=True, expand=sub_expand)
+            elif isinstance(fields.get(name), DynamicFieldsMixin):
+                fields[name].requested_expand = sub_expand
+
+        if requested is not None:
+            fields = {name: field for name, field in fields.items() if name in requested}
+            for name, sub_fields in requested.items():
+                if sub_fields and isinstance(fields.get(name), DynamicFieldsMixin):
+                    fields[name].requested_fields = sub_fields
+
+        return fields
+
+
+class CompanySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Company
         fields = '__all__'
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'date_joined']
@@ -21,38 +88,219 @@ class UserProfileSerializer(serializers.ModelSerializer):
         model = UserProfile
         fields = '__all__'
 
-class JobPostingSerializer(serializers.ModelSerializer):
+class JobPostingSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     company = CompanySerializer(read_only=True)
     created_by = UserSerializer(read_only=True)
     
     class Meta:
         model = JobPosting
-        fields = '__all__'
+        exclude = ['search_vector']
 
-class ResumeDataSerializer(serializers.ModelSerializer):
+class ResumeDataSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     candidate = UserSerializer(read_only=True)
     
     class Meta:
         model = ResumeData
-        fields = '__all__'
+        exclude = ['term_vector', 'search_vector']
 
-class JobApplicationSerializer(serializers.ModelSerializer):
+class JobApplicationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     job_posting = JobPostingSerializer(read_only=True)
     candidate = UserSerializer(read_only=True)
     resume_data = ResumeDataSerializer(read_only=True)
     
+    # Used when a candidate applies
+    job_posting_id = serializers.PrimaryKeyRelatedField(
+        source='job_posting', queryset=JobPosting.objects.filter(status='ACTIVE'),
+        write_only=True, required=False
+    )
+    resume_data_id = serializers.PrimaryKeyRelatedField(
+        source='resume_data', queryset=ResumeData.objects.all(),
+        write_only=True, required=False
+    )
+    
     class Meta:
         model = JobApplication
         fields = '__all__'
+        read_only_fields = ['ai_match_score', 'ai_match_details']
+    
+    def validate(self, attrs):
+        if self.instance is not None:
+            # The job and resume of an existing application can't be changed
+            attrs.pop('job_posting', None)
+            attrs.pop('resume_data', None)
+            return attrs
+        
+        if 'job_posting' not in attrs or 'resume_data' not in attrs:
+            raise serializers.ValidationError('job_posting_id and resume_data_id are required')
+        
+        request = self.context.get('request')
+        if request:
+            if attrs['resume_data'].candidate_id != request.user.id:
+                raise serializers.ValidationError({'resume_data_id': 'Unknown resume'})
+            if JobApplication.objects.filter(job_posting=attrs['job_posting'], candidate=request.user).exists():
+                raise serializers.ValidationError('You have already applied to this job')
+        return attrs
+
+class BulkStatusFilterSerializer(serializers.Serializer):
+    job_posting = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=JobApplication.STATUS_CHOICES, required=False)
 
-class InterviewSerializer(serializers.ModelSerializer):
+class BulkStatusSerializer(serializers.Serializer):
+    """Body of applications/bulk-status/: a target status and `ids` or a `filter`"""
+    MAX_IDS = 5000
+    
+    status = serializers.ChoiceField(choices=JobApplication.STATUS_CHOICES)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=MAX_IDS)
+    filter = BulkStatusFilterSerializer(required=False)
+    
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide either ids or filter')
+        if 'filter' in attrs and not attrs['filter']:
+            raise serializers.ValidationError({'filter': 'At least one of job_posting, status is required'})
+        return attrs
+
+class InterviewSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     application = JobApplicationSerializer(read_only=True)
     interviewer = UserSerializer(read_only=True)
     
     class Meta:
         model = Interview
+        exclude = ['slot', 'application_applied_at']
+
+class AvailabilitySerializer(serializers.Serializer):
+    """Query of interviews/availability/: `interviewers=1,2,3`, a window and a slot length"""
+    MAX_INTERVIEWERS = 20
+    MAX_WINDOW = timedelta(days=31)
+    
+    interviewers = serializers.CharField()
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    duration = serializers.IntegerField(min_value=1, max_value=24 * 60, default=60)
+    
+    def validate_interviewers(self, value):
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in value.split(',') if pk.strip()))
+        except ValueError:
+            raise serializers.ValidationError('Expected comma-separated user ids')
+        if not ids:
+            raise serializers.ValidationError('At least one interviewer is required')
+        if len(ids) > self.MAX_INTERVIEWERS:
+            raise serializers.ValidationError(f'At most {self.MAX_INTERVIEWERS} interviewers')
+        return ids
+    
+    def validate(self, attrs):
+        if attrs['end'] <= attrs['start']:
+            raise serializers.ValidationError({'end': 'Must be after start'})
+        if attrs['end'] - attrs['start'] > self.MAX_WINDOW:
+            raise serializers.ValidationError({'end': f'The window is limited to {self.MAX_WINDOW.days} days'})
+        return attrs
+
+class InterviewBookingSerializer(serializers.Serializer):
+    application = serializers.IntegerField()
+    interviewer = serializers.IntegerField()
+    scheduled_time = serializers.DateTimeField()
+    # Fall back to the panel's values
+    duration_minutes = serializers.IntegerField(min_value=1, max_value=24 * 60, required=False)
+    interview_type = serializers.ChoiceField(choices=Interview.INTERVIEW_TYPES, required=False)
+    location = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    meeting_link = serializers.URLField(required=False, allow_blank=True)
+
+class PanelScheduleSerializer(serializers.Serializer):
+    """Body of interviews/bulk-schedule/: shared details plus one entry per interview"""
+    MAX_INTERVIEWS = 500
+    
+    interview_type = serializers.ChoiceField(choices=Interview.INTERVIEW_TYPES, default='ONSITE')
+    duration_minutes = serializers.IntegerField(min_value=1, max_value=24 * 60, default=60)
+    location = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    meeting_link = serializers.URLField(required=False, allow_blank=True)
+    interviews = InterviewBookingSerializer(many=True, allow_empty=False, max_length=MAX_INTERVIEWS)
+    
+    def validate(self, attrs):
+        shared = {name: value for name, value in attrs.items() if name != 'interviews'}
+        attrs['interviews'] = [{**shared, **booking} for booking in attrs['interviews']]
+        return attrs
+
+# Compact serializers for list endpoints: relations are primary keys unless
+# expanded, large text/JSON columns are left out unless asked for by `?fields=`
+
+class CompanyListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    default_fields = ['id', 'name', 'website', 'logo', 'is_active']
+    
+    class Meta:
+        model = Company
         fields = '__all__'
 
+class JobPostingListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    default_fields = [
+        'id', 'title', 'location', 'job_type', 'department', 'status',
+        'public_id', 'company', 'created_by', 'created_at', 'updated_at',
+    ]
+    expandable_fields = {
+        'company': CompanyListSerializer,
+        'created_by': UserSerializer,
+    }
+    
+    class Meta:
+        model = JobPosting
+        exclude = ['search_vector']
+
+class ResumeDataListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    default_fields = [
+        'id', 'candidate', 'full_name', 'email', 'location',
+        'original_file_name', 'created_at', 'updated_at',
+    ]
+    expandable_fields = {
+        'candidate': UserSerializer,
+    }
+    
+    class Meta:
+        model = ResumeData
+        exclude = ['term_vector', 'search_vector']
+
+class JobPostingSearchSerializer(JobPostingListSerializer):
+    default_fields = JobPostingListSerializer.default_fields + ['rank', 'headline']
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+class JobPostingRecommendationSerializer(JobPostingListSerializer):
+    default_fields = JobPostingListSerializer.default_fields + ['score']
+    score = serializers.FloatField(read_only=True)
+
+class ResumeDataSearchSerializer(ResumeDataListSerializer):
+    default_fields = ResumeDataListSerializer.default_fields + ['rank', 'headline']
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+class JobApplicationListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    default_fields = [
+        'id', 'job_posting', 'candidate', 'resume_data', 'status',
+        'ai_match_score', 'applied_at', 'updated_at',
+    ]
+    expandable_fields = {
+        'job_posting': JobPostingListSerializer,
+        'candidate': UserSerializer,
+        'resume_data': ResumeDataListSerializer,
+    }
+    
+    class Meta:
+        model = JobApplication
+        fields = '__all__'
+
+class InterviewListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    default_fields = [
+        'id', 'application', 'interviewer', 'interview_type', 'scheduled_time',
+        'duration_minutes', 'location', 'meeting_link', 'status', 'created_at', 'updated_at',
+    ]
+    expandable_fields = {
+        'application': JobApplicationListSerializer,
+        'interviewer': UserSerializer,
+    }
+    
+    class Meta:
+        model = Interview
+        exclude = ['slot', 'application_applied_at']
+
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
@@ -121,14 +369,8 @@ class UserLoginSerializer(serializers.Serializer):
         password = attrs.get('password')
         
         if email and password:
-            # Find user by email
-            try:
-                user = User.objects.get(email=email)
-            except User.DoesNotExist:
-                raise serializers.ValidationError('Invalid email or password')
-            
-            # Authenticate user
-            user = authenticate(username=user.username, password=password)
+            # core.backends.EmailBackend: one indexed, case-insensitive lookup
+            user = authenticate(self.context.get('request'), email=email, password=password)
             if not user:
                 raise serializers.ValidationError('Invalid email or password')
             
@@ -0,0 +1,158 @@
+# ==== core/signals.py ====
+"""
+Cache invalidation: bump a company's cache version when its data changes,
+and revoke cached authentications when a token, user or profile does.
+Application and interview changes also go to the change feed (core/events.py),
+job changes to the recommendation index (core/recommendations.py) and
+vocabulary changes to the skill tags (core/skills.py).
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .authentication import revoke_token, revoke_user
+from .models import Company, UserProfile, JobPosting, JobApplication, Interview, Skill, SkillAlias
+from . import cache, events, recommendations, stats, tasks
+
+# Job lists (core.views.CachedListMixin): one scope per company for the HR
+# lists, and one shared by every company for the candidates' active feed
+JOB_LIST_NAMESPACE = 'jobs'
+ACTIVE_FEED_SCOPE = 'active'
+
+# Saves touching none of these fields change neither the dashboard nor the pipeline
+APPLICATION_STATS_FIELDS = {'status', 'ai_match_score', 'job_posting'}
+INTERVIEW_STATS_FIELDS = {'status', 'scheduled_time', 'duration_minutes', 'application', 'interviewer'}
+
+
+def _affects(update_fields, fields):
+    return update_fields is None or bool(fields.intersection(update_fields))
+
+
+def invalidate_job_lists(company_id, changed_at=None):
+    cache.bump_version(JOB_LIST_NAMESPACE, company_id, changed_at)
+    cache.bump_version(JOB_LIST_NAMESPACE, ACTIVE_FEED_SCOPE, changed_at)
+
+
+def invalidate_job_counters(company_id):
+    """
+    The counters of the company's jobs changed (applications, interviews):
+    only its HR job lists, the shared active feed would be invalidated by
+    every application. Counters there may lag by up to LIST_CACHE_TIMEOUT.
+    """
+    cache.bump_version(JOB_LIST_NAMESPACE, company_id)
+
+
+def _application_company_id(application):
+    if JobApplication.job_posting.is_cached(application):
+        return application.job_posting.company_id
+    # None once the job is gone, its own post_delete invalidates then
+    return JobPosting.objects.filter(pk=application.job_posting_id).values_list('company_id', flat=True).first()
+
+
+def _company_deleted(origin):
+    """
+    Whether a deletion started from companies (`origin` is the instance or
+    queryset deleted): their events are being deleted, new ones would
+    reference a deleted company.
+    """
+    return isinstance(origin, Company) or getattr(origin, 'model', None) is Company
+
+
+@receiver(post_save, sender=JobPosting)
+@receiver(post_delete, sender=JobPosting)
+def job_posting_changed(sender, instance, signal, update_fields=None, **kwargs):
+    changed_at = instance.updated_at if signal is post_save else timezone.now()
+    invalidate_job_lists(instance.company_id, changed_at)
+    # Job titles are part of the pipeline figures
+    stats.invalidate(instance.company_id)
+    if signal is post_delete or _affects(update_fields, recommendations.INDEXED_FIELDS):
+        tasks.update_job_index.delay(job_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def company_changed(sender, instance, signal, **kwargs):
+    # Companies are rendered into the job lists with ?expand=company
+    changed_at = instance.updated_at if signal is post_save else timezone.now()
+    invalidate_job_lists(instance.pk, changed_at)
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def application_changed(sender, instance, signal, created=False, update_fields=None, origin=None, **kwargs):
+    if not _affects(update_fields, APPLICATION_STATS_FIELDS):
+        return
+    company_id = _application_company_id(instance)
+    if company_id is not None:
+        stats.invalidate(company_id)
+        invalidate_job_counters(company_id)
+        if not _company_deleted(origin):
+            events.record([
+                events.application_event(company_id, instance, created, deleted=signal is post_delete)
+            ])
+
+
+@receiver(post_save, sender=Interview)
+@receiver(post_delete, sender=Interview)
+def interview_changed(sender, instance, signal, created=False, update_fields=None, origin=None, **kwargs):
+    if not _affects(update_fields, INTERVIEW_STATS_FIELDS):
+        return
+    company_id = (
+        JobApplication.objects.filter(pk=instance.application_id)
+        .values_list('job_posting__company_id', flat=True).first()
+    )
+    if company_id is not None:
+        stats.invalidate(company_id)
+        if signal is post_delete or created or _affects(update_fields, {'application'}):
+            invalidate_job_counters(company_id)
+        if not _company_deleted(origin):
+            events.record([
+                events.interview_event(company_id, instance, created, deleted=signal is post_delete)
+            ])
+
+
+def _vocabulary_terms(instance):
+    if isinstance(instance, Skill):
+        return [instance.name]
+    return [instance.alias, instance.skill.name]
+
+
+@receiver(pre_save, sender=Skill)
+@receiver(pre_save, sender=SkillAlias)
+def vocabulary_changing(sender, instance, **kwargs):
+    # Tags of the previous spelling need updating too
+    previous = sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+    instance._previous_terms = _vocabulary_terms(previous) if previous else []
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=SkillAlias)
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=SkillAlias)
+def vocabulary_changed(sender, instance, **kwargs):
+    terms = _vocabulary_terms(instance) + getattr(instance, '_previous_terms', [])
+    tasks.retag_skills.delay(terms=sorted(set(terms)))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    # Logout: drop the token from every process' authentication cache
+    revoke_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    revoke_user(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def user_profile_changed(sender, instance, **kwargs):
+    # The cached user carries the profile (user type, company)
+    revoke_user(instance.user_id)
+
@@ -0,0 +1,133 @@
+# ==== core/skills.py ====
+"""
+Skill filtering of resumes and jobs.
+
+`skill_tags` of resumes and jobs are kept by database triggers (migration
+0012) from a vocabulary of `Skill`s and their `SkillAlias`es, so
+"Postgres", "postgresql" and "PostgreSQL" all become the tag "postgresql"
+(the skill's name lower-cased):
+
+- a resume's `skills` entries each become a tag, entries that aren't in the
+  vocabulary are kept lower-cased;
+- a job gets the skills whose name or alias appears in its requirements,
+  as words. Short aliases can match ordinary words ("go").
+
+`filter_skills` turns `?skills_all=` and `?skills_any=` into containment
+(`@>`) lookups the GIN (jsonb_path_ops) indexes of `skill_tags` answer.
+Vocabulary edits retag the resumes and jobs they affect in the
+`retag_skills` task; `manage.py retag_skills` recomputes every tag.
+"""
+import json
+
+from django.db import connection, transaction
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from .models import SkillAlias
+
+# Skills per filter parameter
+MAX_FILTER_TERMS = 20
+BATCH_SIZE = 1000
+
+
+def normalize_term(term):
+    """Same as core_skill_term() in the database"""
+    return ' '.join(str(term).lower().split())
+
+
+def to_tags(terms):
+    """The tags of these skill names or aliases, in order"""
+    terms = [normalize_term(term) for term in terms]
+    aliases = dict(
+        SkillAlias.objects.filter(alias__in=terms).values_list('alias', 'skill__name')
+    )
+    tags = [aliases[term].lower() if term in aliases else term for term in terms if term]
+    return list(dict.fromkeys(tags))
+
+
+def _terms(params, name):
+    terms = [term for term in params.get(name, '').split(',') if term.strip()]
+    if len(terms) > MAX_FILTER_TERMS:
+        raise ValidationError({name: [f'At most {MAX_FILTER_TERMS} skills.']})
+    return to_tags(terms)
+
+
+def filter_skills(queryset, params, field='skill_tags'):
+    """
+    Narrow `queryset` by `?skills_all=a,b` (every skill) and
+    `?skills_any=a,b` (at least one); `field` is the path of the tags.
+    """
+    skills_all = _terms(params, 'skills_all')
+    if skills_all:
+        queryset = queryset.filter(**{f'{field}__contains': skills_all})
+    skills_any = _terms(params, 'skills_any')
+    if skills_any:
+        # One containment per skill: jsonb_path_ops has no ?| operator
+        any_of = Q()
+        for tag in skills_any:
+            any_of |= Q(**{f'{field}__contains': [tag]})
+        queryset = queryset.filter(any_of)
+    return queryset
+
+
+RETAG_RESUMES_SQL = """
+UPDATE core_resumedata SET skill_tags = core_resume_skill_tags(skills)
+WHERE ({matches}) AND skill_tags IS DISTINCT FROM core_resume_skill_tags(skills)
+RETURNING id
+"""
+
+# A spelling added to the vocabulary is in the requirements, one removed in the tags
+RETAG_JOBS_SQL = """
+UPDATE core_jobposting SET skill_tags = core_job_skill_tags(requirements)
+WHERE ({matches}) AND skill_tags IS DISTINCT FROM core_job_skill_tags(requirements)
+RETURNING company_id
+"""
+
+
+def _like(term):
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def retag(terms):
+    """
+    Recompute the tags that a vocabulary change of these spellings (names
+    and aliases, old and new) can affect. Returns the number of resumes
+    retagged and the companies of the jobs retagged.
+    """
+    terms = sorted({normalize_term(term) for term in terms} - {''})
+    if not terms:
+        return 0, set()
+    contains = ' OR '.join(['skill_tags @> %s::jsonb'] * len(terms))
+    tags = [json.dumps([term]) for term in terms]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(RETAG_RESUMES_SQL.format(matches=contains), tags)
+        resumes = cursor.rowcount
+        cursor.execute(
+            RETAG_JOBS_SQL.format(matches=f"{contains} OR {' OR '.join(['requirements ILIKE %s'] * len(terms))}"),
+            tags + [_like(term) for term in terms],
+        )
+        companies = {row[0] for row in cursor.fetchall()}
+    return resumes, companies
+
+
+def retag_all(batch_size=BATCH_SIZE):
+    """Recompute every tag in batches (after loading a vocabulary), returns what `retag` does"""
+    resumes, companies = 0, set()
+    with connection.cursor() as cursor:
+        for table, sql in (('core_resumedata', RETAG_RESUMES_SQL), ('core_jobposting', RETAG_JOBS_SQL)):
+            last_id = 0
+            while True:
+                cursor.execute(
+                    f'SELECT max(id) FROM (SELECT id FROM {table} WHERE id > %s ORDER BY id LIMIT %s) batch',
+                    [last_id, batch_size],
+                )
+                end_id = cursor.fetchone()[0]
+                if end_id is None:
+                    break
+                cursor.execute(sql.format(matches='id > %s AND id <= %s'), [last_id, end_id])
+                if table == 'core_resumedata':
+                    resumes += cursor.rowcount
+                else:
+                    companies.update(row[0] for row in cursor.fetchall())
+                last_id = end_id
+    return resumes, companies
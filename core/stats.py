@@ -0,0 +1,100 @@
+# ==== core/stats.py ====
+"""
+Company dashboard figures, each section computed by one grouped query and
+cached per company (see core/cache.py, invalidated by core/signals.py).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import cache
+from .models import JobApplication, Interview
+
+STATS_NAMESPACE = 'stats'
+TIMELINE_DAYS = 30
+
+
+def invalidate(company_id):
+    cache.bump_version(STATS_NAMESPACE, company_id)
+
+
+def company_stats(company):
+    key = cache.versioned_key(STATS_NAMESPACE, company.pk)
+    return cache.get_or_compute(key, lambda: compute_company_stats(company), settings.STATS_CACHE_TIMEOUT)
+
+
+def _average(total, count):
+    return round(total / count, 2) if count else None
+
+
+def _pipeline(company):
+    """Funnel per job and status, plus match score averages, in one GROUP BY"""
+    rows = (
+        JobApplication.objects.filter(job_posting__company=company)
+        .values('job_posting_id', 'job_posting__title', 'status')
+        .annotate(
+            count=Count('id'),
+            scored=Count('ai_match_score'),
+            score_total=Sum('ai_match_score'),
+        )
+        .order_by('job_posting_id', 'status')
+    )
+
+    jobs = {}
+    totals = {'applications': 0, 'by_status': {}, 'scored': 0, 'score_total': 0.0}
+    for row in rows:
+        job = jobs.setdefault(row['job_posting_id'], {
+            'id': row['job_posting_id'],
+            'title': row['job_posting__title'],
+            'applications': 0,
+            'by_status': {},
+            'scored': 0,
+            'score_total': 0.0,
+        })
+        for bucket in (job, totals):
+            bucket['applications'] += row['count']
+            bucket['by_status'][row['status']] = bucket['by_status'].get(row['status'], 0) + row['count']
+            bucket['scored'] += row['scored']
+            bucket['score_total'] += row['score_total'] or 0.0
+
+    for bucket in (*jobs.values(), totals):
+        bucket['average_match_score'] = _average(bucket.pop('score_total'), bucket.pop('scored'))
+    return totals, list(jobs.values())
+
+
+def _timeline(company, now):
+    since = now - timedelta(days=TIMELINE_DAYS)
+    rows = (
+        JobApplication.objects.filter(job_posting__company=company, applied_at__gte=since)
+        .annotate(day=TruncDate('applied_at'))
+        .values('day')
+        .annotate(count=Count('id'))
+        .order_by('day')
+    )
+    return [{'date': row['day'], 'count': row['count']} for row in rows]
+
+
+def _upcoming_interviews(company, now):
+    return Interview.objects.filter(
+        application__job_posting__company=company, status='SCHEDULED', scheduled_time__gte=now,
+    ).aggregate(
+        total=Count('id'),
+        next_24_hours=Count('id', filter=Q(scheduled_time__lt=now + timedelta(days=1))),
+        next_7_days=Count('id', filter=Q(scheduled_time__lt=now + timedelta(days=7))),
+    )
+
+
+def compute_company_stats(company):
+    now = timezone.now()
+    totals, jobs = _pipeline(company)
+    return {
+        'company': company.pk,
+        'generated_at': now,
+        'totals': totals,
+        'jobs': jobs,
+        'applications_over_time': _timeline(company, now),
+        'upcoming_interviews': _upcoming_interviews(company, now),
+    }
@@ -0,0 +1,95 @@
+# ==== core/tasks.py ====
+import os
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .extraction import ExtractionError, extract_resume
+from .models import JobPosting, ResumeData, JobApplication
+from .queue import task
+from . import recommendations, scoring, signals, skills
+
+# raw_extracted_data keys copied into the structured fields when those are empty
+EXTRACTED_FIELDS = ['summary', 'phone', 'location', 'skills', 'experience', 'education']
+
+
+@task()
+def parse_resume(resume_id):
+    """Fill the structured resume fields from the extracted data, then re-score"""
+    resume = ResumeData.objects.filter(pk=resume_id).first()
+    if resume is None:
+        return
+
+    update_fields = []
+    if resume.file_path and not resume.raw_extracted_data:
+        try:
+            resume.raw_extracted_data = extract_resume(os.path.join(settings.MEDIA_ROOT, resume.file_path))
+        except ExtractionError as exc:
+            # A broken or unsupported file won't get better with retries
+            resume.raw_extracted_data = {'error': str(exc)}
+        update_fields.append('raw_extracted_data')
+
+    raw = resume.raw_extracted_data or {}
+    for field in EXTRACTED_FIELDS:
+        if raw.get(field) and not getattr(resume, field):
+            setattr(resume, field, raw[field])
+            update_fields.append(field)
+    if update_fields:
+        resume.save(update_fields=update_fields + ['updated_at'])
+
+    scoring.refresh_resume_vector(resume)
+    for application_id in JobApplication.objects.filter(resume_data=resume).values_list('id', flat=True):
+        score_application.delay(application_id=application_id)
+
+
+@task()
+def score_application(application_id):
+    application = (
+        JobApplication.objects.select_related('job_posting', 'resume_data')
+        .filter(pk=application_id).first()
+    )
+    if application is not None:
+        scoring.score_application(application)
+
+
+@task(visibility_timeout=900)
+def rescore_job(job_id):
+    job = JobPosting.objects.filter(pk=job_id).first()
+    if job is not None:
+        scoring.rescore_job(job)
+
+
+@task(visibility_timeout=900)
+def update_job_index(job_ids):
+    recommendations.update(job_ids)
+
+
+@task(visibility_timeout=900)
+def retag_skills(terms):
+    """Retag the resumes and jobs a vocabulary change of these spellings affects"""
+    _, companies = skills.retag(terms)
+    for company_id in companies:
+        signals.invalidate_job_lists(company_id)
+
+
+@task()
+def notify_application_status(application_id):
+    """Email the candidate that their application moved to a new status"""
+    application = (
+        JobApplication.objects.select_related('job_posting__company', 'candidate')
+        .filter(pk=application_id).first()
+    )
+    if application is None or not application.candidate.email:
+        return
+
+    job = application.job_posting
+    send_mail(
+        subject=f"Your application for {job.title}",
+        message=(
+            f"Hello {application.candidate.first_name or application.candidate.username},\n\n"
+            f"Your application for {job.title} at {job.company.name} is now: "
+            f"{application.get_status_display()}.\n"
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[application.candidate.email],
+    )
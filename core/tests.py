@@ -1,3 +1,1856 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import psycopg2
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import F
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .models import (
+    Company, UserProfile, JobPosting, ResumeData, JobApplication, Interview, Task, ChangeEvent, Skill, SkillAlias
+)
+from .authentication import CachedTokenAuthentication, revoke_user
+from .cache import shared_cache
+from .postgresql_pool.base import DatabaseWrapper as PooledDatabaseWrapper
+from .throttling import LoginEmailRateThrottle
+from . import (
+    backends, counters, events, extraction, metrics, partitions, pool, queue, recommendations, replicas,
+    scheduling, scoring,
+)
+from .search import search
+from .serializers import BulkStatusSerializer
+from .replicas import ReplicaRouter
+from .seeding import Scale, Seeder
+from .skills import filter_skills
+
+
+def create_company(name='Acme', code='ACME'):
+    return Company.objects.create(name=name, registration_code=code)
+
+
+def create_user(username, user_type, company=None):
+    user = User.objects.create_user(username=username, email=f'{username}@example.com', password='pass12345')
+    UserProfile.objects.create(user=user, user_type=user_type, company=company)
+    return user
+
+
+def create_job(company, created_by, **kwargs):
+    defaults = {
+        'title': 'Backend Engineer',
+        'description': 'Build APIs with Python and Django',
+        'requirements': 'Python, Django, PostgreSQL',
+        'location': 'Remote',
+        'job_type': 'Full-time',
+        'department': 'Engineering',
+        'status': 'ACTIVE',
+    }
+    defaults.update(kwargs)
+    return JobPosting.objects.create(company=company, created_by=created_by, **defaults)
+
+
+def create_resume(candidate, **kwargs):
+    defaults = {
+        'full_name': candidate.username.title(),
+        'email': candidate.email,
+        'summary': 'Python developer',
+        'skills': ['Python', 'Django'],
+        'original_file_name': 'resume.pdf',
+    }
+    defaults.update(kwargs)
+    return ResumeData.objects.create(candidate=candidate, **defaults)
+
+
+def create_application(job, candidate, resume=None, **kwargs):
+    resume = resume or create_resume(candidate)
+    return JobApplication.objects.create(job_posting=job, candidate=candidate, resume_data=resume, **kwargs)
+
+
+def create_interview(application, interviewer, **kwargs):
+    defaults = {
+        'interview_type': 'VIDEO',
+        'scheduled_time': timezone.now() + timedelta(days=1),
+    }
+    defaults.update(kwargs)
+    return Interview.objects.create(application=application, interviewer=interviewer, **defaults)
+
+
+def index_names(index_name):
+    """The index and its copies on the partitions of a partitioned table"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            WITH RECURSIVE tree AS (
+                SELECT %s::regclass AS oid
+                UNION ALL
+                SELECT i.inhrelid FROM pg_inherits i JOIN tree ON i.inhparent = tree.oid
+            )
+            SELECT oid::regclass::text FROM tree
+        """, [index_name])
+        return {row[0] for row in cursor.fetchall()}
+
+
+def uses_index(plan, index_name):
+    return bool(index_names(index_name) & set(plan.split()))
+
+
+class CoreAPITestCase(TestCase):
+    """Shared data: one company, one HR user and a few candidates with interviews"""
+
+    candidate_count = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.hr_user = create_user('hr', 'HR', company=cls.company)
+        cls.jobs = [create_job(cls.company, cls.hr_user, title=f'Job {i}') for i in range(2)]
+        cls.candidates = []
+        cls.applications = []
+        cls.interviews = []
+        for i in range(cls.candidate_count):
+            candidate = create_user(f'candidate{i}', 'CANDIDATE')
+            cls.candidates.append(candidate)
+            for j, job in enumerate(cls.jobs):
+                application = create_application(job, candidate)
+                cls.applications.append(application)
+                # An hour apart, the HR user can't be in two interviews at once
+                cls.interviews.append(create_interview(
+                    application, cls.hr_user, scheduled_time=timezone.now() + timedelta(days=i + 1, hours=j)
+                ))
+        # Recommendation index updates of the fixture jobs
+        Task.objects.filter(name='update_job_index').delete()
+
+    def setUp(self):
+        self.client = APIClient()
+        # Cached entries would outlive the rolled back test data
+        cache.clear()
+        CachedTokenAuthentication.clear()
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir)
+        # Replicas configured in DB_REPLICAS don't see the test's transaction
+        test_settings = override_settings(RECOMMENDATIONS_INDEX_DIR=index_dir, DATABASE_REPLICAS=[])
+        test_settings.enable()
+        self.addCleanup(test_settings.disable)
+
+    def login(self, user):
+        # A fresh instance, so profile/company lookups are counted like in a real request
+        self.client.force_authenticate(user=User.objects.get(pk=user.pk))
+
+
+class ListQueryCountTests(CoreAPITestCase):
+    """
+    Each list endpoint must run a fixed number of queries no matter how many
+    rows are on the page (no N+1 through the nested serializers).
+    """
+
+    # profile lookup + company lookup + page (keyset pagination, no COUNT(*))
+    HR_LIST_QUERIES = 3
+
+    def assertListQueries(self, url, num, expected_rows):
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), expected_rows)
+        return response
+
+    def test_interviews_list(self):
+        self.login(self.hr_user)
+        url = '/api/interviews/?expand=interviewer,application.job_posting.company,application.resume_data'
+        response = self.assertListQueries(url, self.HR_LIST_QUERIES, len(self.interviews))
+        row = response.data['results'][0]
+        self.assertEqual(row['application']['job_posting']['company']['name'], 'Acme')
+        self.assertEqual(row['interviewer']['username'], 'hr')
+
+    def test_applications_list(self):
+        self.login(self.hr_user)
+        self.assertListQueries('/api/applications/', self.HR_LIST_QUERIES, len(self.applications))
+
+    def test_jobs_list(self):
+        self.login(self.hr_user)
+        self.assertListQueries('/api/jobs/', self.HR_LIST_QUERIES, len(self.jobs))
+
+    def test_companies_list(self):
+        self.login(self.hr_user)
+        # page number pagination also runs a COUNT(*)
+        self.assertListQueries('/api/companies/', self.HR_LIST_QUERIES + 1, 1)
+
+    def test_candidate_lists(self):
+        candidate = self.candidates[0]
+        # profile lookup + page, resume-data: COUNT(*) + page
+        for url, num in [('/api/applications/', 2), ('/api/interviews/', 2), ('/api/jobs/', 2), ('/api/resume-data/', 2)]:
+            with self.subTest(url=url):
+                self.login(candidate)
+                self.assertListQueries(url, num, len(self.jobs))
+
+    def test_job_applications_action(self):
+        self.login(self.hr_user)
+        url = f'/api/jobs/{self.jobs[0].pk}/applications/'
+        # profile + company + job lookup + applications
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), self.candidate_count)
+
+
+class SparseFieldsetTests(CoreAPITestCase):
+
+    def test_list_is_compact(self):
+        self.login(self.hr_user)
+        row = self.client.get('/api/applications/').data['results'][0]
+        self.assertIsInstance(row['job_posting'], int)
+        self.assertIsInstance(row['resume_data'], int)
+        self.assertNotIn('ai_match_details', row)
+        self.assertNotIn('cover_letter', row)
+
+    def test_retrieve_is_full(self):
+        self.login(self.hr_user)
+        application = self.applications[0]
+        row = self.client.get(f'/api/applications/{application.pk}/').data
+        self.assertEqual(row['job_posting']['description'], application.job_posting.description)
+        self.assertEqual(row['resume_data']['skills'], ['Python', 'Django'])
+
+    def test_expand(self):
+        self.login(self.hr_user)
+        row = self.client.get('/api/applications/?expand=job_posting,resume_data').data['results'][0]
+        self.assertIn('title', row['job_posting'])
+        self.assertNotIn('description', row['job_posting'])
+        self.assertNotIn('raw_extracted_data', row['resume_data'])
+
+    def test_fields_limit_columns_and_query(self):
+        self.login(self.hr_user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/applications/?fields=id,status,job_posting.title')
+        row = response.data['results'][0]
+        self.assertEqual(set(row), {'id', 'status', 'job_posting'})
+        self.assertEqual(set(row['job_posting']), {'title'})
+        sql = ctx.captured_queries[-1]['sql']
+        self.assertNotIn('"cover_letter"', sql)
+        self.assertNotIn('"description"', sql)
+        self.assertIn('"core_jobposting"."title"', sql)
+
+    def test_fields_on_retrieve(self):
+        self.login(self.hr_user)
+        application = self.applications[0]
+        row = self.client.get(f'/api/applications/{application.pk}/?fields=id,resume_data.skills').data
+        self.assertEqual(row, {'id': application.pk, 'resume_data': {'skills': ['Python', 'Django']}})
+
+
+class ScoringTests(CoreAPITestCase):
+
+    def test_vector_round_trip(self):
+        indices, weights = scoring.resume_vector(create_resume(self.candidates[0], skills=['Go', 'Rust']))
+        unpacked = scoring.unpack_vector(scoring.pack_vector(indices, weights))
+        self.assertEqual(list(unpacked[0]), list(indices))
+        self.assertAlmostEqual(float(weights @ weights), 1.0, places=5)
+
+    def test_better_match_scores_higher(self):
+        job = self.jobs[0]
+        python_dev = create_application(job, create_user('py', 'CANDIDATE'))
+        chef = create_application(job, create_user('chef', 'CANDIDATE'), resume=create_resume(
+            User.objects.get(username='chef'), summary='Pastry chef', skills=['Baking', 'Cooking']
+        ))
+        self.assertGreater(scoring.score_application(python_dev), scoring.score_application(chef))
+        chef.refresh_from_db()
+        self.assertEqual(chef.ai_match_details['engine'], scoring.ENGINE_VERSION)
+        self.assertEqual(chef.ai_match_details['matched_skills'], [])
+
+    def test_rescore_job_matches_single_scores(self):
+        job = self.jobs[0]
+        self.assertEqual(scoring.rescore_job(job), self.candidate_count)
+        batch = dict(JobApplication.objects.filter(job_posting=job).values_list('id', 'ai_match_score'))
+        for application in JobApplication.objects.filter(job_posting=job):
+            self.assertAlmostEqual(batch[application.pk], scoring.score_application(application), places=1)
+        self.assertTrue(all(score > 0 for score in batch.values()))
+
+    def test_apply_scores_application(self):
+        candidate = create_user('applicant', 'CANDIDATE')
+        resume = create_resume(candidate)
+        self.login(candidate)
+        response = self.client.post('/api/applications/', {
+            'job_posting_id': self.jobs[0].pk, 'resume_data_id': resume.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        # Scored by the task worker, not in the request
+        self.assertIsNone(response.data['ai_match_score'])
+        self.assertEqual(queue.run_pending(), 1)
+        application = JobApplication.objects.get(pk=response.data['id'])
+        self.assertGreater(application.ai_match_score, 0)
+        self.assertIn('Python', application.ai_match_details['matched_skills'])
+
+        response = self.client.post('/api/applications/', {
+            'job_posting_id': self.jobs[0].pk, 'resume_data_id': resume.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rescore_action_is_hr_only(self):
+        self.login(self.candidates[0])
+        self.assertEqual(self.client.post(f'/api/jobs/{self.jobs[0].pk}/rescore/').status_code, 403)
+        self.login(self.hr_user)
+        response = self.client.post(f'/api/jobs/{self.jobs[0].pk}/rescore/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertFalse(JobApplication.objects.filter(job_posting=self.jobs[0], ai_match_score=None).exists())
+
+
+@queue.task(max_attempts=2)
+def flaky_task(fail):
+    if fail:
+        raise RuntimeError('boom')
+
+
+class TaskQueueTests(CoreAPITestCase):
+
+    def test_successful_task_is_removed(self):
+        flaky_task.delay(fail=False)
+        self.assertEqual(queue.run_pending(), 1)
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_is_retried_then_kept(self):
+        t = flaky_task.delay(fail=True)
+        queue.run_pending()
+        t.refresh_from_db()
+        self.assertEqual((t.status, t.attempts), ('PENDING', 1))
+        self.assertGreater(t.run_at, timezone.now())
+        self.assertIn('boom', t.last_error)
+
+        Task.objects.filter(pk=t.pk).update(run_at=timezone.now())
+        queue.run_pending()
+        t.refresh_from_db()
+        self.assertEqual((t.status, t.attempts), ('FAILED', 2))
+        # Failed tasks are never picked up again
+        self.assertEqual(queue.run_pending(), 0)
+
+    def test_expired_claim_is_reclaimed(self):
+        t = flaky_task.delay(fail=False)
+        self.assertEqual(len(queue.claim()), 1)
+        self.assertEqual(queue.claim(), [])
+        Task.objects.filter(pk=t.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual([claimed.pk for claimed in queue.claim()], [t.pk])
+
+    def test_resume_parsing(self):
+        candidate = self.candidates[0]
+        self.login(candidate)
+        response = self.client.post('/api/resume-data/', {
+            'full_name': 'Candidate', 'email': candidate.email, 'original_file_name': 'cv.pdf',
+            'raw_extracted_data': {'summary': 'Django developer', 'skills': ['Python', 'PostgreSQL']},
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        queue.run_pending()
+        resume = ResumeData.objects.get(pk=response.data['id'])
+        self.assertEqual(resume.skills, ['Python', 'PostgreSQL'])
+        self.assertEqual(resume.summary, 'Django developer')
+        self.assertTrue(resume.term_vector)
+
+    def test_status_change_notifies_candidate(self):
+        application = self.applications[0]
+        self.login(self.hr_user)
+        self.client.patch(f'/api/applications/{application.pk}/', {'status': 'UNDER_REVIEW'}, format='json')
+        queue.run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Under Review', mail.outbox[0].body)
+
+
+RESUME_TEXT = b"""Jane Doe
+jane@example.com | +1 555 010 2030
+
+Summary
+Backend developer who likes databases.
+
+Skills
+Python, Django; PostgreSQL | Docker
+
+Experience
+- Senior engineer at Acme (2019-2024)
+- Developer at Initech
+
+Education
+- BSc Computer Science
+"""
+
+
+def make_docx(paragraphs):
+    body = ''.join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+    document = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{body}</w:body></w:document>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml', document)
+    return buffer.getvalue()
+
+
+class ResumeUploadTests(CoreAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.candidate = self.candidates[0]
+        self.login(self.candidate)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def upload(self, content, name='cv.txt'):
+        return self.client.post(
+            '/api/resume-data/upload/', {'file': SimpleUploadedFile(name, content)}, format='multipart'
+        )
+
+    def test_upload_stores_by_hash_and_parses_in_background(self):
+        response = self.upload(RESUME_TEXT)
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertFalse(response.data['duplicate'])
+
+        resume = ResumeData.objects.get(pk=response.data['id'])
+        self.assertEqual(len(resume.content_hash), 64)
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, resume.file_path)))
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'resumes', 'tmp')), [])
+        self.assertEqual(resume.skills, [])
+
+        queue.run_pending()
+        resume.refresh_from_db()
+        self.assertEqual(resume.skills, ['Python', 'Django', 'PostgreSQL', 'Docker'])
+        self.assertEqual(resume.raw_extracted_data['email'], 'jane@example.com')
+        self.assertEqual(len(resume.experience), 2)
+
+    def test_identical_upload_is_deduplicated(self):
+        first = self.upload(RESUME_TEXT)
+        second = self.upload(RESUME_TEXT, name='copy.txt')
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.data['duplicate'])
+        self.assertEqual(first.data['id'], second.data['id'])
+        self.assertEqual(ResumeData.objects.filter(candidate=self.candidate, content_hash__isnull=False).count(), 1)
+
+    def test_rejects_unsupported_and_oversized_files(self):
+        self.assertEqual(self.upload(b'MZ...', name='cv.exe').status_code, 400)
+        with override_settings(RESUME_MAX_UPLOAD_SIZE=10):
+            response = self.upload(RESUME_TEXT)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['file'], ['File is too large'])
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'resumes', 'tmp')), [])
+
+    def test_docx_extraction(self):
+        path = os.path.join(self.media_root, 'cv.docx')
+        with open(path, 'wb') as f:
+            f.write(make_docx(['John Smith', 'Skills', 'Go, Kubernetes', 'Education', 'MSc Physics']))
+        data = extraction.extract_resume(path)
+        self.assertEqual(data['skills'], ['Go', 'Kubernetes'])
+        self.assertEqual(data['education'], [{'description': 'MSc Physics'}])
+
+    def test_broken_files_are_recorded_once(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('word/styles.xml', '<w:styles/>')
+        response = self.upload(buffer.getvalue(), name='cv.docx')
+        self.assertEqual(response.status_code, 202, response.data)
+        queue.run_pending()
+        resume = ResumeData.objects.get(pk=response.data['id'])
+        self.assertEqual(resume.raw_extracted_data, {'error': 'Not a valid DOCX file'})
+        self.assertFalse(Task.objects.filter(name='parse_resume').exists())
+
+        for name, content in [('cv.docx', make_docx(['<unclosed'])), ('cv.pdf', b'%PDF-1.4 garbage')]:
+            path = os.path.join(self.media_root, name)
+            with open(path, 'wb') as f:
+                f.write(content)
+            with self.assertRaises(extraction.ExtractionError):
+                extraction.extract_resume(path)
+
+    def test_line_splitting_is_chunk_independent(self):
+        chunks = [RESUME_TEXT.decode()[i:i + 7] for i in range(0, len(RESUME_TEXT), 7)]
+        self.assertEqual(
+            list(extraction.iter_lines(chunks)),
+            list(extraction.iter_lines([RESUME_TEXT.decode()])),
+        )
+
+
+class PaginationTests(CoreAPITestCase):
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_keyset_walks_every_row_once_in_order(self):
+        self.login(self.hr_user)
+        expected = list(JobApplication.objects.order_by('-applied_at', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk('/api/applications/?page_size=4'), expected)
+
+        expected = list(Interview.objects.order_by('scheduled_time', 'id').values_list('id', flat=True))
+        self.assertEqual(self.walk('/api/interviews/?page_size=4'), expected)
+
+    def test_keyset_previous_link(self):
+        self.login(self.hr_user)
+        first = self.client.get('/api/applications/?page_size=2').data
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual([r['id'] for r in back['results']], [r['id'] for r in first['results']])
+
+    def test_keyset_deep_page_query_has_no_offset(self):
+        self.login(self.hr_user)
+        first = self.client.get('/api/applications/?page_size=2').data
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first['next'])
+        sql = ctx.captured_queries[-1]['sql']
+        self.assertNotIn('OFFSET', sql)
+        self.assertIn('"applied_at" <', sql)
+
+    def test_invalid_cursor(self):
+        self.login(self.hr_user)
+        response = self.client.get('/api/applications/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_without_count(self):
+        self.login(self.candidates[0])
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/resume-data/?count=false&page_size=1')
+        self.assertNotIn('count', response.data)
+        self.assertIsNotNone(response.data['next'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN plans are checked against PostgreSQL')
+class IndexUsageTests(CoreAPITestCase):
+    """The tenant-scoped list filters must be served by the indexes from 0002"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Many companies with jobs in every status, like in production: with
+        # one company the partial ACTIVE index would answer its HR list too
+        statuses = [choice for choice, _ in JobPosting.STATUS_CHOICES]
+        companies = [cls.company] + Company.objects.bulk_create([
+            Company(name=f'Company {i}', registration_code=f'CO{i}') for i in range(99)
+        ])
+        JobPosting.objects.bulk_create([
+            JobPosting(
+                title=f'Job {i}', description='', location='', job_type='', department='',
+                company=companies[i % len(companies)], created_by=cls.hr_user,
+                status=statuses[i // len(companies) % len(statuses)],
+            )
+            for i in range(2000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_jobposting')
+
+    def assertUsesIndex(self, queryset, index_name):
+        with connection.cursor() as cursor:
+            # The fixture tables are tiny, make the planner consider indexes at all
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+        self.assertTrue(uses_index(plan, index_name), plan)
+
+    def test_hr_job_list(self):
+        queryset = JobPosting.objects.filter(company=self.company, status='ACTIVE').order_by('-created_at')
+        self.assertUsesIndex(queryset, 'jobposting_company_status_idx')
+
+    def test_active_jobs_feed(self):
+        queryset = JobPosting.objects.filter(status='ACTIVE').order_by('-created_at')
+        self.assertUsesIndex(queryset, 'jobposting_active_idx')
+
+    def test_job_applicants_by_score(self):
+        queryset = JobApplication.objects.filter(
+            job_posting=self.jobs[0], status='APPLIED'
+        ).order_by('-ai_match_score')
+        self.assertUsesIndex(queryset, 'jobapp_job_status_score_idx')
+
+    def test_candidate_applications(self):
+        queryset = JobApplication.objects.filter(candidate=self.candidates[0]).order_by('-applied_at')
+        self.assertUsesIndex(queryset, 'jobapp_candidate_applied_idx')
+
+    def test_interviewer_calendar(self):
+        queryset = Interview.objects.filter(
+            interviewer=self.hr_user, scheduled_time__gte=timezone.now()
+        ).order_by('scheduled_time')
+        self.assertUsesIndex(queryset, 'interview_interviewer_time_idx')
+
+    def test_upcoming_interviews(self):
+        queryset = Interview.objects.filter(
+            status='SCHEDULED', scheduled_time__gte=timezone.now()
+        ).order_by('scheduled_time')
+        self.assertUsesIndex(queryset, 'interview_upcoming_idx')
+
+    def test_skill_filter(self):
+        queryset = filter_skills(ResumeData.objects.all(), {'skills_all': 'python', 'skills_any': 'postgres,k8s'})
+        self.assertUsesIndex(queryset, 'resume_skill_tags_idx')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Full-text search needs PostgreSQL')
+class SearchTests(CoreAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.data_job = create_job(
+            cls.company, cls.hr_user, title='Data Engineer',
+            description='Design Spark pipelines and a data warehouse', requirements='Spark, Airflow',
+        )
+        cls.draft_job = create_job(cls.company, cls.hr_user, title='Spark Developer', status='DRAFT')
+        cls.spark_resume = cls.applications[0].resume_data
+        cls.spark_resume.summary = 'Data engineer building Spark and Airflow pipelines'
+        cls.spark_resume.skills = ['Spark', 'Scala']
+        cls.spark_resume.save()
+        # Not applied to the company, HR must not find it
+        outsider = create_user('outsider', 'CANDIDATE')
+        create_resume(outsider, summary='Spark expert')
+
+    def test_triggers_maintain_search_vector(self):
+        self.data_job.refresh_from_db()
+        self.assertIn("'spark'", self.data_job.search_vector)
+        JobPosting.objects.filter(pk=self.data_job.pk).update(title='Data Scientist')
+        self.data_job.refresh_from_db()
+        self.assertIn("'scientist'", self.data_job.search_vector)
+
+    def test_job_search_ranks_and_highlights(self):
+        self.login(self.candidates[0])
+        response = self.client.get('/api/jobs/search/', {'q': 'spark pipelines'})
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        # Candidates only see active jobs
+        self.assertEqual([job['id'] for job in results], [self.data_job.id])
+        self.assertIn('<mark>', results[0]['headline'])
+        self.assertGreater(results[0]['rank'], 0)
+        self.assertNotIn('count', response.data)
+
+    def test_job_search_requires_query(self):
+        self.login(self.candidates[0])
+        response = self.client.get('/api/jobs/search/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_resume_search_is_scoped_to_company(self):
+        self.login(self.hr_user)
+        response = self.client.get('/api/resume-data/search/', {'q': 'spark'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['id'] for r in response.data['results']], [self.spark_resume.id])
+        self.assertIn('<mark>Spark</mark>', response.data['results'][0]['headline'])
+
+        response = self.client.get('/api/resume-data/search/', {'q': 'spark', 'job': self.draft_job.id})
+        self.assertEqual(response.data['results'], [])
+
+    def test_resume_search_is_hr_only(self):
+        self.login(self.candidates[0])
+        response = self.client.get('/api/resume-data/search/', {'q': 'spark'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_search(self):
+        site_admin = admin.site._registry[JobPosting]
+        request = RequestFactory().get('/admin/core/jobposting/')
+        results, _ = site_admin.get_search_results(request, JobPosting.objects.all(), 'pipelines')
+        self.assertEqual(list(results), [self.data_job])
+        # Not in the search document
+        results, _ = site_admin.get_search_results(request, JobPosting.objects.all(), 'Acme')
+        self.assertEqual(set(results), set(JobPosting.objects.filter(company=self.company)))
+
+        site_admin = admin.site._registry[ResumeData]
+        results, _ = site_admin.get_search_results(request, ResumeData.objects.all(), 'outsider')
+        self.assertEqual([resume.candidate.username for resume in results], ['outsider'])
+
+    def test_search_uses_gin_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = search(ResumeData.objects.all(), 'spark', 'summary').explain()
+        self.assertIn('resume_search_idx', plan)
+
+
+class CompanyStatsTests(CoreAPITestCase):
+
+    def url(self):
+        return f'/api/companies/{self.company.pk}/stats/'
+
+    def test_stats(self):
+        JobApplication.objects.filter(pk=self.applications[0].pk).update(status='REJECTED', ai_match_score=80)
+        JobApplication.objects.filter(pk=self.applications[2].pk).update(ai_match_score=60)
+        self.login(self.hr_user)
+        response = self.client.get(self.url())
+        self.assertEqual(response.status_code, 200)
+
+        totals = response.data['totals']
+        self.assertEqual(totals['applications'], 6)
+        self.assertEqual(totals['by_status'], {'APPLIED': 5, 'REJECTED': 1})
+        self.assertEqual(totals['average_match_score'], 70)
+        first_job = next(job for job in response.data['jobs'] if job['id'] == self.jobs[0].pk)
+        self.assertEqual(first_job['applications'], 3)
+        self.assertEqual(first_job['average_match_score'], 70)
+        self.assertEqual(sum(day['count'] for day in response.data['applications_over_time']), 6)
+        self.assertEqual(response.data['upcoming_interviews']['total'], 6)
+        # Only candidate0's first interview is within a day of fixture creation
+        self.assertEqual(response.data['upcoming_interviews']['next_24_hours'], 1)
+
+    def test_cached_until_status_changes(self):
+        self.login(self.hr_user)
+        self.client.get(self.url())
+        # Only the company lookup, the figures come from the cache
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url())
+        self.assertEqual(response.data['totals']['by_status'], {'APPLIED': 6})
+
+        application = JobApplication.objects.get(pk=self.applications[0].pk)
+        application.status = 'UNDER_REVIEW'
+        application.save()
+        response = self.client.get(self.url())
+        self.assertEqual(response.data['totals']['by_status'], {'APPLIED': 5, 'UNDER_REVIEW': 1})
+
+        interview = Interview.objects.get(pk=self.interviews[0].pk)
+        interview.status = 'CANCELLED'
+        interview.save(update_fields=['status'])
+        response = self.client.get(self.url())
+        self.assertEqual(response.data['upcoming_interviews']['total'], 5)
+
+    def test_notes_do_not_invalidate(self):
+        self.login(self.hr_user)
+        self.client.get(self.url())
+        application = JobApplication.objects.get(pk=self.applications[0].pk)
+        application.notes = 'Strong portfolio'
+        application.save(update_fields=['notes'])
+        with self.assertNumQueries(1):
+            self.client.get(self.url())
+
+    def test_hr_only(self):
+        self.login(self.candidates[0])
+        response = self.client.get(self.url())
+        self.assertEqual(response.status_code, 403)
+
+
+
+class JobListCacheTests(CoreAPITestCase):
+
+    def test_feed_is_shared_between_candidates(self):
+        self.login(self.candidates[0])
+        first = self.client.get('/api/jobs/')
+        self.login(self.candidates[1])
+        # The profile lookup only
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/jobs/')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_conditional_requests(self):
+        self.login(self.candidates[0])
+        response = self.client.get('/api/jobs/')
+        self.assertIn('private', response['Cache-Control'])
+
+        response = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get('/api/jobs/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_job_change_invalidates(self):
+        self.login(self.candidates[0])
+        etag = self.client.get('/api/jobs/')['ETag']
+
+        job = JobPosting.objects.get(pk=self.jobs[0].pk)
+        job.title = 'Staff Engineer'
+        job.save()
+        response = self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Staff Engineer', [row['title'] for row in response.data['results']])
+
+        job.status = 'CLOSED'
+        job.save()
+        response = self.client.get('/api/jobs/')
+        self.assertNotIn(job.pk, [row['id'] for row in response.data['results']])
+
+    def test_company_change_invalidates(self):
+        self.login(self.candidates[0])
+        self.client.get('/api/jobs/?expand=company')
+        company = Company.objects.get(pk=self.company.pk)
+        company.name = 'Acme Corp'
+        company.save()
+        response = self.client.get('/api/jobs/?expand=company')
+        self.assertEqual(response.data['results'][0]['company']['name'], 'Acme Corp')
+
+    def test_hr_and_candidate_lists_are_separate(self):
+        create_job(self.company, self.hr_user, title='Draft', status='DRAFT')
+        self.login(self.candidates[0])
+        self.assertEqual(len(self.client.get('/api/jobs/').data['results']), 2)
+        self.login(self.hr_user)
+        self.assertEqual(len(self.client.get('/api/jobs/').data['results']), 3)
+
+
+class CachedTokenAuthenticationTests(CoreAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.token = Token.objects.create(user=self.hr_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_authentication_is_cached(self):
+        # token + user + profile + company in one query, then the page
+        with self.assertNumQueries(2):
+            self.client.get('/api/applications/')
+        # The revocation markers in the shared cache, then the page
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/applications/')
+        self.assertEqual(len(response.data['results']), len(self.applications))
+
+    def test_logout_revokes(self):
+        self.client.get('/api/jobs/')
+        response = self.client.post('/api/auth/logout/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/jobs/')
+        # 403 rather than 401, SessionAuthentication comes first and sends no challenge
+        self.assertEqual(response.status_code, 403)
+
+    def test_revocation_reaches_other_processes(self):
+        self.client.get('/api/jobs/')
+        self.client.post('/api/auth/logout/')
+        # As in a process with its own local-memory cache, and the entry
+        cache.clear()
+        self.assertEqual(self.client.get('/api/jobs/').status_code, 403)
+
+    def test_profile_change_revokes(self):
+        self.client.get('/api/jobs/')
+        profile = UserProfile.objects.get(user=self.hr_user)
+        profile.user_type = 'CANDIDATE'
+        profile.save()
+        response = self.client.post(f'/api/jobs/{self.jobs[0].pk}/rescore/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_revocation_during_load(self):
+        load = CachedTokenAuthentication._load
+
+        def load_then_revoke(auth, key):
+            token = load(auth, key)
+            revoke_user(token.user_id)
+            return token
+
+        with mock.patch.object(CachedTokenAuthentication, '_load', load_then_revoke):
+            self.client.get('/api/jobs/')
+        # Cached before the revocation, so loaded again
+        with self.assertNumQueries(3):
+            self.client.get('/api/applications/')
+
+    def test_inactive_user(self):
+        User.objects.filter(pk=self.hr_user.pk).update(is_active=False)
+        response = self.client.get('/api/jobs/')
+        # 403 rather than 401, SessionAuthentication comes first and sends no challenge
+        self.assertEqual(response.status_code, 403)
+
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class LoginTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('jane', email='Jane@Example.com', password='s3cret-pass')
+        UserProfile.objects.create(user=self.user, user_type='CANDIDATE')
+
+    def login(self, email, password='s3cret-pass'):
+        return self.client.post('/api/auth/login/', {'email': email, 'password': password}, content_type='application/json')
+
+    def test_email_is_case_insensitive(self):
+        response = self.login('jane@example.COM')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['username'], 'jane')
+        self.assertTrue(response.data['token'])
+
+    def test_wrong_password(self):
+        self.assertEqual(self.login('jane@example.com', 'nope').status_code, 400)
+        self.assertEqual(self.login('nobody@example.com').status_code, 400)
+
+    def test_email_lookup_uses_index(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('Expression index is PostgreSQL only')
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = User.objects.filter(email__iexact='jane@example.com').explain()
+        self.assertIn('auth_user_email_upper_idx', plan)
+
+    def test_throttled_before_hashing(self):
+        with mock.patch.object(LoginEmailRateThrottle, 'rate', '2/min', create=True), \
+                mock.patch('core.backends.check_password', return_value=False) as check:
+            statuses = [self.login('jane@example.com', 'nope').status_code for _ in range(3)]
+        self.assertEqual(statuses, [400, 400, 429])
+        self.assertEqual(check.call_count, 2)
+
+    def test_outdated_hash_is_upgraded_in_background(self):
+        encoded = User.objects.get(pk=self.user.pk).password
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000), \
+                mock.patch.object(backends._rehash_executor, 'submit') as submit:
+            self.assertEqual(self.login('jane@example.com').status_code, 200)
+            # Nothing written during the request
+            self.assertEqual(User.objects.get(pk=self.user.pk).password, encoded)
+            submit.assert_called_once()
+            _, user_id, password, old = submit.call_args.args
+            self.assertEqual(backends.rehash_password(user_id, password, old), 1)
+        self.assertIn('$2000$', User.objects.get(pk=self.user.pk).password)
+
+
+class BulkStatusTests(CoreAPITestCase):
+    url = '/api/applications/bulk-status/'
+
+    def test_bulk_reject_by_ids(self):
+        other_company = create_company('Other', 'OTHER')
+        other_hr = create_user('other_hr', 'HR', company=other_company)
+        foreign = create_application(create_job(other_company, other_hr), self.candidates[0])
+        accepted = self.applications[1]
+        JobApplication.objects.filter(pk=accepted.pk).update(status='ACCEPTED')
+
+        self.login(self.hr_user)
+        ids = [self.applications[0].pk, accepted.pk, foreign.pk]
+        with self.assertNumQueries(8):
+            # profile, savepoint, locking SELECT, UPDATE, task INSERT, event INSERT, pg_notify, release
+            response = self.client.post(self.url, {'status': 'REJECTED', 'ids': ids}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['results'], [
+            {'id': self.applications[0].pk, 'result': 'updated'},
+            {'id': accepted.pk, 'result': 'invalid_transition', 'from': 'ACCEPTED'},
+            {'id': foreign.pk, 'result': 'not_found'},
+        ])
+        self.assertEqual(JobApplication.objects.get(pk=foreign.pk).status, 'APPLIED')
+        self.assertEqual(Task.objects.filter(name='notify_application_status').count(), 1)
+
+    def test_bulk_by_filter(self):
+        self.login(self.hr_user)
+        body = {'status': 'UNDER_REVIEW', 'filter': {'job_posting': self.jobs[0].pk, 'status': 'APPLIED'}}
+        response = self.client.post(self.url, body, format='json')
+        self.assertEqual(response.data['updated'], self.candidate_count)
+        self.assertEqual(
+            JobApplication.objects.filter(job_posting=self.jobs[0], status='UNDER_REVIEW').count(),
+            self.candidate_count,
+        )
+
+    def test_filter_is_capped(self):
+        self.login(self.hr_user)
+        body = {'status': 'UNDER_REVIEW', 'filter': {'status': 'APPLIED'}}
+        with mock.patch.object(BulkStatusSerializer, 'MAX_IDS', len(self.applications) - 1):
+            response = self.client.post(self.url, body, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('filter', response.data)
+        self.assertFalse(JobApplication.objects.filter(status='UNDER_REVIEW').exists())
+
+    def test_requires_ids_or_filter(self):
+        self.login(self.hr_user)
+        response = self.client.post(self.url, {'status': 'REJECTED'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_hr_only(self):
+        self.login(self.candidates[0])
+        response = self.client.post(self.url, {'status': 'REJECTED', 'ids': [1]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class BulkImportExportTests(CoreAPITestCase):
+
+    def upload(self, url, name, content):
+        return self.client.post(url, {'file': SimpleUploadedFile(name, content.encode())}, format='multipart')
+
+    def test_import_jobs_csv(self):
+        self.login(self.hr_user)
+        content = (
+            'title,description,location,job_type,department,status\n'
+            'Data Engineer,Pipelines,Remote,Full-time,Data,ACTIVE\n'
+            ',Missing title,Remote,Full-time,Data,ACTIVE\n'
+            'QA Engineer,Testing,Berlin,Full-time,QA,\n'
+        )
+        response = self.upload('/api/jobs/import/', 'jobs.csv', content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['error_count'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        qa = JobPosting.objects.get(title='QA Engineer')
+        self.assertEqual((qa.company, qa.created_by, qa.status), (self.company, self.hr_user, 'DRAFT'))
+
+    def test_import_applications_ndjson(self):
+        self.login(self.hr_user)
+        rows = [
+            {'job_posting': self.jobs[0].pk, 'candidate_email': 'new@example.com', 'full_name': 'New Person',
+             'skills': ['Python'], 'status': 'UNDER_REVIEW'},
+            # Already applied
+            {'job_posting': self.jobs[0].pk, 'candidate_email': self.candidates[0].email.upper(), 'full_name': 'X'},
+            {'job_posting': 999999, 'candidate_email': 'other@example.com', 'full_name': 'Y'},
+            'not an object',
+        ]
+        content = '\n'.join(json.dumps(row) for row in rows) + '\n{broken\n'
+        response = self.upload('/api/applications/import/', 'apps.ndjson', content)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['error_count'], 4)
+
+        application = JobApplication.objects.select_related('candidate__userprofile', 'resume_data').get(
+            candidate__email='new@example.com'
+        )
+        self.assertEqual(application.status, 'UNDER_REVIEW')
+        self.assertEqual(application.resume_data.skills, ['Python'])
+        self.assertEqual(application.candidate.userprofile.user_type, 'CANDIDATE')
+        self.assertFalse(application.candidate.has_usable_password())
+        self.assertTrue(Task.objects.filter(name='score_application', payload={'application_id': application.pk}).exists())
+
+    def test_import_only_for_company_candidates(self):
+        other_hr = create_user('other_hr', 'HR', company=create_company('Other', 'OTHER'))
+        stranger = create_user('stranger', 'CANDIDATE')
+        self.login(self.hr_user)
+        rows = [
+            {'job_posting': self.jobs[0].pk, 'candidate_email': email, 'full_name': 'X'}
+            for email in (other_hr.email, stranger.email, self.hr_user.email)
+        ]
+        response = self.upload(
+            '/api/applications/import/', 'apps.ndjson', '\n'.join(json.dumps(row) for row in rows)
+        )
+        self.assertEqual((response.data['created'], response.data['error_count']), (0, 3))
+        self.assertIn('candidate_email', response.data['errors'][0]['errors'])
+        self.assertFalse(ResumeData.objects.filter(candidate__in=[other_hr, stranger, self.hr_user]).exists())
+
+        # The company's own candidates, and new ones
+        content = f'candidate_email,full_name,summary\n{self.candidates[1].email},B,Kafka\nnew@example.com,New,Kafka\n'
+        response = self.upload('/api/resume-data/import/', 'resumes.csv', content)
+        self.assertEqual(response.data['created'], 2)
+        imported = ResumeData.objects.filter(summary='Kafka')
+        self.assertEqual({resume.imported_by_id for resume in imported}, {self.company.pk})
+        response = self.client.get('/api/resume-data/search/', {'q': 'kafka'})
+        self.assertEqual({row['id'] for row in response.data['results']}, {resume.pk for resume in imported})
+
+    def test_export_round_trip(self):
+        self.login(self.hr_user)
+        response = self.client.get('/api/applications/export/', HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), len(self.applications))
+        self.assertEqual(rows[0]['candidate_email'], self.candidates[0].email)
+        self.assertEqual(json.loads(rows[0]['skills']), ['Python', 'Django'])
+
+        response = self.client.get('/api/jobs/export/?export_format=ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['title'] for line in lines], ['Job 0', 'Job 1'])
+
+    def test_hr_only(self):
+        self.login(self.candidates[0])
+        self.assertEqual(self.client.get('/api/jobs/export/').status_code, 403)
+
+    def test_commands(self):
+        out = io.StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as f:
+            f.write(json.dumps({'title': 'Imported', 'description': 'x', 'location': 'Remote',
+                                'job_type': 'Full-time', 'department': 'Ops'}) + '\n')
+        self.addCleanup(os.remove, f.name)
+        call_command('import_records', 'jobs', f.name, company='ACME', stdout=out, stderr=io.StringIO())
+        self.assertIn('Imported 1 jobs', out.getvalue())
+
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as f:
+            pass
+        self.addCleanup(os.remove, f.name)
+        call_command('export_records', 'jobs', company='ACME', output=f.name)
+        with open(f.name) as exported:
+            self.assertEqual(len(list(csv.DictReader(exported))), 3)
+
+
+class AsyncViewTests(CoreAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.headers = {'HTTP_AUTHORIZATION': f'Token {Token.objects.create(user=self.hr_user).key}'}
+
+    def test_list_matches_sync_api(self):
+        response = self.client.get('/api/async/applications/?page_size=4&expand=job_posting', **self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.login(self.hr_user)
+        expected = self.client.get('/api/applications/?page_size=4&expand=job_posting').json()
+        self.assertEqual(data['results'], expected['results'])
+        self.assertIsNotNone(data['next'])
+
+        second = self.client.get(data['next'], **self.headers).json()
+        self.assertEqual(len(second['results']), len(self.applications) - 4)
+
+    def test_retrieve(self):
+        interview = self.interviews[0]
+        response = self.client.get(f'/api/async/interviews/{interview.pk}/', **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['application']['candidate']['username'], 'candidate0')
+
+        other_company = create_company('Other', 'OTHER')
+        other_job = create_job(other_company, create_user('other_hr', 'HR', company=other_company))
+        response = self.client.get(f'/api/async/jobs/{other_job.pk}/', **self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_skills_filters(self):
+        resume = self.applications[0].resume_data
+        ResumeData.objects.filter(pk=resume.pk).update(skills=['Rust'])
+        response = self.client.get('/api/async/applications/', {'skills_all': 'rust'}, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.applications[0].pk])
+        response = self.client.get('/api/async/jobs/', {'skills_any': 'python,rust'}, **self.headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_requires_token(self):
+        self.assertEqual(self.client.get('/api/async/jobs/').status_code, 401)
+        response = self.client.get('/api/async/jobs/', HTTP_AUTHORIZATION='Token nope')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.client.post('/api/async/jobs/', **self.headers).status_code, 405)
+
+
+class SchedulingTests(CoreAPITestCase):
+    # A Monday far enough out not to meet the fixture's interviews
+    day = datetime(2030, 1, 7, tzinfo=dt_timezone.utc)
+
+    def at(self, hour, minute=0):
+        return self.day + timedelta(hours=hour, minutes=minute)
+
+    def setUp(self):
+        super().setUp()
+        self.hr2 = create_user('hr2', 'HR', company=self.company)
+        create_interview(self.applications[0], self.hr_user, scheduled_time=self.at(10))
+        create_interview(self.applications[1], self.hr2, scheduled_time=self.at(13))
+
+    def test_double_booking_is_rejected(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            create_interview(self.applications[2], self.hr_user, scheduled_time=self.at(10, 30))
+        # Back to back is fine, and cancelled interviews don't hold their slot
+        create_interview(self.applications[2], self.hr_user, scheduled_time=self.at(11))
+        create_interview(self.applications[3], self.hr_user, scheduled_time=self.at(10, 30), status='CANCELLED')
+
+    def test_availability(self):
+        self.login(self.hr_user)
+        response = self.client.get('/api/interviews/availability/', {
+            'interviewers': f'{self.hr_user.pk},{self.hr2.pk}',
+            'start': self.at(9).isoformat(),
+            'end': self.at(17).isoformat(),
+            'duration': 60,
+        })
+        self.assertEqual(response.status_code, 200)
+        ranges = lambda data: [(row['start'], row['end']) for row in data]
+        free = {row['id']: ranges(row['free']) for row in response.data['interviewers']}
+        self.assertEqual(free[self.hr_user.pk], [(self.at(9), self.at(10)), (self.at(11), self.at(17))])
+        self.assertEqual(free[self.hr2.pk], [(self.at(9), self.at(13)), (self.at(14), self.at(17))])
+        self.assertEqual(
+            ranges(response.data['common']),
+            [(self.at(9), self.at(10)), (self.at(11), self.at(13)), (self.at(14), self.at(17))],
+        )
+
+    def test_availability_uses_double_booking_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + scheduling.AVAILABILITY_SQL, {
+                'start': self.at(9), 'end': self.at(17), 'interviewers': [self.hr_user.pk],
+                'statuses': scheduling.ACTIVE_STATUSES, 'duration': 60,
+            })
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        self.assertTrue(uses_index(plan, 'interview_no_double_booking'), plan)
+
+    def test_availability_of_other_company(self):
+        other_hr = create_user('other_hr', 'HR', company=create_company('Other', 'OTHER'))
+        self.login(self.hr_user)
+        response = self.client.get('/api/interviews/availability/', {
+            'interviewers': str(other_hr.pk), 'start': self.at(9).isoformat(), 'end': self.at(17).isoformat(),
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_schedule(self):
+        self.login(self.hr_user)
+        response = self.client.post('/api/interviews/bulk-schedule/', {
+            'interview_type': 'TECHNICAL',
+            'duration_minutes': 45,
+            'interviews': [
+                {'application': self.applications[2].pk, 'interviewer': self.hr_user.pk, 'scheduled_time': self.at(11)},
+                {'application': self.applications[2].pk, 'interviewer': self.hr2.pk, 'scheduled_time': self.at(11)},
+                {'application': self.applications[3].pk, 'interviewer': self.hr_user.pk,
+                 'scheduled_time': self.at(11, 45), 'duration_minutes': 30},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        created = Interview.objects.filter(pk__in=[row['id'] for row in response.data]).order_by('id')
+        self.assertEqual([interview.interview_type for interview in created], ['TECHNICAL'] * 3)
+        self.assertEqual(created[2].slot.lower, self.at(11, 45))
+        self.assertEqual(created[2].slot.upper, self.at(12, 15))
+
+    def test_bulk_schedule_conflicts(self):
+        count = Interview.objects.count()
+        existing = Interview.objects.get(interviewer=self.hr_user, scheduled_time=self.at(10))
+        self.login(self.hr_user)
+        response = self.client.post('/api/interviews/bulk-schedule/', {
+            'interviews': [
+                {'application': self.applications[2].pk, 'interviewer': self.hr_user.pk, 'scheduled_time': self.at(9, 30)},
+                {'application': self.applications[3].pk, 'interviewer': self.hr2.pk, 'scheduled_time': self.at(15)},
+                {'application': self.applications[4].pk, 'interviewer': self.hr2.pk, 'scheduled_time': self.at(15, 30)},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflicts'], [{'index': 0, 'interview': existing.pk}, {'index': 2, 'booking': 1}])
+        self.assertEqual(Interview.objects.count(), count)
+
+    def test_reschedule_into_conflict(self):
+        interview = create_interview(self.applications[2], self.hr_user, scheduled_time=self.at(14))
+        self.login(self.hr_user)
+        response = self.client.patch(
+            f'/api/interviews/{interview.pk}/', {'scheduled_time': self.at(10, 15)}, format='json'
+        )
+        self.assertEqual(response.status_code, 409)
+
+
+class ChangeEventTests(CoreAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.token = Token.objects.create(user=self.hr_user).key
+        self.last_id = ChangeEvent.objects.order_by('-id').values_list('id', flat=True).first()
+
+    def test_changes_are_recorded(self):
+        application = self.applications[0]
+        application.status = 'UNDER_REVIEW'
+        application.save(update_fields=['status'])
+        application.notes = 'Strong portfolio'
+        application.save(update_fields=['notes'])
+
+        event = ChangeEvent.objects.get(id__gt=self.last_id)
+        self.assertEqual((event.company_id, event.kind, event.action), (self.company.pk, 'application', 'updated'))
+        self.assertEqual(event.data['status'], 'UNDER_REVIEW')
+
+    def test_company_deletion(self):
+        # With applications and interviews, whose deletion records no events
+        self.company.delete()
+        with connection.cursor() as cursor:
+            # Foreign keys are checked at commit otherwise, which a test never reaches
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        self.assertFalse(ChangeEvent.objects.filter(company_id=self.company.pk).exists())
+        self.assertFalse(Interview.objects.filter(pk=self.interviews[0].pk).exists())
+
+    async def read(self, headers, count):
+        headers = {'authorization': f'Token {self.token}', **headers}
+        response = await self.async_client.get('/api/events/', headers=headers)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = aiter(response.streaming_content)
+        try:
+            return [(await anext(chunks)).decode() for _ in range(count)]
+        finally:
+            await chunks.aclose()
+
+    async def test_stream_resumes_after_last_event_id(self):
+        interview = await Interview.objects.aget(pk=self.interviews[0].pk)
+        interview.status = 'CANCELLED'
+        await sync_to_async(interview.save)(update_fields=['status'])
+
+        retry, message = await self.read({'last-event-id': str(self.last_id)}, 2)
+        self.assertEqual(retry, f'retry: {events.RETRY_MS}\n\n')
+        fields = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+        self.assertEqual(fields['event'], 'interview')
+        self.assertEqual(json.loads(fields['data'])['data']['status'], 'CANCELLED')
+        self.assertGreater(int(fields['id']), self.last_id)
+
+    @override_settings(EVENTS_HEARTBEAT=0.01)
+    async def test_stream_starts_from_now(self):
+        # No history replayed, the fixture's own events included
+        _retry, message = await self.read({}, 2)
+        self.assertEqual(message, ': heartbeat\n\n')
+
+    async def test_listener_wakes_company_streams(self):
+        wakeup = await events.listener.subscribe(self.company.pk)
+        try:
+            conn = psycopg2.connect(**connection.get_connection_params())
+            conn.autocommit = True
+            with conn, conn.cursor() as cursor:
+                cursor.execute('SELECT pg_notify(%s, %s)', [events.CHANNEL, str(self.company.pk)])
+            conn.close()
+            await asyncio.wait_for(wakeup.wait(), 5)
+        finally:
+            events.listener.unsubscribe(self.company.pk, wakeup)
+
+    def test_hr_only(self):
+        token = Token.objects.create(user=self.candidates[0]).key
+        response = self.client.get('/api/events/', HTTP_AUTHORIZATION=f'Token {token}')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get('/api/events/').status_code, 401)
+
+
+class ChangeEventStreamTests(TransactionTestCase):
+    """The stream outside a test transaction, as it runs under ASGI"""
+
+    def setUp(self):
+        self.company = create_company()
+        self.last_id = ChangeEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+    def record(self):
+        return events.record([ChangeEvent(company=self.company, kind='application', action='updated', object_id=1)])[0]
+
+    async def next_event(self, messages):
+        while (message := await anext(messages)).startswith(':'):
+            pass
+        return int(message.split('\n')[0].removeprefix('id: '))
+
+    @override_settings(EVENTS_HEARTBEAT=0.01)
+    async def test_events_committed_out_of_id_order(self):
+        # An earlier id, committed last
+        conn = psycopg2.connect(**connection.get_connection_params())
+        self.addCleanup(conn.close)
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO core_changeevent (company_id, kind, action, object_id, data, created_at)"
+                " VALUES (%s, 'application', 'updated', 1, '{}', now()) RETURNING id",
+                [self.company.pk],
+            )
+            [first_id] = cursor.fetchone()
+        second = await sync_to_async(self.record)()
+
+        messages = aiter(events.stream(self.company.pk, self.last_id))
+        try:
+            await anext(messages)
+            # Held back until the earlier transaction ends
+            self.assertEqual(await anext(messages), ': heartbeat\n\n')
+            conn.commit()
+            self.assertEqual([await self.next_event(messages), await self.next_event(messages)], [first_id, second.pk])
+        finally:
+            await messages.aclose()
+
+    @override_settings(EVENTS_HEARTBEAT=0.01)
+    async def test_stream_releases_its_connection(self):
+        event = await sync_to_async(self.record)()
+        messages = aiter(events.stream(self.company.pk, self.last_id))
+        try:
+            await anext(messages)
+            self.assertEqual(await self.next_event(messages), event.pk)
+            self.assertEqual(await anext(messages), ': heartbeat\n\n')
+            self.assertIsNone(await sync_to_async(lambda: connection.connection)())
+        finally:
+            await messages.aclose()
+
+
+class RequestMetricsTests(CoreAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        metrics.clear()
+
+    def test_request_is_recorded(self):
+        self.login(self.hr_user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/applications/')
+
+        key = ('jobapplication-list', 'GET')
+        # _values holds (bucket counts, sum) per label set
+        self.assertEqual(metrics.db_queries._values[key][1], len(queries))
+        self.assertGreater(metrics.serializer_duration._values[key][1], 0)
+        self.assertGreater(metrics.response_size._values[key][1], 0)
+        self.assertIn(
+            'talentflow_requests_total{view="jobapplication-list",method="GET",status="200"} 1', metrics.render()
+        )
+
+    @override_settings(METRICS_REPEATED_QUERY_THRESHOLD=3)
+    def test_repeated_queries(self):
+        stats = metrics.RequestStats()
+        for _ in range(4):
+            stats.add_query('SELECT * FROM core_resumedata WHERE id = %s', 0.001)
+        stats.add_query('SELECT * FROM core_company WHERE id = %s', 0.001)
+        with self.assertLogs('core.metrics', 'WARNING'):
+            metrics.observe(stats, 'resumedata-list', 'GET', 200)
+        self.assertEqual(metrics.repeated_queries._values[('resumedata-list',)], 3)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_endpoint(self):
+        self.assertIn(self.client.get('/api/metrics/').status_code, (401, 403))
+        self.assertIn(
+            self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, (401, 403)
+        )
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        self.assertIn('# TYPE talentflow_request_duration_seconds histogram', response.content.decode())
+
+    def test_profile_on_demand(self):
+        self.hr_user.is_staff = True
+        self.hr_user.save()
+        staff_token = Token.objects.create(user=self.hr_user).key
+        candidate_token = Token.objects.create(user=self.candidates[0]).key
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir)
+
+        with override_settings(PROFILE_DIR=profile_dir):
+            response = self.client.get('/api/jobs/', HTTP_AUTHORIZATION=f'Token {staff_token}', HTTP_X_PROFILE='1')
+            self.assertEqual(response.status_code, 200)
+            pstats.Stats(os.path.join(profile_dir, response['X-Profile-File']))
+
+            response = self.client.get('/api/jobs/', HTTP_AUTHORIZATION=f'Token {candidate_token}', HTTP_X_PROFILE='1')
+            self.assertNotIn('X-Profile-File', response)
+        self.assertEqual(len(os.listdir(profile_dir)), 1)
+
+
+class CounterTests(CoreAPITestCase):
+    COUNTERS = ['applications_count', 'applied_count', 'under_review_count', 'rejected_count', 'interviews_count']
+
+    def counters(self, job):
+        return JobPosting.objects.values(*self.COUNTERS).get(pk=job.pk)
+
+    def company_counters(self):
+        return Company.objects.values_list('open_jobs_count', 'applications_count').get(pk=self.company.pk)
+
+    def test_kept_by_writes(self):
+        job = self.jobs[0]
+        self.assertEqual(self.counters(job), {
+            'applications_count': 3, 'applied_count': 3, 'under_review_count': 0, 'rejected_count': 0,
+            'interviews_count': 3,
+        })
+        # Applications, not candidates: the 3 candidates applied to both jobs
+        self.assertEqual(self.company_counters(), (2, 6))
+
+        candidate = create_user('late', 'CANDIDATE')
+        application = create_application(job, candidate)
+        application.status = 'UNDER_REVIEW'
+        application.save()
+        JobApplication.objects.filter(pk=self.applications[0].pk).update(status='REJECTED')
+        Interview.objects.filter(application=self.applications[0]).delete()
+        self.assertEqual(self.counters(job), {
+            'applications_count': 4, 'applied_count': 2, 'under_review_count': 1, 'rejected_count': 1,
+            'interviews_count': 2,
+        })
+        self.assertEqual(JobPosting.objects.get(pk=job.pk).last_applied_at, application.applied_at)
+
+        application.delete()
+        job.refresh_from_db()
+        self.assertEqual(job.applications_count, 3)
+        self.assertEqual(job.last_applied_at, max(app.applied_at for app in self.applications[::2]))
+
+        create_job(self.company, self.hr_user, status='DRAFT')
+        self.jobs[1].status = 'CLOSED'
+        self.jobs[1].save()
+        self.assertEqual(self.company_counters(), (1, 6))
+        self.jobs[1].delete()
+        self.assertEqual(self.company_counters(), (1, 3))
+
+    def test_bulk_create(self):
+        candidates = [create_user(f'bulk{i}', 'CANDIDATE') for i in range(3)]
+        JobApplication.objects.bulk_create([
+            JobApplication(job_posting=job, candidate=candidate, resume_data=create_resume(candidate), status='REJECTED')
+            for candidate in candidates for job in self.jobs
+        ])
+        self.assertEqual(self.counters(self.jobs[1])['rejected_count'], 3)
+        self.assertEqual(self.company_counters(), (2, 12))
+
+    def test_stale_instance_keeps_counters(self):
+        job = JobPosting.objects.get(pk=self.jobs[0].pk)
+        create_application(job, create_user('late', 'CANDIDATE'))
+        job.title = 'Renamed'
+        job.save()
+        self.assertEqual(self.counters(job)['applications_count'], 4)
+
+    def test_reconcile(self):
+        JobPosting.objects.filter(pk=self.jobs[0].pk).update(applications_count=99, interviews_count=0)
+        Company.objects.filter(pk=self.company.pk).update(open_jobs_count=5)
+
+        self.assertEqual(counters.reconcile(dry_run=True), {'jobs': [self.jobs[0].pk], 'companies': [self.company.pk]})
+        self.assertEqual(self.counters(self.jobs[0])['applications_count'], 99)
+        call_command('reconcile_counters', stdout=io.StringIO())
+        self.assertEqual(self.counters(self.jobs[0])['applications_count'], 3)
+        self.assertEqual(self.counters(self.jobs[0])['interviews_count'], 3)
+        self.assertEqual(self.company_counters(), (2, 6))
+        self.assertEqual(counters.reconcile(), {'jobs': [], 'companies': []})
+
+    def test_job_list_shows_fresh_counters(self):
+        self.login(self.hr_user)
+        url = '/api/jobs/?fields=id,applications_count,interview_scheduled_count'
+        self.client.get(url)
+        application = self.applications[0]
+        application.status = 'INTERVIEW_SCHEDULED'
+        application.save()
+        rows = {row['id']: row for row in self.client.get(url).data['results']}
+        self.assertEqual(rows[self.jobs[0].pk]['interview_scheduled_count'], 1)
+
+        response = self.client.get(f'/api/jobs/{self.jobs[0].pk}/')
+        self.assertEqual(response.data['applications_count'], 3)
+        response = self.client.patch(f'/api/jobs/{self.jobs[0].pk}/', {'applications_count': 0}, format='json')
+        self.assertEqual(response.data['applications_count'], 3)
+
+
+class RecommendationTests(CoreAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.data_job = create_job(
+            cls.company, cls.hr_user, title='Data Scientist', description='Statistics and machine learning',
+            requirements='Python, Pandas, Spark',
+        )
+        cls.python_job = create_job(
+            cls.company, cls.hr_user, title='Python Developer', description='Django services',
+            requirements='Python, Django, PostgreSQL',
+        )
+        cls.closed_job = create_job(
+            cls.company, cls.hr_user, title='Django Engineer', requirements='Python, Django', status='CLOSED',
+        )
+        Task.objects.filter(name='update_job_index').delete()
+
+    def recommended(self, **params):
+        self.login(self.candidates[0])
+        return self.client.get('/api/jobs/recommended/', params)
+
+    def test_ranks_active_jobs_against_latest_resume(self):
+        self.assertEqual(self.recommended().status_code, 503)
+        recommendations.rebuild()
+
+        response = self.recommended()
+        self.assertEqual(response.status_code, 200)
+        # The jobs applied to and the closed one are left out
+        self.assertEqual([row['id'] for row in response.data], [self.python_job.pk, self.data_job.pk])
+        self.assertGreater(response.data[0]['score'], response.data[1]['score'])
+
+        create_resume(self.candidates[0], summary='Data scientist', skills=['Pandas', 'Spark', 'Statistics'])
+        self.assertEqual(self.recommended(limit=1).data[0]['id'], self.data_job.pk)
+        self.assertEqual(self.recommended(limit=0).status_code, 400)
+
+        self.login(self.hr_user)
+        self.assertEqual(self.client.get('/api/jobs/recommended/').status_code, 403)
+
+    @override_settings(RECOMMENDATIONS_MAX_SEGMENTS=2)
+    def test_index_follows_job_changes(self):
+        recommendations.rebuild()
+        self.python_job.status = 'PAUSED'
+        self.python_job.save()
+        self.closed_job.status = 'ACTIVE'
+        self.closed_job.save()
+        self.assertEqual(queue.run_pending(), 2)
+        self.assertEqual([row['id'] for row in self.recommended().data], [self.closed_job.pk, self.data_job.pk])
+
+        index = recommendations.get_index()
+        self.assertEqual(len(index.segments), 2)
+        self.data_job.description = 'Python and Django'
+        self.data_job.save()
+        queue.run_pending()
+        # Merged back into one segment
+        index = recommendations.get_index()
+        self.assertEqual(len(index.segments), 1)
+        self.assertEqual(len(index), 4)
+        # and the merged ones deleted
+        segment_dirs = [name for name in os.listdir(settings.RECOMMENDATIONS_INDEX_DIR) if name.startswith('segment-')]
+        self.assertEqual(len(segment_dirs), 1)
+
+
+class SkillTests(CoreAPITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.resume = cls.applications[0].resume_data
+        ResumeData.objects.filter(pk=cls.resume.pk).update(skills=['Postgres', ' python ', 'COBOL', 'Python'])
+        cls.job = create_job(
+            cls.company, cls.hr_user, requirements='Strong Python, k8s and Amazon Web Services; Cobol is a plus',
+        )
+        Task.objects.filter(name='update_job_index').delete()
+
+    def tags(self, instance):
+        instance.refresh_from_db(fields=['skill_tags'])
+        return instance.skill_tags
+
+    def test_tags_follow_the_vocabulary(self):
+        self.assertEqual(self.tags(self.resume), ['cobol', 'postgresql', 'python'])
+        # Only vocabulary skills are picked from the requirements
+        self.assertEqual(self.tags(self.job), ['aws', 'kubernetes', 'python'])
+
+        SkillAlias.objects.get(alias='postgres').delete()
+        cobol = Skill.objects.create(name='COBOL')
+        self.assertEqual(queue.run_pending(), 2)
+        self.assertEqual(self.tags(self.resume), ['cobol', 'postgres', 'python'])
+        self.assertEqual(self.tags(self.job), ['aws', 'cobol', 'kubernetes', 'python'])
+
+        SkillAlias.objects.create(skill=Skill.objects.get(name='PostgreSQL'), alias=' Postgres')
+        cobol.name = 'Mainframe COBOL'
+        cobol.save()
+        queue.run_pending()
+        self.assertEqual(self.tags(self.resume), ['cobol', 'postgresql', 'python'])
+        self.assertEqual(self.tags(self.job), ['aws', 'kubernetes', 'python'])
+
+    def test_filters(self):
+        self.login(self.hr_user)
+        response = self.client.get('/api/applications/', {'skills_all': 'PostgreSQL,python'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.applications[0].pk])
+        response = self.client.get('/api/applications/', {'skills_any': 'rust,cobol', 'skills_all': 'python'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.applications[0].pk])
+        response = self.client.get('/api/applications/', {'skills_all': 'Python'})
+        self.assertEqual(len(response.data['results']), len(self.applications))
+
+        response = self.client.get('/api/resume-data/search/', {'q': 'python', 'skills_any': 'postgres'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.resume.pk])
+        response = self.client.get('/api/jobs/', {'skills_all': 'amazon web services'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.job.pk])
+
+        response = self.client.get('/api/applications/', {'skills_any': ','.join(map(str, range(21)))})
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_lists_are_filtered(self):
+        self.login(self.hr_user)
+        url = f'/api/applications/{self.applications[1].pk}/?skills_all=cobol'
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.patch(url, {'notes': 'Call back'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(JobApplication.objects.get(pk=self.applications[1].pk).notes, 'Call back')
+
+
+class PartitionTests(CoreAPITestCase):
+
+    def partition(self, model, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT tableoid::regclass::text FROM {model._meta.db_table} WHERE id = %s', [pk])
+            return cursor.fetchone()[0]
+
+    def test_one_application_per_candidate_and_job(self):
+        with self.assertRaises(IntegrityError) as raised, transaction.atomic():
+            create_application(self.jobs[0], self.candidates[0])
+        self.assertEqual(raised.exception.__cause__.diag.constraint_name, 'jobapplication_job_candidate_uniq')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            JobApplication.objects.filter(pk=self.applications[0].pk).update(job_posting=self.jobs[1])
+
+    def test_create_partitions_moves_rows_out_of_default(self):
+        interview = self.interviews[0]
+        Interview.objects.filter(pk=interview.pk).update(
+            scheduled_time=datetime(2031, 5, 6, 10, tzinfo=dt_timezone.utc)
+        )
+        self.assertEqual(self.partition(Interview, interview.pk), 'core_interview_hot_default')
+
+        created = partitions.create_partitions(months_ahead=0)
+        self.assertEqual(created, ['core_interview_p2031_05'])
+        self.assertEqual(self.partition(Interview, interview.pk), 'core_interview_p2031_05')
+        self.assertEqual(partitions.create_partitions(months_ahead=0), [])
+
+    def test_archive_closed_jobs(self):
+        closed, open_ = self.jobs
+        closed.status = 'CLOSED'
+        closed.save()
+        JobApplication.objects.update(applied_at=F('applied_at') - timedelta(days=800))
+        counts = JobPosting.objects.values_list('applications_count', 'interviews_count').get(pk=closed.pk)
+        loaded = JobApplication.objects.get(pk=self.applications[0].pk)
+
+        applications, interviews, archive = partitions.archive(months=12)
+        self.assertEqual((applications, interviews), (3, 3))
+        year = (timezone.now() - timedelta(days=800)).year
+        self.assertIn(f'core_jobapplication_archive_p{year}', archive)
+        for application, interview in zip(self.applications, self.interviews):
+            archived = application.job_posting_id == closed.pk
+            self.assertEqual(JobApplication.objects.get(pk=application.pk).archived, archived)
+            self.assertEqual(Interview.objects.get(pk=interview.pk).archived, archived)
+            if archived:
+                self.assertTrue(self.partition(JobApplication, application.pk).startswith('core_jobapplication_archive_p'))
+                self.assertTrue(self.partition(Interview, interview.pk).startswith('core_interview_archive_p'))
+        self.assertEqual(
+            JobPosting.objects.values_list('applications_count', 'interviews_count').get(pk=closed.pk), counts
+        )
+
+        # Instances loaded before don't write back the old flag
+        loaded.notes = 'Archived'
+        loaded.save()
+        self.assertTrue(JobApplication.objects.get(pk=loaded.pk).archived)
+        self.assertEqual(partitions.archive(months=12), (0, 0, []))
+
+
+class ReplicaLagTests(TestCase):
+
+    def test_lag(self):
+        # Not in recovery
+        self.assertEqual(replicas.replica_lag('default'), 0)
+        # What a replica without a streaming WAL receiver gets
+        with mock.patch.object(replicas, 'LAG_SQL', 'SELECT NULL'), self.assertLogs('core.replicas', 'WARNING'):
+            self.assertIsNone(replicas.replica_lag('default'))
+
+
+class ReplicaRoutingTests(CoreAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        replica_settings = override_settings(DATABASE_REPLICAS=['replica0'])
+        replica_settings.enable()
+        self.addCleanup(replica_settings.disable)
+        replicas._checked.clear()
+        patcher = mock.patch.object(replicas, 'replica_lag', return_value=0.5)
+        self.replica_lag = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = ReplicaRouter()
+
+    def test_reads_of_requests_that_opted_in(self):
+        with replicas.primary():
+            self.assertEqual(self.router.db_for_read(JobPosting), 'default')
+            self.assertEqual(replicas.read_from_replica(self.hr_user), 'replica0')
+            self.assertEqual(self.router.db_for_read(JobPosting), 'replica0')
+            self.assertEqual(self.router.db_for_write(JobPosting), 'default')
+            with transaction.atomic():
+                self.assertEqual(self.router.db_for_read(JobPosting), 'default')
+            with replicas.primary():
+                self.assertEqual(self.router.db_for_read(JobPosting), 'default')
+            self.assertEqual(self.router.db_for_read(JobPosting), 'replica0')
+        self.assertEqual(self.router.db_for_read(JobPosting), 'default')
+
+    def test_writers_and_lagging_replicas_read_the_primary(self):
+        self.login(self.hr_user)
+        response = self.client.patch(f'/api/jobs/{self.jobs[0].pk}/', {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(replicas.is_pinned(self.hr_user.pk))
+        # Pinned for every process, not only this one
+        cache.clear()
+        self.assertTrue(replicas.is_pinned(self.hr_user.pk))
+        candidate = self.candidates[0]
+        self.assertFalse(replicas.is_pinned(candidate.pk))
+
+        with replicas.primary():
+            self.assertEqual(replicas.read_from_replica(candidate), 'replica0')
+            self.assertIsNone(replicas.read_from_replica(self.hr_user))
+            self.replica_lag.return_value = 30
+            # Until the next check
+            self.assertEqual(replicas.read_from_replica(candidate), 'replica0')
+            replicas._checked.clear()
+            with self.assertLogs('core.replicas', 'WARNING'):
+                self.assertIsNone(replicas.read_from_replica(candidate))
+            self.replica_lag.return_value = None
+            replicas._checked.clear()
+            self.assertIsNone(replicas.read_from_replica(candidate))
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'Needs a streaming replica of the primary in DB_REPLICAS')
+class ReplicaTests(TransactionTestCase):
+    """Against a real replica: data committed on the primary replicates to it"""
+
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        shared_cache.clear()
+        replicas._checked.clear()
+        self.alias = settings.DATABASE_REPLICAS[0]
+
+    def wait_for_replica(self, queryset):
+        deadline = time.monotonic() + 10
+        while not queryset.using(self.alias).exists():
+            self.assertLess(time.monotonic(), deadline, 'The replica did not catch up')
+            time.sleep(0.05)
+
+    def test_reads_go_to_the_replica_until_the_user_writes(self):
+        company = create_company()
+        hr_user = create_user('hr', 'HR', company=company)
+        job = create_job(company, hr_user)
+        self.wait_for_replica(JobPosting.objects.filter(pk=job.pk))
+        client = APIClient()
+        client.force_authenticate(user=hr_user)
+
+        with CaptureQueriesContext(connections[self.alias]) as replica_queries:
+            self.assertEqual(client.get(f'/api/jobs/{job.pk}/').status_code, 200)
+        self.assertTrue(replica_queries.captured_queries)
+
+        client.patch(f'/api/jobs/{job.pk}/', {'title': 'Renamed'}, format='json')
+        with CaptureQueriesContext(connections[self.alias]) as replica_queries:
+            response = client.get(f'/api/jobs/{job.pk}/')
+        self.assertEqual(response.data['title'], 'Renamed')
+        self.assertFalse(replica_queries.captured_queries)
+
+
+class PoolTests(TestCase):
+
+    def setUp(self):
+        metrics.clear()
+        self.conn_params = {**connections['default'].get_connection_params(), 'cursor_factory': None}
+        self.conn_params.pop('pool', None)
+
+    def make_pool(self, **options):
+        connection_pool = pool.ConnectionPool(
+            'test', lambda: psycopg2.connect(**self.conn_params), **{'min_size': 0, **options}
+        )
+        self.addCleanup(connection_pool.close)
+        return connection_pool
+
+    def backend_pid(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            return cursor.fetchone()[0]
+
+    def test_reuses_connections(self):
+        connection_pool = self.make_pool()
+        conn = connection_pool.get()
+        # Given back inside a transaction, rolled back
+        pid = self.backend_pid(conn)
+        connection_pool.put(conn)
+        self.assertEqual(conn.info.transaction_status, pool.TRANSACTION_IDLE)
+
+        conn = connection_pool.get()
+        self.assertEqual(self.backend_pid(conn), pid)
+        self.assertEqual(metrics.pool_opened._values[('test',)], 1)
+        self.assertEqual(metrics.pool_connections._values[('test', 'in_use')], 1)
+        connection_pool.put(conn)
+
+    def test_waits_for_a_free_connection(self):
+        connection_pool = self.make_pool(max_size=1, timeout=0.2)
+        conn = connection_pool.get()
+        with self.assertRaises(pool.PoolTimeout):
+            connection_pool.get()
+        self.assertEqual(metrics.pool_timeouts._values[('test',)], 1)
+
+        connection_pool.timeout = 5
+        threading.Timer(0.1, connection_pool.put, [conn]).start()
+        self.assertIs(connection_pool.get(), conn)
+        self.assertEqual(metrics.pool_waits._values[('test',)], 1)
+        connection_pool.put(conn)
+
+    def test_replaces_broken_connections(self):
+        connection_pool = self.make_pool(check_after=0)
+        conn = connection_pool.get()
+        pid = self.backend_pid(conn)
+        connection_pool.put(conn)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+
+        conn = connection_pool.get()
+        self.assertNotEqual(self.backend_pid(conn), pid)
+        self.assertEqual(metrics.pool_discarded._values[('test', 'broken')], 1)
+        connection_pool.put(conn)
+
+    def test_backend_reuses_connections(self):
+        settings_dict = {
+            **connections['default'].settings_dict,
+            'OPTIONS': {'pool': {'min_size': 0, 'max_size': 2}},
+        }
+        wrapper = PooledDatabaseWrapper(settings_dict)
+        self.addCleanup(pool.close_all)
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            pid = cursor.fetchone()[0]
+        wrapper.close()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT pg_backend_pid()')
+            self.assertEqual(cursor.fetchone()[0], pid)
+
+
+class SeedDataTests(TestCase):
+    def test_seed_small_data_set(self):
+        scale = Scale.for_applications(400)
+        result = Seeder(scale, seed=3, batch_size=50).run()
+
+        company_id = result['companies'][0]
+        self.assertEqual(JobPosting.objects.filter(company_id=company_id).count(), scale.jobs_per_company)
+        self.assertEqual(JobApplication.objects.count(), result['applications'])
+        self.assertEqual(result['applications'], scale.candidates * scale.applications_per_candidate)
+        self.assertEqual(Interview.objects.count(), len(result['interviews']))
+        # Every candidate has a resume, and applied with it
+        self.assertFalse(JobApplication.objects.exclude(resume_data__candidate=F('candidate')).exists())
+        self.assertTrue(Token.objects.filter(user_id=result['hr_users'][company_id][0]).exists())
+
+    def test_seed_twice(self):
+        Seeder(Scale.for_applications(40), seed=1).run()
+        Seeder(Scale.for_applications(40), seed=1).run()
+        self.assertEqual(Company.objects.count(), 2)
+        self.assertEqual(JobApplication.objects.count(), 80)
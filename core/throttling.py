@@ -0,0 +1,21 @@
+# ==== core/throttling.py ====
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle
+
+
+class LoginRateThrottle(AnonRateThrottle):
+    """Login attempts per client IP"""
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginEmailRateThrottle(SimpleRateThrottle):
+    """Login attempts per account, whatever IPs they come from"""
+    scope = 'login_email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': email.strip().lower()}
@@ -0,0 +1,79 @@
+# ==== core/uploads.py ====
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+ALLOWED_RESUME_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+
+def resume_storage_path(content_hash, extension):
+    """Content-addressed location, relative to MEDIA_ROOT"""
+    return os.path.join(settings.RESUME_UPLOAD_DIR, content_hash[:2], content_hash + extension)
+
+
+class HashedUploadedFile(UploadedFile):
+    """An upload already written to disk, with the SHA-256 of its content"""
+
+    def __init__(self, path, name, content_type, size, charset, content_hash):
+        super().__init__(open(path, 'rb'), name, content_type, size, charset)
+        self.path = path
+        self.content_hash = content_hash
+
+    def temporary_file_path(self):
+        return self.path
+
+
+class HashingFileUploadHandler(FileUploadHandler):
+    """
+    Streams uploaded files to a temporary file under MEDIA_ROOT chunk by chunk,
+    hashing them on the way, so a resume is never held in memory as a whole.
+    Files over RESUME_MAX_UPLOAD_SIZE are dropped and flagged in `rejected`.
+    """
+    chunk_size = 64 * 2 ** 10
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.rejected = []
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+        temp_dir = os.path.join(settings.MEDIA_ROOT, settings.RESUME_UPLOAD_DIR, 'tmp')
+        os.makedirs(temp_dir, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=temp_dir, suffix='.upload')
+        self.file = os.fdopen(fd, 'wb')
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > settings.RESUME_MAX_UPLOAD_SIZE:
+            self.rejected.append(self.file_name)
+            self._discard()
+            raise SkipFile()
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+        # Nothing for the handlers after us, the chunk is consumed
+        return None
+
+    def file_complete(self, file_size):
+        self.file.close()
+        return HashedUploadedFile(
+            self.temp_path, self.file_name, self.content_type,
+            file_size, self.charset, self.digest.hexdigest(),
+        )
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            self._discard()
+
+    def _discard(self):
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
@@ -18,7 +18,7 @@ urlpatterns = [
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'companies', views.CompanyViewSet)
@@ -35,4 +35,16 @@ urlpatterns = [
     path('auth/login/', views.login_user, name='login'),
     path('auth/logout/', views.logout_user, name='logout'),
     path('auth/me/', views.current_user, name='current_user'),
+    
+    # Prometheus scrape target (core/metrics.py)
+    path('metrics/', views.metrics_view, name='metrics'),
+    
+    # Async read-only endpoints, for ASGI deployments (core/async_views.py)
+    path('async/jobs/', async_views.job_list, name='async-job-list'),
+    path('async/jobs/<int:pk>/', async_views.job_detail, name='async-job-detail'),
+    path('async/applications/', async_views.application_list, name='async-application-list'),
+    path('async/applications/<int:pk>/', async_views.application_detail, name='async-application-detail'),
+    path('async/interviews/', async_views.interview_list, name='async-interview-list'),
+    path('async/interviews/<int:pk>/', async_views.interview_detail, name='async-interview-detail'),
+    path('events/', async_views.change_events, name='change-events'),
 ]
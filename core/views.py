@@ -1,19 +1,202 @@
 
 # ==== core/views.py (replace the existing content) ====
-from rest_framework import viewsets, status
+import hashlib
+import os
+
+from rest_framework import renderers, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache as default_cache
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
 from .models import Company, UserProfile, JobPosting, ResumeData, JobApplication, Interview
+from .bulk_io import (
+    CONTENT_TYPES, FORMATS, IMPORTERS, BulkImportError, export_queryset, format_from_name, iter_export,
+    iter_records
+)
+from .eager_loading import EagerLoadingMixin, eager_load
+from .pagination import KeysetPagination, SearchPagination
+from .permissions import CanReadMetrics, IsCandidate, IsHRUser
+from .replicas import ReplicaReadMixin
+from .scheduling import ScheduleConflict, availability, is_double_booking, schedule
+from .search import search
+from .skills import filter_skills
+from .signals import ACTIVE_FEED_SCOPE, JOB_LIST_NAMESPACE, invalidate_job_counters
+from .uploads import ALLOWED_RESUME_EXTENSIONS, HashingFileUploadHandler, resume_storage_path
+from .stats import company_stats, invalidate as invalidate_stats
+from . import cache, events, metrics, recommendations, replicas, tasks
 from .serializers import (
     CompanySerializer, UserProfileSerializer, JobPostingSerializer,
-    ResumeDataSerializer, JobApplicationSerializer, InterviewSerializer
+    ResumeDataSerializer, JobApplicationSerializer, InterviewSerializer,
+    CompanyListSerializer, JobPostingListSerializer, ResumeDataListSerializer,
+    JobApplicationListSerializer, InterviewListSerializer, DynamicFieldsMixin,
+    JobPostingSearchSerializer, ResumeDataSearchSerializer, BulkStatusSerializer,
+    AvailabilitySerializer, PanelScheduleSerializer, JobPostingRecommendationSerializer
 )
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class SparseFieldsetMixin:
+    """
+    Serve `list_serializer_class` on list and pass `?fields=a,b.c` and
+    `?expand=a,a.b` through to the serializer on reads.
+    """
+    list_serializer_class = None
+    
+    def get_serializer_class(self):
+        if self.action == 'list' and self.list_serializer_class is not None:
+            return self.list_serializer_class
+        return super().get_serializer_class()
+    
+    def get_fieldset_kwargs(self):
+        kwargs = {}
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return kwargs
+        for param in ('fields', 'expand'):
+            value = self.request.query_params.get(param)
+            if value:
+                kwargs[param] = [name.strip() for name in value.split(',') if name.strip()]
+        return kwargs
+    
+    def get_search_text(self):
+        text = self.request.query_params.get('q', '').strip()
+        if not text:
+            raise ValidationError({'q': ['This query parameter is required.']})
+        return text
+    
+    def search_response(self, queryset, serializer_class):
+        """Paginated, eager-loaded search results"""
+        fieldset = self.get_fieldset_kwargs()
+        queryset = eager_load(queryset, serializer_class(**fieldset))
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = serializer_class(page, many=True, **fieldset)
+        return paginator.get_paginated_response(serializer.data)
+    
+    def get_serializer(self, *args, **kwargs):
+        if issubclass(self.get_serializer_class(), DynamicFieldsMixin):
+            for key, value in self.get_fieldset_kwargs().items():
+                kwargs.setdefault(key, value)
+        return super().get_serializer(*args, **kwargs)
+
+class SkillsFilterMixin:
+    """
+    Narrow lists by `?skills_all=a,b` / `?skills_any=a,b` (core/skills.py)
+    on `skills_field`. Other actions, a PATCH or DELETE of one object among
+    them, ignore the parameters; searches apply `filter_by_skills` themselves.
+    """
+    skills_field = 'skill_tags'
+    
+    def filter_by_skills(self, queryset):
+        return filter_skills(queryset, self.request.query_params, self.skills_field)
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            queryset = self.filter_by_skills(queryset)
+        return queryset
+
+class CachedListMixin:
+    """
+    Serve `list` responses from the cache. Entries are keyed by the full URL
+    under the version of `get_list_cache_scope()` (None disables caching),
+    and carry an ETag and Last-Modified so clients revalidating an unchanged
+    page get a 304 without a query.
+    """
+    list_cache_namespace = None
+    
+    def get_list_cache_scope(self):
+        return None
+    
+    def list(self, request, *args, **kwargs):
+        scope = self.get_list_cache_scope()
+        if scope is None:
+            return super().list(request, *args, **kwargs)
+        
+        url_hash = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = cache.versioned_key(self.list_cache_namespace, scope, url_hash)
+        entry = default_cache.get(key)
+        if entry is None:
+            # Cached for every reader of the scope, so not from a lagging replica
+            with replicas.primary():
+                response = super().list(request, *args, **kwargs)
+            entry = {
+                'data': response.data,
+                # The key changes with every version, so it makes a good validator
+                'etag': quote_etag(hashlib.md5(key.encode()).hexdigest()),
+                'last_modified': cache.last_changed(self.list_cache_namespace, scope) or timezone.now(),
+            }
+            default_cache.set(key, entry, settings.LIST_CACHE_TIMEOUT)
+        
+        last_modified = int(entry['last_modified'].timestamp())
+        response = get_conditional_response(request, etag=entry['etag'], last_modified=last_modified)
+        if response is None:
+            response = Response(entry['data'])
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(last_modified)
+        # Per user, and always revalidated
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+class PassthroughRenderer(renderers.BaseRenderer):
+    """Lets clients ask for text/csv etc., the streaming response is already rendered"""
+    media_type = '*/*'
+    format = None
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+class BulkIOMixin:
+    """
+    `import/` (multipart `file`, CSV or NDJSON) and `export/`
+    (`?export_format=csv|ndjson`) for HR users, see core/bulk_io.py.
+    `?format=` is taken by DRF, hence the longer parameter names.
+    """
+    bulk_kind = None
+    
+    @action(
+        detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser],
+        permission_classes=[IsAuthenticated, IsHRUser]
+    )
+    def import_records(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['No file uploaded']}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.query_params.get('import_format') or format_from_name(upload.name)
+        importer = IMPORTERS[self.bulk_kind](request.user.userprofile.company, user=request.user)
+        try:
+            report = importer.run(iter_records(upload.file, fmt))
+        except BulkImportError as exc:
+            return Response({'file': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+    
+    @action(
+        detail=False, methods=['get'], url_path='export', permission_classes=[IsAuthenticated, IsHRUser],
+        renderer_classes=[renderers.JSONRenderer, PassthroughRenderer]
+    )
+    def export_records(self, request):
+        fmt = request.query_params.get('export_format', 'csv')
+        if fmt not in FORMATS:
+            return Response(
+                {'export_format': [f"Supported formats: {', '.join(FORMATS)}"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = export_queryset(self.bulk_kind, request.user.userprofile.company)
+        response = StreamingHttpResponse(iter_export(queryset, fmt), content_type=CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="{self.bulk_kind}.{fmt}"'
+        return response
+
+class CompanyViewSet(ReplicaReadMixin, SparseFieldsetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
+    list_serializer_class = CompanyListSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -22,21 +205,44 @@ class CompanyViewSet(viewsets.ModelViewSet):
         if user_profile and user_profile.user_type == 'HR':
             return Company.objects.filter(id=user_profile.company.id)
         return Company.objects.none()
+    
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated, IsHRUser])
+    def stats(self, request, pk=None):
+        """Hiring pipeline dashboard, cached until the company's applications or interviews change"""
+        company = self.get_object()
+        with replicas.primary():
+            return Response(company_stats(company))
 
-class JobPostingViewSet(viewsets.ModelViewSet):
+class JobPostingViewSet(ReplicaReadMixin, BulkIOMixin, CachedListMixin, SparseFieldsetMixin, SkillsFilterMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = JobPosting.objects.all()
     serializer_class = JobPostingSerializer
+    list_serializer_class = JobPostingListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+    list_cache_namespace = JOB_LIST_NAMESPACE
+    bulk_kind = 'jobs'
+    
+    def get_list_cache_scope(self):
+        # Every candidate gets the same feed, HR users their company's jobs
+        user_profile = getattr(self.request.user, 'userprofile', None)
+        if user_profile and user_profile.user_type == 'HR':
+            return user_profile.company_id
+        elif user_profile and user_profile.user_type == 'CANDIDATE':
+            return ACTIVE_FEED_SCOPE
+        return None
     
     def get_queryset(self):
         user_profile = getattr(self.request.user, 'userprofile', None)
         if user_profile and user_profile.user_type == 'HR':
             # HR users see jobs from their company
-            return JobPosting.objects.filter(company=user_profile.company)
+            jobs = JobPosting.objects.filter(company=user_profile.company)
         elif user_profile and user_profile.user_type == 'CANDIDATE':
             # Candidates see all active jobs
-            return JobPosting.objects.filter(status='ACTIVE')
-        return JobPosting.objects.none()
+            jobs = JobPosting.objects.filter(status='ACTIVE')
+        else:
+            return JobPosting.objects.none()
+        return jobs
     
     def perform_create(self, serializer):
         # Set the company and creator when creating a job
@@ -46,48 +252,279 @@ class JobPostingViewSet(viewsets.ModelViewSet):
             created_by=self.request.user
         )
     
+    def perform_update(self, serializer):
+        job = serializer.save()
+        # Applicants are matched against the job text
+        if any(field in serializer.validated_data for field in ('title', 'description', 'requirements')):
+            tasks.rescore_job.delay(job_id=job.pk)
+    
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsHRUser])
+    def rescore(self, request, pk=None):
+        """Queue a recompute of the AI match score of every application to this job"""
+        job = self.get_object()
+        queued = tasks.rescore_job.delay(job_id=job.pk)
+        return Response({'task': queued.pk}, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text search of the visible jobs: `?q=python "data engineer" -java`"""
+        results = search(self.filter_by_skills(self.get_queryset()), self.get_search_text(), 'description')
+        return self.search_response(results, JobPostingSearchSerializer)
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsCandidate])
+    def recommended(self, request):
+        """
+        Active jobs ranked against the candidate's latest resume, best first,
+        leaving out the ones they applied to (`?limit=`, default 20).
+        """
+        limit = request.query_params.get('limit', str(recommendations.DEFAULT_LIMIT))
+        if not limit.isdigit() or not 1 <= int(limit) <= recommendations.MAX_LIMIT:
+            raise ValidationError({'limit': [f'Must be between 1 and {recommendations.MAX_LIMIT}.']})
+        ranked = recommendations.recommend(request.user, int(limit))
+        if ranked is None:
+            return Response(
+                {'detail': 'Recommendations are not available yet.'}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        fieldset = self.get_fieldset_kwargs()
+        scores = dict(ranked)
+        # The index may lag behind a job that just closed
+        jobs = eager_load(
+            self.get_queryset().filter(pk__in=scores), JobPostingRecommendationSerializer(**fieldset)
+        ).in_bulk()
+        results = []
+        for job_id, score in ranked:
+            if job_id in jobs:
+                jobs[job_id].score = score
+                results.append(jobs[job_id])
+        return Response(JobPostingRecommendationSerializer(results, many=True, **fieldset).data)
+    
     @action(detail=True, methods=['get'])
     def applications(self, request, pk=None):
         """Get all applications for a specific job"""
         job = self.get_object()
-        applications = JobApplication.objects.filter(job_posting=job)
-        serializer = JobApplicationSerializer(applications, many=True)
+        fieldset = self.get_fieldset_kwargs()
+        applications = eager_load(
+            JobApplication.objects.filter(job_posting=job), JobApplicationListSerializer(**fieldset)
+        )
+        serializer = JobApplicationListSerializer(applications, many=True, **fieldset)
         return Response(serializer.data)
 
-class ResumeDataViewSet(viewsets.ModelViewSet):
+class ResumeDataViewSet(ReplicaReadMixin, BulkIOMixin, SparseFieldsetMixin, SkillsFilterMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = ResumeData.objects.all()
     serializer_class = ResumeDataSerializer
+    list_serializer_class = ResumeDataListSerializer
     permission_classes = [IsAuthenticated]
+    bulk_kind = 'resumes'
     
     def get_queryset(self):
         # Users can only see their own resume data
         return ResumeData.objects.filter(candidate=self.request.user)
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsHRUser])
+    def search(self, request):
+        """
+        Full-text search of the resumes submitted to the HR user's company
+        or imported by it (`?q=...`), or of those submitted to one of its jobs
+        with `?job=<id>`, narrowed by `?skills_all=` / `?skills_any=`.
+        """
+        company_id = request.user.userprofile.company_id
+        applications = JobApplication.objects.filter(job_posting__company=company_id)
+        job = request.query_params.get('job')
+        if job:
+            if not job.isdigit():
+                raise ValidationError({'job': ['A valid integer is required.']})
+            applications = applications.filter(job_posting_id=job)
+            resumes = ResumeData.objects.filter(id__in=applications.values('resume_data_id'))
+        else:
+            resumes = ResumeData.objects.filter(
+                Q(id__in=applications.values('resume_data_id')) | Q(imported_by=company_id)
+            )
+        resumes = self.filter_by_skills(resumes)
+        results = search(resumes, self.get_search_text(), 'summary')
+        return self.search_response(results, ResumeDataSearchSerializer)
+    
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        if self.action == 'upload':
+            # Must be swapped in before anything reads the request body
+            request.upload_handlers = [HashingFileUploadHandler(request)]
+        return drf_request
+    
     def perform_create(self, serializer):
-        serializer.save(candidate=self.request.user)
+        resume = serializer.save(candidate=self.request.user)
+        tasks.parse_resume.delay(resume_id=resume.pk)
+    
+    def perform_update(self, serializer):
+        resume = serializer.save()
+        # Also re-scores the applications made with this resume
+        tasks.parse_resume.delay(resume_id=resume.pk)
+    
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def upload(self, request):
+        """
+        Upload a resume file (multipart field `file`). The file is streamed
+        to disk and hashed, extraction runs in the background.
+        """
+        for name, extra in request.FILES.items():
+            if name != 'file':
+                os.remove(extra.temporary_file_path())
+        upload = request.FILES.get('file')
+        if upload is None:
+            rejected = any(h.rejected for h in request.upload_handlers if isinstance(h, HashingFileUploadHandler))
+            message = 'File is too large' if rejected else 'No file uploaded'
+            return Response({'file': [message]}, status=status.HTTP_400_BAD_REQUEST)
+        
+        upload.close()
+        extension = os.path.splitext(upload.name)[1].lower()
+        if extension not in ALLOWED_RESUME_EXTENSIONS:
+            os.remove(upload.temporary_file_path())
+            return Response(
+                {'file': [f"Supported file types: {', '.join(ALLOWED_RESUME_EXTENSIONS)}"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        resume = ResumeData.objects.filter(candidate=request.user, content_hash=upload.content_hash).first()
+        if resume is not None:
+            os.remove(upload.temporary_file_path())
+            return self._upload_response(resume, duplicate=True)
+        
+        relative_path = self._store_upload(upload, extension)
+        try:
+            with transaction.atomic():
+                resume = ResumeData.objects.create(
+                    candidate=request.user,
+                    full_name=request.user.get_full_name() or request.user.username,
+                    email=request.user.email,
+                    original_file_name=upload.name,
+                    file_path=relative_path,
+                    content_hash=upload.content_hash,
+                )
+                tasks.parse_resume.delay(resume_id=resume.pk)
+        except IntegrityError:
+            # The same file was uploaded concurrently
+            resume = ResumeData.objects.get(candidate=request.user, content_hash=upload.content_hash)
+            return self._upload_response(resume, duplicate=True)
+        return self._upload_response(resume, duplicate=False)
+    
+    def _upload_response(self, resume, duplicate):
+        data = {**ResumeDataListSerializer(resume).data, 'duplicate': duplicate}
+        return Response(data, status=status.HTTP_200_OK if duplicate else status.HTTP_202_ACCEPTED)
+    
+    def _store_upload(self, upload, extension):
+        # Files are stored by content hash, so identical files share one copy on disk
+        relative_path = resume_storage_path(upload.content_hash, extension)
+        full_path = os.path.join(settings.MEDIA_ROOT, relative_path)
+        if os.path.exists(full_path):
+            os.remove(upload.temporary_file_path())
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(upload.temporary_file_path(), full_path)
+        return relative_path
 
-class JobApplicationViewSet(viewsets.ModelViewSet):
+class JobApplicationViewSet(ReplicaReadMixin, BulkIOMixin, SparseFieldsetMixin, SkillsFilterMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = JobApplication.objects.all()
     serializer_class = JobApplicationSerializer
+    list_serializer_class = JobApplicationListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-applied_at', '-id')
+    bulk_kind = 'applications'
+    # Skills of the resume applied with
+    skills_field = 'resume_data__skill_tags'
     
     def get_queryset(self):
         user_profile = getattr(self.request.user, 'userprofile', None)
         if user_profile and user_profile.user_type == 'HR':
             # HR users see applications to their company's jobs
-            return JobApplication.objects.filter(job_posting__company=user_profile.company)
+            applications = JobApplication.objects.filter(job_posting__company=user_profile.company)
         elif user_profile and user_profile.user_type == 'CANDIDATE':
             # Candidates see their own applications
-            return JobApplication.objects.filter(candidate=self.request.user)
-        return JobApplication.objects.none()
+            applications = JobApplication.objects.filter(candidate=self.request.user)
+        else:
+            return JobApplication.objects.none()
+        return applications
     
     def perform_create(self, serializer):
-        serializer.save(candidate=self.request.user)
+        application = serializer.save(candidate=self.request.user)
+        tasks.score_application.delay(application_id=application.pk)
+    
+    def perform_update(self, serializer):
+        previous_status = serializer.instance.status
+        application = serializer.save()
+        if application.status != previous_status:
+            tasks.notify_application_status.delay(application_id=application.pk)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-status', permission_classes=[IsAuthenticated, IsHRUser])
+    def bulk_status(self, request):
+        """
+        Move many applications to `status` at once. Each selected application
+        is reported as updated, unchanged, invalid_transition or not_found.
+        """
+        serializer = BulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        new_status = serializer.validated_data['status']
+        
+        company_id = request.user.userprofile.company_id
+        applications = JobApplication.objects.filter(job_posting__company=company_id)
+        ids = serializer.validated_data.get('ids')
+        if ids is not None:
+            applications = applications.filter(id__in=ids)
+        else:
+            criteria = serializer.validated_data['filter']
+            if 'job_posting' in criteria:
+                applications = applications.filter(job_posting_id=criteria['job_posting'])
+            if 'status' in criteria:
+                applications = applications.filter(status=criteria['status'])
+        
+        results = []
+        updated = []
+        with transaction.atomic():
+            # Locked, so a concurrent PATCH can't slip a status in between.
+            # A filter is held to the MAX_IDS that `ids` can name.
+            current = {
+                application.pk: application
+                for application in applications.select_for_update(of=('self',)).order_by('id').only(
+                    'id', 'status', 'job_posting_id', 'candidate_id', 'ai_match_score'
+                )[:BulkStatusSerializer.MAX_IDS + 1]
+            }
+            if len(current) > BulkStatusSerializer.MAX_IDS:
+                raise ValidationError({'filter': [
+                    f'Matches more than {BulkStatusSerializer.MAX_IDS} applications, narrow it down.'
+                ]})
+            for application_id, application in current.items():
+                if application.status == new_status:
+                    results.append({'id': application_id, 'result': 'unchanged'})
+                elif new_status in JobApplication.STATUS_TRANSITIONS[application.status]:
+                    updated.append(application)
+                    results.append({'id': application_id, 'result': 'updated'})
+                else:
+                    results.append({'id': application_id, 'result': 'invalid_transition', 'from': application.status})
+            
+            if updated:
+                JobApplication.objects.filter(id__in=[app.pk for app in updated]).update(
+                    status=new_status, updated_at=timezone.now()
+                )
+                tasks.notify_application_status.delay_many([{'application_id': app.pk} for app in updated])
+                for application in updated:
+                    application.status = new_status
+                # .update() sends no signals
+                events.record([events.application_event(company_id, app) for app in updated])
+        
+        if ids is not None:
+            results.extend({'id': pk, 'result': 'not_found'} for pk in dict.fromkeys(ids) if pk not in current)
+        if updated:
+            invalidate_stats(company_id)
+            invalidate_job_counters(company_id)
+        return Response({'status': new_status, 'updated': len(updated), 'results': results})
 
-class InterviewViewSet(viewsets.ModelViewSet):
+class InterviewViewSet(ReplicaReadMixin, SparseFieldsetMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Interview.objects.all()
     serializer_class = InterviewSerializer
+    list_serializer_class = InterviewListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('scheduled_time', 'id')
     
     def get_queryset(self):
         user_profile = getattr(self.request.user, 'userprofile', None)
@@ -99,14 +536,101 @@ class InterviewViewSet(viewsets.ModelViewSet):
             return Interview.objects.filter(application__candidate=self.request.user)
         return Interview.objects.none()
     
+    def perform_update(self, serializer):
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError as exc:
+            if is_double_booking(exc):
+                raise ScheduleConflict()
+            raise
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated, IsHRUser])
+    def availability(self, request):
+        """
+        Free time of `?interviewers=1,2` between `start` and `end`, in ranges
+        of at least `duration` minutes, per interviewer and for all of them.
+        """
+        serializer = AvailabilitySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        self._check_interviewers(params['interviewers'], 'interviewers')
+        
+        free = availability(params['interviewers'], params['start'], params['end'], params['duration'])
+        as_ranges = lambda ranges: [{'start': start, 'end': end} for start, end in ranges]
+        return Response({
+            'start': params['start'],
+            'end': params['end'],
+            'duration': params['duration'],
+            'interviewers': [
+                {'id': interviewer_id, 'free': as_ranges(ranges)}
+                for interviewer_id, ranges in free['interviewers'].items()
+            ],
+            'common': as_ranges(free['common']),
+        })
+    
+    @action(detail=False, methods=['post'], url_path='bulk-schedule', permission_classes=[IsAuthenticated, IsHRUser])
+    def bulk_schedule(self, request):
+        """
+        Schedule a panel day in one go: every interview is created, or none
+        if one would double-book an interviewer (409 with the overlaps).
+        """
+        serializer = PanelScheduleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        bookings = serializer.validated_data['interviews']
+        
+        company_id = request.user.userprofile.company_id
+        self._check_interviewers({booking['interviewer'] for booking in bookings}, 'interviews')
+        known = set(
+            JobApplication.objects.filter(
+                job_posting__company=company_id, id__in={booking['application'] for booking in bookings}
+            ).values_list('id', flat=True)
+        )
+        unknown = sorted({booking['application'] for booking in bookings} - known)
+        if unknown:
+            raise ValidationError({'interviews': [f'Unknown applications: {", ".join(map(str, unknown))}']})
+        
+        interviews = [
+            Interview(
+                application_id=booking['application'],
+                interviewer_id=booking['interviewer'],
+                scheduled_time=booking['scheduled_time'],
+                duration_minutes=booking['duration_minutes'],
+                interview_type=booking['interview_type'],
+                location=booking.get('location') or None,
+                meeting_link=booking.get('meeting_link') or None,
+            )
+            for booking in bookings
+        ]
+        with transaction.atomic():
+            interviews = schedule(interviews)
+            # bulk_create sends no signals
+            events.record([events.interview_event(company_id, interview, created=True) for interview in interviews])
+        invalidate_stats(company_id)
+        invalidate_job_counters(company_id)
+        return Response(InterviewListSerializer(interviews, many=True).data, status=status.HTTP_201_CREATED)
+    
+    def _check_interviewers(self, ids, field):
+        """Interviewers are HR users of the requesting user's company"""
+        known = set(
+            User.objects.filter(
+                pk__in=ids, userprofile__user_type='HR',
+                userprofile__company_id=self.request.user.userprofile.company_id,
+            ).values_list('pk', flat=True)
+        )
+        unknown = sorted(set(ids) - known)
+        if unknown:
+            raise ValidationError({field: [f'Unknown interviewers: {", ".join(map(str, unknown))}']})
+    
 
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import login
 from .serializers import UserRegistrationSerializer, UserLoginSerializer, CurrentUserSerializer
+from .throttling import LoginRateThrottle, LoginEmailRateThrottle
 
 # Add these new views to your existing views.py
 
@@ -119,6 +643,7 @@ def register_user(request):
     serializer = UserRegistrationSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
+        replicas.pin(user.pk)
         
         # Create or get token
         token, created = Token.objects.get_or_create(user=user)
@@ -136,11 +661,12 @@ def register_user(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle, LoginEmailRateThrottle])
 def login_user(request):
     """
-    Login user with email and password
+    Login user with email and password. Throttled before any password hashing.
     """
-    serializer = UserLoginSerializer(data=request.data)
+    serializer = UserLoginSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
         user = serializer.validated_data['user']
         
@@ -178,3 +704,11 @@ def current_user(request):
     """
     serializer = CurrentUserSerializer(request.user)
     return Response(serializer.data)
+
+@api_view(['GET'])
+@permission_classes([CanReadMetrics])
+def metrics_view(request):
+    """
+    This process' request metrics in the Prometheus text format
+    """
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -2,6 +2,8 @@
 ASGI config for talentflow project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with ``uvicorn talentflow.asgi:application``. The async endpoints
+(/api/async/...) and the change event stream (/api/events/) need it.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
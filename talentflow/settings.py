@@ -1,6 +1,6 @@
 # ==== talentflow/settings.py ====
 import os
-from decouple import config
+from decouple import Csv, config
 from pathlib import Path
 from decouple import config
 
@@ -23,6 +23,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -40,6 +41,10 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Replica routing per request (core/replicas.py), needs request.user
+    'core.middleware.ReplicaRoutingMiddleware',
+    # Request metrics (core/metrics.py) and on-demand profiling, needs request.user
+    'core.middleware.RequestMetricsMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -76,6 +81,89 @@ DATABASES = {
     }
 }
 
+# Connection pools (core/pool.py): with DB_POOL each worker process keeps
+# DB_POOL_MIN_SIZE to DB_POOL_MAX_SIZE open connections per database and
+# reuses them across requests; a request waits up to DB_POOL_TIMEOUT seconds
+# for a free one. Give the database max_connections above the processes
+# times DB_POOL_MAX_SIZE.
+if config('DB_POOL', default=False, cast=bool):
+    DATABASES['default']['ENGINE'] = 'core.postgresql_pool'
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),  # seconds
+            'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),  # seconds
+            'max_idle': config('DB_POOL_MAX_IDLE', default=600, cast=float),  # seconds
+            'check_after': config('DB_POOL_CHECK_AFTER', default=5, cast=float),  # seconds
+        },
+    }
+    # psycopg 3 only: prepare a statement on its n-th run, kept with the pooled session
+    if config('DB_PREPARE_THRESHOLD', default='') != '':
+        DATABASES['default']['OPTIONS']['prepare_threshold'] = config('DB_PREPARE_THRESHOLD', cast=int)
+
+# Read replicas (core/replicas.py): DB_REPLICAS=host:port,host:port of streaming
+# replicas of the primary, same database name and credentials. Safe-method
+# API reads and admin changelists go to a replica, unless it lags by more than
+# REPLICA_MAX_LAG or the user wrote in the last REPLICA_PIN_SECONDS.
+DATABASE_REPLICAS = []
+for number, address in enumerate(config('DB_REPLICAS', default='', cast=Csv())):
+    host, _, port = address.partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        # Tests read the primary's test database through the replica
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+REPLICA_MAX_LAG = config('REPLICA_MAX_LAG', default=2, cast=float)  # seconds
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+REPLICA_CHECK_INTERVAL = config('REPLICA_CHECK_INTERVAL', default=5, cast=float)  # seconds
+
+# Cache (core/cache.py). The local-memory default is per process: use a
+# shared backend when running several processes so invalidations reach all
+# of them, e.g. CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# with CACHE_LOCATION=/var/tmp/talentflow_cache, or Redis/Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='talentflow'),
+    },
+    # Auth token revocations (core/authentication.py) and replica pins
+    # (core/replicas.py) must reach every process whatever CACHE_BACKEND is:
+    # a table of the database by default (created by migration 0017), or a
+    # shared SHARED_CACHE_BACKEND such as Redis.
+    'shared': {
+        'BACKEND': config('SHARED_CACHE_BACKEND', default='django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': config('SHARED_CACHE_LOCATION', default='core_shared_cache'),
+    },
+}
+if CACHES['shared']['BACKEND'] == 'django.core.cache.backends.db.DatabaseCache':
+    # Culled beyond it, revocations would be dropped before they expire
+    CACHES['shared']['OPTIONS'] = {'MAX_ENTRIES': config('SHARED_CACHE_MAX_ENTRIES', default=100000, cast=int)}
+STATS_CACHE_TIMEOUT = config('STATS_CACHE_TIMEOUT', default=300, cast=int)  # seconds
+# Cached job lists are invalidated on change, the timeout only frees memory
+LIST_CACHE_TIMEOUT = config('LIST_CACHE_TIMEOUT', default=3600, cast=int)  # seconds
+
+# Password hashing: PASSWORD_HASH_ITERATIONS sets the PBKDF2 cost. Hashes
+# made with another cost are upgraded in the background on login.
+PASSWORD_HASHERS = [
+    'core.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = config('PASSWORD_HASH_ITERATIONS', default=600000, cast=int)
+
+AUTHENTICATION_BACKENDS = [
+    # Email + password for the API login, usernames still work for the admin
+    'core.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -106,6 +194,10 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Resume uploads are streamed to MEDIA_ROOT/RESUME_UPLOAD_DIR (core/uploads.py)
+RESUME_UPLOAD_DIR = 'resumes'
+RESUME_MAX_UPLOAD_SIZE = config('RESUME_MAX_UPLOAD_SIZE', default=10 * 1024 * 1024, cast=int)  # bytes
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -113,15 +205,61 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        # TokenAuthentication with the user, profile and company cached in memory
+        'core.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Page numbers for small lists (`?count=false` skips the COUNT(*)),
+    # the big lists use core.pagination.KeysetPagination on the viewset
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Login throttles (core/throttling.py) reject floods before any hashing
+    'DEFAULT_THROTTLE_RATES': {
+        'login': config('LOGIN_RATE', default='30/min'),
+        'login_email': config('LOGIN_EMAIL_RATE', default='10/min'),
+    },
 }
 
+# core.authentication.CachedTokenAuthentication
+AUTH_CACHE_TTL = config('AUTH_CACHE_TTL', default=60, cast=int)  # seconds
+AUTH_CACHE_MAX_ENTRIES = config('AUTH_CACHE_MAX_ENTRIES', default=10000, cast=int)
+
+# Background task queue (core/queue.py), run with `python manage.py run_worker`
+TASK_VISIBILITY_TIMEOUT = config('TASK_VISIBILITY_TIMEOUT', default=300, cast=int)  # seconds
+TASK_RETRY_DELAY = config('TASK_RETRY_DELAY', default=10, cast=int)  # seconds, doubled per attempt
+WORKER_PROCESSES = config('WORKER_PROCESSES', default=2, cast=int)
+
+# Change feed (core/events.py), streamed at /api/events/ under ASGI
+EVENTS_HEARTBEAT = config('EVENTS_HEARTBEAT', default=15, cast=int)  # seconds
+EVENTS_RETENTION_DAYS = config('EVENTS_RETENTION_DAYS', default=7, cast=int)  # `manage.py prune_events`
+
+# Request metrics at /api/metrics/ (core.middleware.RequestMetricsMiddleware), for
+# staff users or `Authorization: Bearer <METRICS_TOKEN>` (Prometheus)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# A query signature run this often in one request is counted as an N+1 and logged
+METRICS_REPEATED_QUERY_THRESHOLD = config('METRICS_REPEATED_QUERY_THRESHOLD', default=5, cast=int)
+# cProfile dumps: on demand with `X-Profile: 1` from admins, plus this share of all requests
+PROFILE_SAMPLE_RATE = config('PROFILE_SAMPLE_RATE', default=0.0, cast=float)
+PROFILE_DIR = config('PROFILE_DIR', default=os.path.join(BASE_DIR, 'profiles'))
+
+# Partitions of applications and interviews (core/partitions.py), kept by
+# `python manage.py maintain_partitions`: the applications of closed jobs older
+# than ARCHIVE_AFTER_MONTHS go to archive partitions, in the
+# PARTITION_ARCHIVE_TABLESPACE if set (CREATE TABLESPACE it first)
+ARCHIVE_AFTER_MONTHS = config('ARCHIVE_AFTER_MONTHS', default=12, cast=int)
+PARTITION_ARCHIVE_TABLESPACE = config('PARTITION_ARCHIVE_TABLESPACE', default='')
+
+# Job recommendation index (core/recommendations.py), memory-mapped by every worker
+# of the host; build it with `python manage.py rebuild_job_index`
+RECOMMENDATIONS_INDEX_DIR = config('RECOMMENDATIONS_INDEX_DIR', default=os.path.join(BASE_DIR, 'job_index'))
+RECOMMENDATIONS_MAX_SEGMENTS = config('RECOMMENDATIONS_MAX_SEGMENTS', default=8, cast=int)
+
+# Email (notifications are sent by the task worker)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='TalentFlow <no-reply@talentflow.local>')
+
 # CORS settings (for frontend communication)
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # Next.js default port